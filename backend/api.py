@@ -5,7 +5,6 @@ from pydantic import BaseModel, EmailStr, constr
 from typing import Optional, List
 from datetime import datetime, timezone, timedelta
 from jose import jwt
-import bcrypt
 import stripe
 from bson import ObjectId
 import os
@@ -25,7 +24,20 @@ from middleware.csrf import csrf_protection
 from middleware.session import session_manager 
 from database.connection import db
 from auth.dependencies import get_current_user, get_admin_user
-from auth.dependencies import get_current_user_from_session
+from auth.dependencies import get_current_user_from_session, get_current_user_with_secrets
+from auth.user_cache import user_cache
+from auth.passwords import hash_password, verify_password, verify_and_upgrade
+from models.views import (
+    ORDER_DETAIL_PROJECTION, PRODUCT_DETAIL_PROJECTION,
+    OrderDetail, OrderSummary, ProductDetail, ProductSearchResults, ProductSummary
+)
+from utils.cart import hydrate_cart
+from utils.catalog_cache import catalog_cache
+from utils.category_tree import category_tree, record_products
+from utils.checkout import place_order
+from utils.pagination import CURSOR_HEADER, cursor_scope, paginate
+from utils.responses import FastJSONResponse
+from utils.streaming import batched, json_array, stream
 
 
 # Email import
@@ -137,12 +149,6 @@ class EmailTwoFactorCode(BaseModel):
     code: str
     
 # Helper functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-
 def create_jwt_token(user_id: str, expires_in: timedelta = timedelta(days=7)) -> str:
     payload = {
         "user_id": user_id,
@@ -167,36 +173,8 @@ def generate_email_2fa_code():
 
 async def send_2fa_email_code(email: str, code: str, user_name: str = "User"):
     """Send 2FA code via email"""
-    subject = "🔐 Your Login Code"
-    body = f"""
-    <html>
-    <body style="font-family: Arial, sans-serif; max-width: 500px; margin: 0 auto;">
-        <div style="background: linear-gradient(135deg, #007bff, #0056b3); color: white; padding: 2rem; text-align: center; border-radius: 10px 10px 0 0;">
-            <h1 style="margin: 0;">🔐 Security Code</h1>
-        </div>
-        
-        <div style="background: white; padding: 2rem; border-radius: 0 0 10px 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-            <p>Hello {user_name},</p>
-            <p>Your login verification code is:</p>
-            
-            <div style="background: #f8f9fa; padding: 2rem; margin: 1.5rem 0; border-radius: 8px; text-align: center; border: 2px solid #007bff;">
-                <span style="font-size: 2rem; font-weight: bold; color: #007bff; letter-spacing: 0.5rem;">{code}</span>
-            </div>
-            
-            <p><strong>This code expires in 5 minutes.</strong></p>
-            <p>If you didn't request this code, please ignore this email.</p>
-            
-            <hr style="margin: 2rem 0;">
-            <p style="color: #666; font-size: 0.9rem; text-align: center;">
-                This is an automated security message.
-            </p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    from utils.email import send_email
-    return await send_email(email, subject, body)
+    from utils.email import send_2fa_code_email
+    return await send_2fa_code_email(email, code, user_name)
 
 def require_csrf_token(request: Request, x_csrf_token: str = Header(None)):
     """Validate CSRF token for state-changing operations"""
@@ -220,63 +198,11 @@ def require_csrf_token(request: Request, x_csrf_token: str = Header(None)):
     
     return True
 
-async def get_next_order_number():
-    counter = await db.counters.find_one_and_update(
-        {"_id": "order_number"},
-        {"$inc": {"value": 1}},
-        upsert=True,
-        return_document=True
-    )
-    return counter["value"]
-
-
-async def get_current_user_flexible(request: Request):
-    """Get current user from session cookie or Authorization header"""
-    try:
-        # Try Authorization header first (for better compatibility)
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            try:
-                payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                if user_id:
-                    user = await db.users.find_one({"_id": ObjectId(user_id)})
-                    if user:
-                        return user
-            except jwt.ExpiredSignatureError:
-                pass  # Try cookie next
-            except jwt.JWTError:
-                pass  # Try cookie next
-        
-        # Try session cookie
-        session_token = request.cookies.get("session_token")
-        if session_token:
-            try:
-                payload = jwt.decode(session_token, JWT_SECRET, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                if user_id:
-                    user = await db.users.find_one({"_id": ObjectId(user_id)})
-                    if user:
-                        return user
-            except jwt.ExpiredSignatureError:
-                raise HTTPException(status_code=401, detail="Session expired")
-            except jwt.JWTError:
-                raise HTTPException(status_code=401, detail="Invalid session")
-        
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Authentication error: {e}")
-        raise HTTPException(status_code=401, detail="Authentication failed")
-    
 @router.post("/auth/login")
 async def login(user_login: UserLogin, request: Request, response: Response):
     client_ip = get_client_ip(request)
     
-    if not rate_limiter.is_allowed(f"{client_ip}:login", max_requests=5, window=900):
+    if not await rate_limiter.is_allowed(f"{client_ip}:login", max_requests=5, window=900):
         raise HTTPException(status_code=429, detail="Too many login attempts")
     
     identifier_type = get_identifier_type(user_login.identifier)
@@ -292,7 +218,7 @@ async def login(user_login: UserLogin, request: Request, response: Response):
         query = {"username": user_login.identifier}
     
     user = await db.users.find_one(query)
-    if not user or not verify_password(user_login.password, user["password"]):
+    if not user or not await verify_and_upgrade(user, user_login.password):
         print(f"Failed login attempt from {client_ip} for {user_login.identifier}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -362,7 +288,7 @@ async def login(user_login: UserLogin, request: Request, response: Response):
 @router.post("/auth/register")
 async def register(user: SecureUser, request: Request, csrf_valid: bool = Depends(require_csrf_token)):
     client_ip = get_client_ip(request)
-    if not rate_limiter.is_allowed(f"{client_ip}:register", max_requests=3, window=3600):
+    if not await rate_limiter.is_allowed(f"{client_ip}:register", max_requests=3, window=3600):
         raise HTTPException(status_code=429, detail="Too many registration attempts")
     
     # Additional server-side validation
@@ -385,7 +311,7 @@ async def register(user: SecureUser, request: Request, csrf_valid: bool = Depend
     # Generate verification token
     verification_token = secrets.token_urlsafe(32)
     
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password(user.password)
     user_data = {
         "username": user.username,
         "email": user.email,
@@ -452,6 +378,7 @@ async def verify_email(request_data: dict):
                 "$unset": {"verification_token": "", "verification_token_created": ""}
             }
         )
+        user_cache.invalidate(user["_id"])
         
         return {"message": "Email verified successfully"}
         
@@ -747,6 +674,7 @@ async def setup_2fa(setup_data: TwoFactorSetupChoice, current_user: dict = Depen
                         }
                     }
                 )
+                user_cache.invalidate(current_user["_id"])
                 
                 return {
                     "method": "app",
@@ -771,6 +699,7 @@ async def setup_2fa(setup_data: TwoFactorSetupChoice, current_user: dict = Depen
                     }
                 }
             )
+            user_cache.invalidate(current_user["_id"])
             
             # Send test code
             code = generate_email_2fa_code()
@@ -810,6 +739,7 @@ async def setup_2fa(setup_data: TwoFactorSetupChoice, current_user: dict = Depen
                         }
                     }
                 )
+                user_cache.invalidate(current_user["_id"])
                 raise HTTPException(status_code=500, detail="Failed to send verification email")
         else:
             raise HTTPException(status_code=400, detail="Invalid method. Choose 'app' or 'email'")
@@ -850,6 +780,7 @@ async def verify_2fa_setup(verification_data: TwoFactorSetup, current_user: dict
                             }
                         }
                     )
+                    user_cache.invalidate(current_user["_id"])
                     raise HTTPException(status_code=400, detail="2FA setup expired. Please start setup again.")
         
         method = user.get("two_factor_method")
@@ -892,6 +823,7 @@ async def verify_2fa_setup(verification_data: TwoFactorSetup, current_user: dict
                     }
                 }
             )
+            user_cache.invalidate(current_user["_id"])
             
             return {
                 "success": True,
@@ -939,6 +871,7 @@ async def verify_2fa_setup(verification_data: TwoFactorSetup, current_user: dict
                     }
                 }
             )
+            user_cache.invalidate(current_user["_id"])
             
             return {
                 "success": True,
@@ -955,14 +888,14 @@ async def verify_2fa_setup(verification_data: TwoFactorSetup, current_user: dict
         raise HTTPException(status_code=500, detail="Failed to verify 2FA setup")
 
 @router.post("/auth/disable-2fa")
-async def disable_2fa(verification_data: TwoFactorDisable, current_user: dict = Depends(get_current_user)):
+async def disable_2fa(verification_data: TwoFactorDisable, current_user: dict = Depends(get_current_user_with_secrets)):
     """Disable 2FA - Enhanced version"""
     try:
         # Verify password
         if not current_user.get("password"):
             raise HTTPException(status_code=400, detail="Cannot disable 2FA for OAuth accounts")
         
-        if not verify_password(verification_data.password, current_user["password"]):
+        if not await verify_password(verification_data.password, current_user["password"]):
             raise HTTPException(status_code=400, detail="Invalid password")
         
         if not current_user.get("two_factor_enabled"):
@@ -1029,6 +962,7 @@ async def disable_2fa(verification_data: TwoFactorDisable, current_user: dict =
                 }
             }
         )
+        user_cache.invalidate(current_user["_id"])
         
         return {"success": True, "message": "2FA disabled successfully"}
         
@@ -1039,7 +973,7 @@ async def disable_2fa(verification_data: TwoFactorDisable, current_user: dict =
         raise HTTPException(status_code=500, detail="Failed to disable 2FA")
     
 @router.post("/auth/send-disable-2fa-code")
-async def send_disable_2fa_code(request_data: dict, current_user: dict = Depends(get_current_user)):
+async def send_disable_2fa_code(request_data: dict, current_user: dict = Depends(get_current_user_with_secrets)):
     """Send 2FA code for disabling 2FA - Enhanced version"""
     try:
         password = request_data.get("password")
@@ -1048,7 +982,7 @@ async def send_disable_2fa_code(request_data: dict, current_user: dict = Depends
             raise HTTPException(status_code=400, detail="Password is required")
         
         # Verify password
-        if not verify_password(password, current_user["password"]):
+        if not await verify_password(password, current_user["password"]):
             raise HTTPException(status_code=400, detail="Invalid password")
         
         # Check if user has email-based 2FA
@@ -1081,6 +1015,7 @@ async def send_disable_2fa_code(request_data: dict, current_user: dict = Depends
                 }
             }
         )
+        user_cache.invalidate(current_user["_id"])
         
         try:
             user_name = current_user.get("full_name", current_user.get("username", "User"))
@@ -1184,6 +1119,7 @@ async def google_login(google_login: GoogleLogin, response: Response):
                 {"_id": user["_id"]},
                 {"$set": update_data}
             )
+            user_cache.invalidate(user["_id"])
             
             # Refresh user data
             user = await db.users.find_one({"_id": user["_id"]})
@@ -1354,7 +1290,7 @@ async def request_password_reset(request_data: PasswordResetRequest, request: Re
     """Request password reset with rate limiting"""
     try:
         # Verify reCAPTCHA
-        if not verify_recaptcha(request_data.recaptcha_response):
+        if not await verify_recaptcha(request_data.recaptcha_response, get_client_ip(request), "password_reset"):
             raise HTTPException(status_code=400, detail="reCAPTCHA verification failed")
         
         user = await db.users.find_one({"email": request_data.email})
@@ -1405,7 +1341,7 @@ async def reset_password(request: PasswordResetConfirm):
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters long")
     
     # Hash new password
-    new_hashed_password = hash_password(request.new_password)
+    new_hashed_password = await hash_password(request.new_password)
     
     # Update user password
     result = await db.users.update_one(
@@ -1417,6 +1353,7 @@ async def reset_password(request: PasswordResetConfirm):
             }
         }
     )
+    user_cache.invalidate(reset_record["user_id"])
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1435,12 +1372,12 @@ async def change_password(password_data: PasswordChange, request: Request):
     
     # FIXED: Use session-based authentication instead of token-based
     try:
-        current_user = await get_current_user_from_session(request)
+        current_user = await get_current_user_with_secrets(await get_current_user_from_session(request))
     except HTTPException as e:
         raise e
     
     # Verify reCAPTCHA
-    if not verify_recaptcha(password_data.recaptcha_response):
+    if not await verify_recaptcha(password_data.recaptcha_response, get_client_ip(request), "change_password"):
         raise HTTPException(status_code=400, detail="reCAPTCHA verification failed")
     
     user_id = str(current_user["_id"])
@@ -1464,21 +1401,22 @@ async def change_password(password_data: PasswordChange, request: Request):
         raise HTTPException(status_code=400, detail="Cannot change password for Google authenticated accounts")
     
     # Verify old password
-    if not verify_password(password_data.old_password, current_user["password"]):
+    if not await verify_password(password_data.old_password, current_user["password"]):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     # Check if new password is different from old password
-    if verify_password(password_data.new_password, current_user["password"]):
+    if await verify_password(password_data.new_password, current_user["password"]):
         raise HTTPException(status_code=400, detail="New password must be different from current password")
     
     # Hash new password
-    new_hashed_password = hash_password(password_data.new_password)
+    new_hashed_password = await hash_password(password_data.new_password)
     
     # Update password in database
     result = await db.users.update_one(
         {"_id": ObjectId(user_id)},
         {"$set": {"password": new_hashed_password, "updated_at": datetime.now(timezone.utc)}}
     )
+    user_cache.invalidate(user_id)
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1546,6 +1484,7 @@ async def update_profile(profile_data: UserProfileUpdate, request: Request):
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        user_cache.invalidate(user_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -1599,11 +1538,43 @@ async def create_product(
     product_data["created_by"] = str(current_user["_id"])
     
     result = await db.products.insert_one(product_data)
+    await record_products(added=[product_data])
+    await catalog_cache.bump()
     return {"message": "Product created", "id": str(result.inserted_id)}
 
-@router.get("/products")
-async def get_products(category: Optional[str] = None, limit: int = 50, skip: int = 0):
-    """Get products list - improved version"""
+@router.get("/categories")
+async def get_categories(request: Request):
+    """Category tree with product counts per subtree
+    
+    Built from the categories collection and cached like the product
+    listings, so it costs O(categories) at most once per catalog change.
+    """
+    try:
+        cache_key = ("categories",)
+        cached = catalog_cache.get(cache_key, request)
+        if cached is not None:
+            return cached
+        generation = catalog_cache.generation
+        
+        tree = await category_tree()
+        return catalog_cache.set(cache_key, {"categories": tree}, generation=generation, request=request)
+    except Exception as e:
+        print(f"❌ Get categories error: {e}")
+        raise HTTPException(status_code=500, detail=f"Categories fetch error: {str(e)}")
+
+@router.get("/products", response_model=List[ProductSummary])
+async def get_products(
+    request: Request,
+    category: Optional[str] = None,
+    limit: int = 50,
+    skip: int = 0,
+    cursor: Optional[str] = None
+):
+    """Get products list - improved version
+    
+    Pages by cursor: the next page's cursor is sent in the X-Next-Cursor
+    header. ``skip`` still works for older clients.
+    """
     try:
         # Build query
         query = {}
@@ -1611,36 +1582,109 @@ async def get_products(category: Optional[str] = None, limit: int = 50, skip: in
             query["category"] = category.strip()
         
         # Limit pagination
-        limit = min(limit, 50)  # Max 50 products per request
+        limit = max(min(limit, 50), 1)  # Max 50 products per request
         skip = max(skip, 0)
         
+        cache_key = ("list", query.get("category", ""), limit, skip, cursor)
+        cached = catalog_cache.get(cache_key, request)
+        if cached is not None:
+            return cached
+        generation = catalog_cache.generation
+        
         # Get products from database
-        cursor = db.products.find(query).skip(skip).limit(limit)
+        page, next_cursor = await paginate(
+            db.products, query,
+            scope=cursor_scope("/products", category=query.get("category", "")),
+            limit=limit, cursor=cursor, skip=skip,
+            projection=ProductSummary.projection()
+        )
         products = []
         
-        async for product in cursor:
+        for product in page:
             # Fix placeholder image URLs
             image_url = product.get("image_url", "")
             if "via.placeholder.com" in image_url or not image_url:
                 product["image_url"] = "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=400&h=300&fit=crop&q=80"
-            
-            product["_id"] = str(product["_id"])
             products.append(product)
         
-        return products
+        headers = {CURSOR_HEADER: next_cursor} if next_cursor else None
+        return catalog_cache.set(cache_key, products, headers, generation=generation, request=request)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Get products error: {e}")
         return []  # Return empty array instead of error
 
-@router.get("/products/{product_id}")
-async def get_product(product_id: str):
-    product = await db.products.find_one({"_id": ObjectId(product_id)})
+@router.get("/products/search", response_model=ProductSearchResults)
+async def search_products(
+    request: Request,
+    q: str = "",
+    category: str = "",
+    min_price: float = 0,
+    max_price: float = 999999,
+    limit: int = 50,
+    skip: int = 0,
+    cursor: Optional[str] = None
+):
+    # Sanitize search query
+    q = SecurityValidator.sanitize_string(q, 100)
+    category = SecurityValidator.sanitize_string(category, 100)
+    
+    # Validate price range
+    if min_price < 0 or max_price < 0 or min_price > max_price:
+        raise HTTPException(status_code=400, detail="Invalid price range")
+    
+    # Limit pagination
+    limit = max(min(limit, 100), 1)  # Max 100 items per request
+    skip = max(skip, 0)
+    
+    query = {}
+    
+    if q:
+        query["$text"] = {"$search": q}
+    
+    if category:
+        query["category"] = category
+    
+    if min_price > 0 or max_price < 999999:
+        query["price"] = {}
+        if min_price > 0:
+            query["price"]["$gte"] = min_price
+        if max_price < 999999:
+            query["price"]["$lte"] = max_price
+    
+    cache_key = ("search", q, category, min_price, max_price, limit, skip, cursor)
+    cached = catalog_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    generation = catalog_cache.generation
+    
+    page, next_cursor = await paginate(
+        db.products, query,
+        scope=cursor_scope("/products/search", q=q, category=category, min_price=min_price, max_price=max_price),
+        limit=limit, cursor=cursor, skip=skip,
+        projection=ProductSummary.projection()
+    )
+    return catalog_cache.set(
+        cache_key,
+        {"products": page, "count": len(page), "next_cursor": next_cursor},
+        generation=generation,
+        request=request
+    )
+
+@router.get("/products/{product_id}", response_model=ProductDetail)
+async def get_product(product_id: str, request: Request):
+    cached = catalog_cache.get(("product", product_id), request)
+    if cached is not None:
+        return cached
+    generation = catalog_cache.generation
+    
+    product = await db.products.find_one({"_id": ObjectId(product_id)}, PRODUCT_DETAIL_PROJECTION)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    product["_id"] = str(product["_id"])
-    return product
+    return catalog_cache.set(("product", product_id), product, generation=generation, request=request)
 
 @router.get("/cart")
 async def get_cart(request: Request):
@@ -1649,27 +1693,7 @@ async def get_cart(request: Request):
         user = await get_current_user_from_session(request)
         user_id = str(user["_id"])
         
-        cart_items = []
-        async for item in db.cart.find({"user_id": user_id}):
-            try:
-                product = await db.products.find_one({"_id": ObjectId(item["product_id"])})
-                if product:
-                    cart_items.append({
-                        "id": str(item["_id"]),
-                        "product_id": item["product_id"],
-                        "quantity": item["quantity"],
-                        "product": {
-                            "id": str(product["_id"]),
-                            "name": product["name"],
-                            "price": product["price"],
-                            "image_url": product.get("image_url", "")
-                        }
-                    })
-            except Exception as e:
-                print(f"❌ Cart item error: {e}")
-                continue
-        
-        return cart_items
+        return await hydrate_cart(user_id)
         
     except HTTPException:
         raise
@@ -1718,51 +1742,6 @@ async def add_to_cart(cart_item: CartItem, request: Request):
         raise HTTPException(status_code=500, detail="Failed to add item to cart")
 
 
-@router.get("/products/search")
-async def search_products(
-    q: str = "",
-    category: str = "",
-    min_price: float = 0,
-    max_price: float = 999999,
-    limit: int = 50,
-    skip: int = 0
-):
-    # Sanitize search query
-    q = SecurityValidator.sanitize_string(q, 100)
-    category = SecurityValidator.sanitize_string(category, 100)
-    
-    # Validate price range
-    if min_price < 0 or max_price < 0 or min_price > max_price:
-        raise HTTPException(status_code=400, detail="Invalid price range")
-    
-    # Limit pagination
-    limit = min(limit, 100)  # Max 100 items per request
-    skip = max(skip, 0)
-    
-    query = {}
-    
-    if q:
-        query["$text"] = {"$search": q}
-    
-    if category:
-        query["category"] = category
-    
-    if min_price > 0 or max_price < 999999:
-        query["price"] = {}
-        if min_price > 0:
-            query["price"]["$gte"] = min_price
-        if max_price < 999999:
-            query["price"]["$lte"] = max_price
-    
-    cursor = db.products.find(query).skip(skip).limit(limit)
-    products = []
-    async for product in cursor:
-        product["_id"] = str(product["_id"])
-        products.append(product)
-    
-    return {"products": products, "count": len(products)}
-
-
 @router.delete("/cart/{item_id}")
 async def remove_from_cart(item_id: str, request: Request):
     """Remove from cart - FIXED session authentication"""
@@ -1822,68 +1801,23 @@ async def create_order(order_data: dict, request: Request):
                 detail="Email verification required to make purchases. Please verify your email address before placing an order."
             )
         
-        # Get cart items
-        cart_items = []
-        async for item in db.cart.find({"user_id": user_id}):
-            try:
-                product = await db.products.find_one({"_id": ObjectId(item["product_id"])})
-                if product:
-                    cart_items.append({
-                        "id": str(item["_id"]),
-                        "product_id": item["product_id"],
-                        "quantity": item["quantity"],
-                        "product": {
-                            "id": str(product["_id"]),
-                            "name": product["name"],
-                            "price": product["price"],
-                            "image_url": product.get("image_url", "")
-                        }
-                    })
-            except Exception as e:
-                print(f"❌ Cart item error during order: {e}")
-                continue
-        
-        if not cart_items:
-            raise HTTPException(status_code=400, detail="Cart is empty")
-        
-        total = sum(item["product"]["price"] * item["quantity"] for item in cart_items)
-        
-        # Get next order number
-        order_number = await get_next_order_number()
-        
-        order = {
-            "order_number": f"{order_number:05d}",  # Format as 00001, 00002, etc.
-            "user_id": user_id,
-            "items": cart_items,
-            "total_amount": total,
+        order = await place_order(user_id, {
             "shipping_address": order_data.get("shipping_address"),
             "payment_method": order_data.get("payment_method"),
-            "payment_intent_id": order_data.get("payment_intent_id"),
-            "status": "pending",
-            "created_at": datetime.utcnow()
-        }
-        
-        result = await db.orders.insert_one(order)
-        order_id = str(result.inserted_id)
-        
-        # Clear cart
-        await db.cart.delete_many({"user_id": user_id})
-        
-        # Update product stock
-        for item in cart_items:
-            await db.products.update_one(
-                {"_id": ObjectId(item["product_id"])},
-                {"$inc": {"stock": -item["quantity"]}}
-            )
+            "payment_intent_id": order_data.get("payment_intent_id")
+        })
+        order_id = str(order["_id"])
+        cart_items = order["items"]
+        total = order["total_amount"]
         
         # Send email notifications
         try:
             user_name = user.get("full_name", user.get("username", "Customer"))
             user_email = user["email"]
             
-            print(f"📧 Sending emails for order {order['order_number']}...")
+            print(f"📧 Queueing emails for order {order['order_number']}...")
             
-            # Send confirmation email to customer
+            # Queue confirmation email to customer
             customer_email_sent = await send_order_confirmation_email(
                 user_email=user_email,
                 user_name=user_name,
@@ -1892,7 +1826,7 @@ async def create_order(order_data: dict, request: Request):
                 items=cart_items
             )
             
-            # Send notification email to admin
+            # Queue notification email to admin
             admin_email_sent = await send_admin_order_notification(
                 order_id=order["order_number"],
                 user_email=user_email,
@@ -1902,9 +1836,9 @@ async def create_order(order_data: dict, request: Request):
             )
             
             if customer_email_sent and admin_email_sent:
-                print(f"✅ Both emails sent successfully for order {order['order_number']}")
+                print(f"✅ Both emails queued for order {order['order_number']}")
             else:
-                print(f"⚠️ Some emails failed for order {order['order_number']}")
+                print(f"⚠️ Some emails failed to queue for order {order['order_number']}")
                 
         except Exception as e:
             print(f"❌ Email notification error for order {order['order_number']}: {str(e)}")
@@ -1923,20 +1857,36 @@ async def create_order(order_data: dict, request: Request):
         raise HTTPException(status_code=500, detail="Failed to create order")
 
 
-@router.get("/orders")
-async def get_orders(request: Request):
-    """Get user orders - FIXED session authentication"""
+@router.get("/orders", response_model=List[OrderSummary])
+async def get_orders(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """Get user orders - FIXED session authentication
+    
+    Returns every order unless ``limit`` is given; paged responses carry the
+    next page's cursor in the X-Next-Cursor header.
+    """
     try:
         user = await get_current_user_from_session(request)
         user_id = str(user["_id"])
         
-        cursor = db.orders.find({"user_id": user_id}).sort("created_at", -1)
-        orders = []
-        async for order in cursor:
-            order["_id"] = str(order["_id"])
-            orders.append(order)
-        
-        return orders
+        if limit is None and cursor is None:
+            # Whole history, streamed straight from the cursor
+            rows = db.orders.find(
+                {"user_id": user_id}, OrderSummary.projection()
+            ).sort([("created_at", -1), ("_id", -1)])
+            return stream(json_array(batched(rows)), name="orders")
+        
+        orders, next_cursor = await paginate(
+            db.orders, {"user_id": user_id},
+            scope=cursor_scope("/orders", user_id=user_id),
+            limit=max(min(limit or 50, 100), 1), cursor=cursor,
+            sort_field="created_at", direction=-1,
+            projection=OrderSummary.projection()
+        )
+        return FastJSONResponse(orders, headers={CURSOR_HEADER: next_cursor} if next_cursor else None)
         
     except HTTPException:
         raise
@@ -1944,19 +1894,18 @@ async def get_orders(request: Request):
         print(f"❌ Get orders error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get orders")
 
-@router.get("/orders/{order_id}")
+@router.get("/orders/{order_id}", response_model=OrderDetail)
 async def get_order(order_id: str, request: Request):
     """Get specific order - FIXED session authentication"""
     try:
         user = await get_current_user_from_session(request)
         user_id = str(user["_id"])
         
-        order = await db.orders.find_one({"_id": ObjectId(order_id), "user_id": user_id})
+        order = await db.orders.find_one({"_id": ObjectId(order_id), "user_id": user_id}, ORDER_DETAIL_PROJECTION)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
         
-        order["_id"] = str(order["_id"])
-        return order
+        return FastJSONResponse(order)
         
     except HTTPException:
         raise
@@ -1972,7 +1921,7 @@ async def submit_contact_form(
     csrf_valid: bool = Depends(require_csrf_token)
 ):
     client_ip = get_client_ip(request)
-    if not rate_limiter.is_allowed(f"{client_ip}:contact", max_requests=3, window=3600):
+    if not await rate_limiter.is_allowed(f"{client_ip}:contact", max_requests=3, window=3600):
         raise HTTPException(status_code=429, detail="Too many contact form submissions")
     
     # Additional validation
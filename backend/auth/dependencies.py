@@ -1,156 +1,121 @@
-# backend/dependencies.py - FIXED Authentication Dependencies
+# backend/dependencies.py - Authentication Dependencies
+#
+# Every route resolves the caller through get_current_user_from_session:
+# the JWT is decoded once per request, the user is kept on request.state,
+# and the document comes from auth.user_cache when possible. The cached
+# document never carries password hashes, 2FA secrets or one-time codes;
+# handlers that need those depend on get_current_user_with_secrets.
 from fastapi import Depends, HTTPException, Request, status
-from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from bson import ObjectId
 import os
 from database.connection import db
+from auth.user_cache import user_cache
 
 # Configuration
 JWT_SECRET = os.getenv("JWT_SECRET")
 if not JWT_SECRET:
     raise ValueError("JWT_SECRET environment variable is required for security!")
-#security = HTTPBearer()
 
-# FIXED: Use OAuth2PasswordBearer instead of HTTPBearer to avoid 403 bug
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+# Fields that stay in the database unless a handler explicitly asks for them
+SECRET_USER_FIELDS = (
+    "password",
+    "two_factor_secret",
+    "two_factor_secret_temp",
+    "backup_codes",
+    "email_2fa_code",
+    "email_2fa_code_temp",
+    "email_2fa_code_created",
+    "disable_2fa_code",
+    "disable_2fa_code_created",
+    "verification_token",
+    "verification_token_created",
+)
+USER_PROJECTION = {field: 0 for field in SECRET_USER_FIELDS}
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _request_tokens(request: Request):
+    """Session cookie first, then the Authorization header"""
+    tokens = []
+    session_token = request.cookies.get("session_token")
+    if session_token:
+        tokens.append(("Session", session_token))
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        tokens.append(("Token", auth_header.split(" ")[1]))
+    return tokens
+
+def _decode_user_id(kind: str, token: str) -> str:
+    invalid = "Invalid session token" if kind == "Session" else "Invalid token"
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        raise _unauthorized(f"{kind} expired")
+    except JWTError:
+        raise _unauthorized(invalid)
+
+    user_id = payload.get("user_id")
+    if not user_id or not ObjectId.is_valid(user_id):
+        raise _unauthorized(invalid)
+    return user_id
+
+async def _load_user(user_id: str):
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, USER_PROJECTION)
+        if user:
+            user_cache.set(user_id, user)
+    return user
 
 async def get_current_user_from_session(request: Request):
-    """Get current user from session cookie - FIXED for proper error handling"""
+    """Get the current user from the session cookie or Authorization header"""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
     try:
-        # Try session cookie first
-        session_token = request.cookies.get("session_token")
-        
-        if session_token:
-            try:
-                payload = jwt.decode(session_token, JWT_SECRET, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                
-                if not user_id:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Invalid session token",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                
-                user = await db.users.find_one({"_id": ObjectId(user_id)})
-                if not user:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="User not found",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                
-                return user
-                
-            except jwt.ExpiredSignatureError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Session expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            except jwt.JWTError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid session token",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-        
-        # Fallback to Authorization header
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
+        tokens = _request_tokens(request)
+        if not tokens:
+            raise _unauthorized("Authentication required")
+
+        # A stale cookie shouldn't shadow a valid bearer token, so every
+        # candidate is tried; the first failure is the one reported.
+        error = None
+        for kind, token in tokens:
             try:
-                payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                
-                if not user_id:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Invalid token",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                
-                user = await db.users.find_one({"_id": ObjectId(user_id)})
-                if not user:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="User not found",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                
+                user = await _load_user(_decode_user_id(kind, token))
+            except HTTPException as e:
+                error = error or e
+                continue
+            if user:
+                request.state.user = user
                 return user
-                
-            except jwt.ExpiredSignatureError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            except jwt.JWTError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-        
-        # No authentication found
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-        
+            error = error or _unauthorized("User not found")
+        raise error
+
     except HTTPException:
         raise
     except Exception as e:
         print(f"Authentication error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication failed",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Authentication failed")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Get current authenticated user from JWT token - FIXED for 401 errors"""
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-        
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return user
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    except jwt.JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+# All resolver names used across the routes share the same implementation
+get_current_user = get_current_user_from_session
+get_current_user_flexible = get_current_user_from_session
+get_current_user_from_cookie_or_header = get_current_user_from_session
+
+async def get_current_user_with_secrets(current_user: dict = Depends(get_current_user_from_session)):
+    """Full, uncached user document for handlers that check passwords or 2FA codes"""
+    user = await db.users.find_one({"_id": current_user["_id"]})
+    if not user:
+        raise _unauthorized("User not found")
+    return user
 
 async def get_current_user_optional(request: Request):
     """Get current user without requiring authentication"""
@@ -160,72 +125,10 @@ async def get_current_user_optional(request: Request):
         return None
 
 async def get_admin_user(current_user: dict = Depends(get_current_user_from_session)):
-    """Check if user is admin - FIXED to use session-based auth"""
+    """Check if user is admin"""
     if not current_user.get("is_admin", False):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     return current_user
-
-# FIXED: Flexible authentication for different endpoints
-# async def get_current_user_flexible(request: Request):
-#     """Get user from session cookie or authorization header - FIXED"""
-#     try:
-#         return await get_current_user_from_session(request)
-#     except HTTPException as e:
-#         # Re-raise with proper status code
-#         if e.status_code == 401:
-#             raise HTTPException(
-#                 status_code=status.HTTP_401_UNAUTHORIZED,
-#                 detail="Authentication failed",
-#                 headers={"WWW-Authenticate": "Bearer"},
-#             )
-#         raise e
-
-# Alternative function for backward compatibility
-async def get_current_user_from_cookie_or_header(request: Request):
-    """Alias for get_current_user_flexible"""
-    return await get_current_user_flexible(request)
-
-async def get_current_user_flexible(request: Request):
-    """Get current user from session cookie or Authorization header"""
-    try:
-        # Try Authorization header first (for better compatibility)
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            try:
-                payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                if user_id:
-                    user = await db.users.find_one({"_id": ObjectId(user_id)})
-                    if user:
-                        return user
-            except jwt.ExpiredSignatureError:
-                pass  # Try cookie next
-            except jwt.JWTError:
-                pass  # Try cookie next
-        
-        # Try session cookie
-        session_token = request.cookies.get("session_token")
-        if session_token:
-            try:
-                payload = jwt.decode(session_token, JWT_SECRET, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                if user_id:
-                    user = await db.users.find_one({"_id": ObjectId(user_id)})
-                    if user:
-                        return user
-            except jwt.ExpiredSignatureError:
-                raise HTTPException(status_code=401, detail="Session expired")
-            except jwt.JWTError:
-                raise HTTPException(status_code=401, detail="Invalid session")
-        
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Authentication error: {e}")
-        raise HTTPException(status_code=401, detail="Authentication failed")
\ No newline at end of file
@@ -0,0 +1,86 @@
+# backend/auth/passwords.py - bcrypt hashing off the event loop
+#
+# bcrypt costs 100-300 ms of CPU per call. It releases the GIL, so the work
+# runs on a small dedicated thread pool and the event loop keeps serving
+# other requests. The number of queued hashes is capped: past that limit
+# callers get a 503 right away instead of piling up behind the pool.
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+from database.connection import db
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(HASH_WORKERS * 8)))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+
+
+async def _run(func, *args):
+    global _pending
+    if _pending >= MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"}
+        )
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def _check(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Malformed stored hash
+        return False
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run(_check, password, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored hash was made with a different work factor"""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+async def verify_and_upgrade(user: dict, password: str) -> bool:
+    """Verify a login password and rehash it if BCRYPT_ROUNDS has changed"""
+    hashed = user.get("password")
+    if not hashed or not await verify_password(password, hashed):
+        return False
+
+    if needs_rehash(hashed):
+        try:
+            # Only replace the exact hash we verified, in case of a concurrent change
+            await db.users.update_one(
+                {"_id": user["_id"], "password": hashed},
+                {"$set": {"password": await hash_password(password)}}
+            )
+        except Exception as e:
+            print(f"⚠️ Password rehash failed for {user['_id']}: {e}")
+    return True
+
+
+def shutdown_executor():
+    _executor.shutdown(wait=False)
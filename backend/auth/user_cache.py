@@ -0,0 +1,56 @@
+# backend/auth/user_cache.py - Short-lived cache of authenticated users
+#
+# Holds the secret-free user document the auth resolver hands to handlers,
+# so authenticated reads (cart, orders, /auth/me) don't hit db.users on
+# every request. Entries expire after USER_CACHE_TTL seconds and the least
+# recently used entry is evicted once USER_CACHE_SIZE is reached. Code that
+# writes to db.users calls user_cache.invalidate(user_id) afterwards; the
+# TTL bounds staleness across app workers, which don't share the cache.
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1000"))
+
+
+class UserCache:
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_size: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        # Handlers may mutate what they get; never hand out the cached dict
+        return dict(entry[1])
+
+    def set(self, user_id: str, user: dict):
+        if self.ttl <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, dict(user))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache()
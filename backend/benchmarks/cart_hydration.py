@@ -0,0 +1,128 @@
+# backend/benchmarks/cart_hydration.py - GET /api/cart product lookups
+#
+# Compares the old per-row products.find_one loop with hydrate_cart's single
+# $in query for carts of 1, 10, 50 and 200 line items, reporting the
+# MongoDB round trips per request (counted with a command listener) and the
+# median and p95 latency. Needs a mongod:
+#
+#   BENCH_MONGODB_URL=mongodb://localhost:27017 python benchmarks/cart_hydration.py
+import argparse
+import asyncio
+import time
+
+from common import BENCH_MONGODB_URL, percentile, print_table, scratch_db_name
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from utils import cart
+
+CART_SIZES = (1, 10, 50, 200)
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the commands sent to one database (cursor getMores included)"""
+
+    def __init__(self, database: str):
+        self.database = database
+        self.count = 0
+
+    def started(self, event):
+        if event.database_name == self.database:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def per_row_cart(db, user_id: str) -> list:
+    """The GET /api/cart lookup before hydrate_cart"""
+    cart_items = []
+    async for item in db.cart.find({"user_id": user_id}):
+        try:
+            product = await db.products.find_one({"_id": ObjectId(item["product_id"])})
+            if product:
+                cart_items.append({
+                    "id": str(item["_id"]),
+                    "product_id": item["product_id"],
+                    "quantity": item["quantity"],
+                    "product": {
+                        "id": str(product["_id"]),
+                        "name": product["name"],
+                        "price": product["price"],
+                        "image_url": product.get("image_url", "")
+                    }
+                })
+        except Exception:
+            continue
+    return cart_items
+
+
+async def hydrated_cart(db, user_id: str) -> list:
+    return await cart.hydrate_cart(user_id)
+
+
+async def seed(db, size: int) -> str:
+    user_id = f"user-{size}"
+    products = [
+        {
+            "name": f"Product {size}-{i}",
+            "price": 19.99,
+            "image_url": f"/images/{i}.jpg",
+            "description": "Lorem ipsum " * 80,
+            "category": "Bench/Items",
+            "stock": 100
+        }
+        for i in range(size)
+    ]
+    ids = (await db.products.insert_many(products)).inserted_ids
+    await db.cart.insert_many([{"user_id": user_id, "product_id": str(i), "quantity": 1} for i in ids])
+    return user_id
+
+
+async def measure(db, counter: CommandCounter, load, user_id: str, size: int, iterations: int):
+    for _ in range(3):
+        await load(db, user_id)
+    counter.count = 0
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        items = await load(db, user_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert len(items) == size
+    return counter.count / iterations, latencies
+
+
+async def main(url: str, iterations: int):
+    name = scratch_db_name("cart")
+    counter = CommandCounter(name)
+    client = AsyncIOMotorClient(url, event_listeners=[counter], serverSelectionTimeoutMS=5000)
+    db = client[name]
+    cart.db = db
+    await db.cart.create_index("user_id")
+    rows = []
+    try:
+        for size in CART_SIZES:
+            user_id = await seed(db, size)
+            for label, load in (("per-row find_one", per_row_cart), ("hydrate_cart $in", hydrated_cart)):
+                round_trips, latencies = await measure(db, counter, load, user_id, size, iterations)
+                rows.append([
+                    size, label, f"{round_trips:.0f}",
+                    f"{percentile(latencies, 50):.2f}", f"{percentile(latencies, 95):.2f}"
+                ])
+    finally:
+        await client.drop_database(name)
+        client.close()
+    print_table(["items", "path", "round trips", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cart hydration round trips and latency")
+    parser.add_argument("--url", default=BENCH_MONGODB_URL)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.iterations))
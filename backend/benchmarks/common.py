@@ -0,0 +1,45 @@
+# backend/benchmarks/common.py - Shared helpers for the benchmark scripts
+#
+# The scripts are run from the backend directory, e.g.
+#
+#   python benchmarks/cart_hydration.py
+#
+# Scripts that need MongoDB use BENCH_MONGODB_URL (default a local mongod)
+# and work in a throwaway database that is dropped afterwards.
+import os
+import sys
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BENCH_MONGODB_URL = os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017")
+
+# Imported modules read their settings at import time
+for name, value in {
+    "MONGODB_URL": BENCH_MONGODB_URL,
+    "JWT_SECRET": "benchmark",
+    "EMAIL_USER": "bench@example.com",
+    "EMAIL_PASSWORD": "benchmark",
+    "ADMIN_EMAIL": "admin@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+def scratch_db_name(prefix: str) -> str:
+    return f"bench_{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def print_table(headers, rows):
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    print("  ".join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
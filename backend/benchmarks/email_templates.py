@@ -0,0 +1,224 @@
+# backend/benchmarks/email_templates.py - Order confirmation rendering
+#
+# Renders N order confirmations with 20 line items each through the old
+# f-string code (copied below from utils/email.py before the template
+# layer) and through the precompiled templates. The template path also
+# derives the plain-text alternative the old one didn't have. Rendering is
+# timed alone and again up to the serialized MIME message sent to SMTP,
+# where the stdlib email package's encoding dominates both paths.
+#
+#   python benchmarks/email_templates.py --emails 10000
+import argparse
+import time
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List
+
+from common import print_table
+
+from utils.email import EMAIL_USER, FRONTEND_URL, TEMPLATES, _build_message, _render_items  # noqa: E402
+from utils.email_templates import html_to_text  # noqa: E402
+
+ITEMS_PER_ORDER = 20
+
+
+def fstring_order_confirmation(user_email: str, user_name: str, order_id: str, total_amount: float, items: List[dict]):
+    """send_order_confirmation_email's body before the templates"""
+    
+    subject = f"🎉 Order Confirmation - #{order_id} - Vergi Store"
+    
+    # Build items HTML
+    items_html = ""
+    for item in items:
+        # Handle image URLs
+        image_url = item['product']['image_url']
+        if image_url.startswith('/'):
+            image_url = f"{FRONTEND_URL}{image_url}"
+        
+        items_html += f"""
+        <tr style="border-bottom: 1px solid #eee;">
+            <td style="padding: 10px;">
+                <div style="display: flex; align-items: center;">
+                    <img src="{image_url}" alt="{item['product']['name']}" 
+                         style="width: 50px; height: 50px; object-fit: cover; margin-right: 10px; border-radius: 5px;"
+                         onerror="this.style.display='none'">
+                    <span><strong>{item['product']['name']}</strong></span>
+                </div>
+            </td>
+            <td style="padding: 10px; text-align: center;">{item['quantity']}</td>
+            <td style="padding: 10px; text-align: right;">${item['product']['price']:.2f}</td>
+            <td style="padding: 10px; text-align: right; font-weight: bold; color: #28a745;">
+                ${(item['product']['price'] * item['quantity']):.2f}
+            </td>
+        </tr>
+        """
+    
+    tracking_url = f"{FRONTEND_URL}/orders"
+    
+    body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
+        <div style="background: linear-gradient(135deg, #007bff, #28a745); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0;">
+            <h1 style="margin: 0; font-size: 28px;">🎉 Order Confirmed!</h1>
+            <p style="margin: 10px 0 0 0; font-size: 18px;">Thank you for your purchase, {user_name}!</p>
+        </div>
+        
+        <div style="background: white; padding: 30px; border-radius: 0 0 10px 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+            <div style="background: #f8f9fa; padding: 20px; margin: 20px 0; border-radius: 8px; border-left: 4px solid #007bff;">
+                <h3 style="margin-top: 0; color: #007bff;">📋 Order Details</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr>
+                        <td style="padding: 8px 0; font-weight: bold;">Order Number:</td>
+                        <td style="padding: 8px 0; color: #007bff; font-weight: bold;">#{order_id}</td>
+                    </tr>
+                    <tr>
+                        <td style="padding: 8px 0; font-weight: bold;">Order Date:</td>
+                        <td style="padding: 8px 0;">{datetime.now().strftime('%B %d, %Y at %I:%M %p')}</td>
+                    </tr>
+                    <tr>
+                        <td style="padding: 8px 0; font-weight: bold;">Total Amount:</td>
+                        <td style="padding: 8px 0; color: #28a745; font-weight: bold; font-size: 18px;">${total_amount:.2f}</td>
+                    </tr>
+                    <tr>
+                        <td style="padding: 8px 0; font-weight: bold;">Status:</td>
+                        <td style="padding: 8px 0;">
+                            <span style="background-color: #ffc107; color: #856404; padding: 4px 12px; border-radius: 15px; font-size: 12px; font-weight: bold;">
+                                PENDING REVIEW
+                            </span>
+                        </td>
+                    </tr>
+                </table>
+            </div>
+            
+            <h3 style="color: #333; margin-top: 30px; border-bottom: 2px solid #007bff; padding-bottom: 10px;">
+                🛍️ Items Ordered
+            </h3>
+            <table style="width: 100%; border-collapse: collapse; background-color: white; box-shadow: 0 2px 4px rgba(0,0,0,0.1); border-radius: 8px; overflow: hidden; margin-bottom: 20px;">
+                <thead>
+                    <tr style="background-color: #007bff; color: white;">
+                        <th style="padding: 15px; text-align: left;">Product</th>
+                        <th style="padding: 15px; text-align: center;">Quantity</th>
+                        <th style="padding: 15px; text-align: right;">Unit Price</th>
+                        <th style="padding: 15px; text-align: right;">Subtotal</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {items_html}
+                </tbody>
+            </table>
+            
+            <div style="background: #e7f3ff; padding: 20px; border-radius: 8px; border: 1px solid #b3d9ff; margin: 30px 0;">
+                <h3 style="color: #0056b3; margin-top: 0;">📦 What's Next?</h3>
+                <ul style="margin: 0; padding-left: 20px;">
+                    <li style="margin-bottom: 8px;">Your order is currently <strong>pending review</strong> by our team</li>
+                    <li style="margin-bottom: 8px;">You'll receive an email update once it's been processed and accepted</li>
+                    <li style="margin-bottom: 8px;">You can track your order status in your account dashboard</li>
+                    <li>Estimated processing time: <strong>1-2 business days</strong></li>
+                </ul>
+            </div>
+            
+            <div style="text-align: center; margin: 30px 0;">
+                <a href="{tracking_url}" 
+                   style="background-color: #007bff; color: white; padding: 12px 30px; text-decoration: none; border-radius: 6px; font-weight: bold; display: inline-block;">
+                    📱 Track Your Order
+                </a>
+            </div>
+            
+            <div style="background: #f8f9fa; padding: 20px; margin: 30px 0; border-radius: 8px; text-align: center;">
+                <h4 style="color: #333; margin-top: 0;">Need Help?</h4>
+                <p style="margin: 10px 0; color: #666;">
+                    If you have any questions about your order, please contact our support team.
+                </p>
+                <p style="margin: 0;">
+                    📧 Email: {EMAIL_USER}<br>
+                    🌐 Website: {FRONTEND_URL}
+                </p>
+            </div>
+            
+            <div style="text-align: center; margin-top: 40px; padding-top: 20px; border-top: 1px solid #eee;">
+                <p style="color: #666; font-size: 14px; margin: 0;">
+                    Thank you for choosing our store! 🙏<br>
+                    <em>This is an automated confirmation email.</em>
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    
+    return subject, body
+
+
+def fstring_message(user_email: str, *args) -> str:
+    subject, body = fstring_order_confirmation(user_email, *args)
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_USER
+    msg['To'] = user_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg.as_string()
+
+
+def template_body(user_email: str, user_name: str, order_id: str, total_amount: float, items: List[dict]):
+    """send_order_confirmation_email's body"""
+    subject = f"🎉 Order Confirmation - #{order_id} - Vergi Store"
+    body = TEMPLATES["order_confirmation"].render(
+        user_name=user_name,
+        order_id=order_id,
+        total_amount=f"{total_amount:.2f}",
+        sent_at=datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+        items_html=_render_items("order_confirmation_item", items)
+    )
+    return subject, body
+
+
+def template_order_confirmation(user_email: str, *args):
+    """The body plus its plain-text alternative"""
+    subject, body = template_body(user_email, *args)
+    return subject, body, html_to_text(body)
+
+
+def template_message(user_email: str, *args) -> str:
+    subject, body, text = template_order_confirmation(user_email, *args)
+    return _build_message(user_email, subject, body, text).as_string()
+
+
+def _order(index: int):
+    items = [
+        {
+            "quantity": 1 + i % 3,
+            "product": {"name": f"Product {i}", "price": 9.99 + i, "image_url": f"/images/product-{i}.jpg"}
+        }
+        for i in range(ITEMS_PER_ORDER)
+    ]
+    total = sum(item["product"]["price"] * item["quantity"] for item in items)
+    return f"customer{index}@example.com", f"Customer {index}", f"ORD-{index:06d}", total, items
+
+
+def _time(render, orders: list, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        render(*orders[i % len(orders)])
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    orders = [_order(i) for i in range(min(count, 100))]
+    rows = []
+    for label, render, message in (
+        ("f-strings", fstring_order_confirmation, fstring_message),
+        ("templates, HTML only", template_body, None),
+        ("templates + text part", template_order_confirmation, template_message),
+    ):
+        rendered = _time(render, orders, count)
+        built = f"{_time(message, orders, count) / count * 1e6:.0f}" if message else "-"
+        rows.append([label, count, f"{rendered:.2f}", f"{rendered / count * 1e6:.0f}", built])
+    print_table(["path", "emails", "render s", "render us/email", "with MIME us/email"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Order confirmation rendering")
+    parser.add_argument("--emails", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.emails)
@@ -0,0 +1,127 @@
+# backend/benchmarks/json_responses.py - Serializing large order and product lists
+#
+# Encodes a 100-order admin page (5 items each, user info, datetimes) and
+# a 50-product listing the old way - rewrite _id with str(), then
+# jsonable_encoder and the stdlib-json JSONResponse, as FastAPI did for a
+# returned dict - and the new way, handing the Motor documents to
+# FastJSONResponse.
+#
+#   python benchmarks/json_responses.py --iterations 500
+import argparse
+import copy
+import json
+import time
+from datetime import datetime, timedelta
+
+from common import percentile, print_table
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.responses import FastJSONResponse
+
+
+def _orders(count: int = 100) -> list:
+    created = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": str(ObjectId()),
+            "user_info": {"email": f"customer{i}@example.com", "full_name": f"Customer {i}", "phone": "+15555550100"},
+            "items": [
+                {
+                    "product_id": str(ObjectId()),
+                    "name": f"Product {j}",
+                    "price": 19.99 + j,
+                    "quantity": 1 + j % 3,
+                    "image_url": f"/images/product-{j}.jpg"
+                }
+                for j in range(5)
+            ],
+            "total_amount": 149.85,
+            "shipping_address": {"street": "1 Main St", "city": "Springfield", "zip": "12345", "country": "US"},
+            "payment_method": "card",
+            "status": "pending",
+            "created_at": created + timedelta(minutes=i),
+            "updated_at": created + timedelta(minutes=i, seconds=30)
+        }
+        for i in range(count)
+    ]
+
+
+def _products(count: int = 50) -> list:
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Product {i}",
+            "description": "A sturdy everyday product. " * 8,
+            "price": 9.99 + i,
+            "category": "Home/Kitchen",
+            "image_url": f"/images/product-{i}.jpg",
+            "stock": 100 - i,
+            "created_at": datetime(2024, 1, 1) + timedelta(days=i),
+            "updated_at": datetime(2024, 2, 1) + timedelta(days=i)
+        }
+        for i in range(count)
+    ]
+
+
+def old_orders_page(orders: list) -> bytes:
+    page = []
+    for order in orders:
+        order_data = dict(order)
+        order_data["_id"] = str(order["_id"])
+        page.append(order_data)
+    content = {"orders": page, "total": 1000, "has_more": True}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def new_orders_page(orders: list) -> bytes:
+    return FastJSONResponse({"orders": orders, "total": 1000, "has_more": True}).body
+
+
+def old_products(products: list) -> bytes:
+    for product in products:
+        product["_id"] = str(product["_id"])
+    return JSONResponse(jsonable_encoder(products)).body
+
+
+def new_products(products: list) -> bytes:
+    return FastJSONResponse(products).body
+
+
+def _measure(encode, make, iterations: int):
+    # Each request serializes freshly loaded documents, as from a cursor
+    documents = [make() for _ in range(iterations)]
+    latencies = []
+    for docs in documents:
+        start = time.perf_counter()
+        body = encode(docs)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return body, latencies
+
+
+def main(iterations: int):
+    orders, products = _orders(), _products()
+    rows = []
+    for name, make, old, new in (
+        ("100-order admin page", lambda: copy.deepcopy(orders), old_orders_page, new_orders_page),
+        ("50-product listing", lambda: copy.deepcopy(products), old_products, new_products),
+    ):
+        old_body, old_ms = _measure(old, make, iterations)
+        new_body, new_ms = _measure(new, make, iterations)
+        assert json.loads(old_body) == json.loads(new_body)
+        for label, latencies, body in (("jsonable_encoder + json", old_ms, old_body), ("orjson", new_ms, new_body)):
+            rows.append([
+                name, label, f"{percentile(latencies, 50):.3f}", f"{percentile(latencies, 95):.3f}",
+                f"{len(body) / 1024:.0f}"
+            ])
+    print_table(["payload", "path", "p50 ms", "p95 ms", "KiB"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON response serialization")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    main(args.iterations)
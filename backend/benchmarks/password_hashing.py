@@ -0,0 +1,77 @@
+# backend/benchmarks/password_hashing.py - Logins under concurrent load
+#
+# Fires N concurrent logins at one event loop, checking bcrypt inline in
+# the coroutine as api.py used to, then through auth.passwords' bounded
+# pool. A ticker coroutine that wants to wake every 10 ms measures how long
+# the loop stalls, i.e. what every other request on the worker would wait.
+#
+#   python benchmarks/password_hashing.py --logins 64 --rounds 12
+import argparse
+import asyncio
+import time
+
+from common import percentile, print_table
+
+import bcrypt
+
+from auth import passwords
+
+TICK = 0.01
+
+
+def inline_check(password: str, hashed: str) -> bool:
+    """verify_password before the pool"""
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+async def inline_login(password: str, hashed: str) -> bool:
+    return inline_check(password, hashed)
+
+
+async def pooled_login(password: str, hashed: str) -> bool:
+    return await passwords.verify_password(password, hashed)
+
+
+async def _ticker(stalls: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        stalls.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def run(login, count: int, hashed: str):
+    stalls, stop = [], asyncio.Event()
+    ticker = asyncio.ensure_future(_ticker(stalls, stop))
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("hunter2", hashed) for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    assert all(results)
+    return elapsed, stalls
+
+
+def main(count: int, rounds: int):
+    passwords.BCRYPT_ROUNDS = rounds
+    hashed = passwords._hash("hunter2")
+    # Enough room that the pool queues rather than sheds this load
+    passwords.MAX_PENDING = max(passwords.MAX_PENDING, count)
+    rows = []
+    for label, login in (("inline bcrypt", inline_login), (f"pool ({passwords.HASH_WORKERS} threads)", pooled_login)):
+        elapsed, stalls = asyncio.run(run(login, count, hashed))
+        rows.append([
+            label, count, f"{count / elapsed:.1f}",
+            f"{percentile(stalls, 95):.0f}", f"{max(stalls):.0f}"
+        ])
+    passwords.shutdown_executor()
+    print_table(["path", "logins", "logins/sec", "p95 loop stall ms", "max loop stall ms"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent login throughput")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=passwords.BCRYPT_ROUNDS)
+    args = parser.parse_args()
+    main(args.logins, args.rounds)
@@ -0,0 +1,125 @@
+# backend/benchmarks/rate_limit_memory.py - Rate limit memory at 1M identifiers
+#
+# Sends one request from each of N unique identifiers through a limiter
+# and reports how much the process RSS grew. Each limiter runs in its own
+# subprocess so allocations from one don't hide the other's:
+#
+#   old    - validation.RateLimiter before the stores: a list of request
+#            timestamps per identifier, never deleted (copied below)
+#   store  - RateLimiter.is_allowed on the MemoryStore table, sized to
+#            hold every identifier
+#   bounded - the same at the default RATE_LIMIT_MAX_KEYS, evicting the
+#            stalest identifiers past it
+#
+#   python benchmarks/rate_limit_memory.py --identifiers 1000000
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import print_table
+
+
+class OldRateLimiter:
+    """validation.RateLimiter before the rate limit service"""
+
+    def __init__(self):
+        self.requests = {}
+        self.blocked_ips = {}
+
+    def is_allowed(self, identifier: str, max_requests: int = 10, window: int = 60) -> bool:
+        current_time = time.time()
+        if identifier in self.blocked_ips:
+            if current_time < self.blocked_ips[identifier]:
+                return False
+            else:
+                del self.blocked_ips[identifier]
+        if identifier not in self.requests:
+            self.requests[identifier] = []
+        self.requests[identifier] = [
+            req_time for req_time in self.requests[identifier]
+            if current_time - req_time < window
+        ]
+        if len(self.requests[identifier]) >= max_requests:
+            block_duration = min(300 * (len(self.requests[identifier]) // max_requests), 3600)
+            self.blocked_ips[identifier] = current_time + block_duration
+            return False
+        self.requests[identifier].append(current_time)
+        return True
+
+
+def _rss_kib() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not available")
+
+
+def _identifier(i: int) -> str:
+    return f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+def run_old(count: int):
+    limiter = OldRateLimiter()
+    before = _rss_kib()
+    for i in range(count):
+        limiter.is_allowed(_identifier(i))
+    return before, _rss_kib(), len(limiter.requests)
+
+
+def run_store(count: int, bounded: bool = False):
+    from middleware.rate_limit_store import MAX_KEYS, MemoryStore
+    from middleware.rate_limiter import RateLimiter
+
+    with tempfile.TemporaryDirectory() as directory:
+        max_keys = MAX_KEYS if bounded else max(count, MAX_KEYS)
+        store = MemoryStore(os.path.join(directory, "state.json"), max_keys=max_keys)
+        limiter = RateLimiter(store)
+        before = _rss_kib()
+
+        async def run():
+            for i in range(count):
+                await limiter.is_allowed(_identifier(i))
+
+        asyncio.run(run())
+        return before, _rss_kib(), len(store)
+
+
+def child(variant: str, count: int):
+    if variant == "old":
+        before, after, tracked = run_old(count)
+    else:
+        before, after, tracked = run_store(count, bounded=variant == "bounded")
+    print(before, after, tracked)
+
+
+def main(count: int):
+    rows = []
+    for variant, label in (
+        ("old", "timestamp lists"),
+        ("store", "MemoryStore table"),
+        ("bounded", "MemoryStore, default max keys"),
+    ):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--identifiers", str(count), "--child", variant],
+            capture_output=True, text=True, check=True
+        )
+        before, after, tracked = map(int, result.stdout.split()[-3:])
+        growth = (after - before) / 1024
+        rows.append([label, tracked, f"{growth:.0f}", f"{(after - before) * 1024 / max(tracked, 1):.0f}"])
+    print_table(["limiter", "identifiers tracked", "RSS growth MiB", "bytes/identifier"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate limiter memory per identifier")
+    parser.add_argument("--identifiers", type=int, default=1000000)
+    parser.add_argument("--child", choices=("old", "store", "bounded"))
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.identifiers)
+    else:
+        main(args.identifiers)
@@ -0,0 +1,137 @@
+# backend/benchmarks/rate_limiter.py - Auth rate limiter at 1M distinct keys
+#
+# Drives the limiter the way the rate_limit decorator does (check, then
+# record a failed attempt) for N distinct client keys, then times a
+# snapshot of the whole table and how long it holds up the event loop.
+# For comparison, the old limiter (copied below) rewrote its JSON file on
+# every recorded attempt, so its cost per attempt is measured with the
+# table pre-filled to a few sizes.
+#
+#   python benchmarks/rate_limiter.py --keys 1000000
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from common import print_table
+
+from middleware.rate_limit_store import MemoryStore
+from middleware.rate_limiter import RateLimiter
+
+OLD_SIZES = (1000, 10000, 100000)
+
+
+class OldRateLimiter:
+    """The attempt bookkeeping of middleware/rate_limiter.py before the stores"""
+
+    def __init__(self, storage_file: str):
+        self.storage_file = storage_file
+        self.attempts = {}
+
+    def save_to_file(self):
+        with open(self.storage_file, 'w') as f:
+            json.dump(self.attempts, f)
+
+    def is_rate_limited(self, key: str, max_attempts: int, window_minutes: int):
+        current_time = time.time()
+        if key not in self.attempts:
+            self.attempts[key] = {
+                'count': 0,
+                'reset_time': current_time + (window_minutes * 60),
+                'blocked_until': None,
+                'block_level': 0
+            }
+        client_data = self.attempts[key]
+        if client_data.get('blocked_until') and current_time < client_data['blocked_until']:
+            return True, {}
+        if current_time > client_data['reset_time']:
+            client_data['count'] = 0
+            client_data['reset_time'] = current_time + (window_minutes * 60)
+            client_data['blocked_until'] = None
+        if client_data['count'] >= max_attempts:
+            client_data['blocked_until'] = current_time + 300
+            client_data['block_level'] = client_data.get('block_level', 0) + 1
+            self.save_to_file()
+            return True, {}
+        return False, {}
+
+    def record_attempt(self, key: str, success: bool = False):
+        client_data = self.attempts[key]
+        client_data['count'] += 1
+        self.save_to_file()
+
+
+def _key(i: int) -> str:
+    return f"login:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:{i >> 24}"
+
+
+async def _max_stall(coro) -> float:
+    """Run coro and return the longest the event loop went without a turn, in ms"""
+    loop = asyncio.get_running_loop()
+    stalls, done = [0.0], asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = loop.time() + 0.001
+            await asyncio.sleep(0.001)
+            stalls.append(max(0.0, loop.time() - expected) * 1000)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.005)
+    await coro
+    done.set()
+    await task
+    return max(stalls)
+
+
+async def new_limiter(count: int, directory: str):
+    store = MemoryStore(os.path.join(directory, "new.json"), max_keys=count)
+    limiter = RateLimiter(store)
+    rows = []
+    for label in ("first attempt", "repeat attempt"):
+        start = time.perf_counter()
+        for i in range(count):
+            await limiter.is_rate_limited(_key(i), 5, 15)
+            await limiter.record_attempt(_key(i), window_minutes=15)
+        elapsed = time.perf_counter() - start
+        rows.append([f"MemoryStore, {label}", count, f"{elapsed / count * 1e6:.1f}"])
+
+    start = time.perf_counter()
+    stall = await _max_stall(store.save_to_file())
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(store.storage_file) / 2 ** 20
+    return rows, [len(store), f"{elapsed:.2f}", f"{stall:.0f}", f"{size:.0f}"]
+
+
+def old_limiter(directory: str):
+    rows = []
+    for size in OLD_SIZES:
+        limiter = OldRateLimiter(os.path.join(directory, f"old-{size}.json"))
+        for i in range(size):
+            limiter.is_rate_limited(_key(i), 5, 15)
+        samples = max(3, min(200, 2000000 // size))
+        start = time.perf_counter()
+        for i in range(samples):
+            limiter.is_rate_limited(_key(i), 5, 15)
+            limiter.record_attempt(_key(i))
+        elapsed = time.perf_counter() - start
+        rows.append(["old limiter, file rewrite per attempt", size, f"{elapsed / samples * 1e6:.1f}"])
+    return rows
+
+
+def main(count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        rows, snapshot = asyncio.run(new_limiter(count, directory))
+        rows.extend(old_limiter(directory))
+    print_table(["path", "keys", "us per check+record"], rows)
+    print()
+    print_table(["snapshot keys", "seconds", "max loop stall ms", "MiB"], [snapshot])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate limiter cost at many keys")
+    parser.add_argument("--keys", type=int, default=1000000)
+    args = parser.parse_args()
+    main(args.keys)
@@ -0,0 +1,88 @@
+# backend/benchmarks/smtp_throughput.py - Newsletter sending throughput
+#
+# Sends the same newsletter to N recipients through the in-process test
+# SMTP server (tests/smtp_server.py) three ways: a fresh connection and
+# login per message as send_email used to, pooled sessions one message at
+# a time, and pooled batches as send_bulk_email does. ``--rtt`` delays
+# every server reply to model the network; the stand-in server speaks
+# plaintext, so the TLS handshake a real per-message connection also pays
+# is not included and the gap shown is a lower bound.
+#
+#   python benchmarks/smtp_throughput.py --messages 500 --rtt 0.005
+import argparse
+import os
+import smtplib
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from common import BACKEND_DIR, print_table
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "tests"))
+
+from smtp_server import SMTPTestServer  # noqa: E402
+from utils.smtp_pool import SMTPConnectionPool  # noqa: E402
+
+SENDER = "store@example.com"
+PASSWORD = "secret"
+BATCH_SIZE = 100
+
+
+def _message(to_email: str) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["From"] = SENDER
+    msg["To"] = to_email
+    msg["Subject"] = "Spring sale"
+    msg.attach(MIMEText("Everything is 20% off this week.", "plain"))
+    msg.attach(MIMEText("<p>Everything is <b>20% off</b> this week.</p>" * 20, "html"))
+    return msg
+
+
+def per_message_connections(port: int, recipients: list):
+    """send_email before the pool: connect, log in, send, quit"""
+    for to_email in recipients:
+        server = smtplib.SMTP("127.0.0.1", port)
+        server.login(SENDER, PASSWORD)
+        server.sendmail(SENDER, to_email, _message(to_email).as_string())
+        server.quit()
+
+
+def pooled_messages(port: int, recipients: list):
+    pool = SMTPConnectionPool("127.0.0.1", port, SENDER, PASSWORD, starttls=False)
+    for to_email in recipients:
+        pool.send_message(to_email, _message(to_email))
+    pool.close_all()
+
+
+def pooled_batches(port: int, recipients: list):
+    pool = SMTPConnectionPool("127.0.0.1", port, SENDER, PASSWORD, starttls=False)
+    for start in range(0, len(recipients), BATCH_SIZE):
+        batch = [(to_email, _message(to_email)) for to_email in recipients[start:start + BATCH_SIZE]]
+        assert pool.send_batch(batch) == []
+    pool.close_all()
+
+
+def main(count: int, rtt: float):
+    recipients = [f"subscriber{i}@example.com" for i in range(count)]
+    rows = []
+    for label, send in (
+        ("connection per message", per_message_connections),
+        ("pooled, one at a time", pooled_messages),
+        (f"pooled batches of {BATCH_SIZE}", pooled_batches),
+    ):
+        with SMTPTestServer(reply_delay=rtt) as server:
+            start = time.perf_counter()
+            send(server.port, recipients)
+            elapsed = time.perf_counter() - start
+        assert len(server.messages) == count
+        rows.append([label, server.connections, f"{elapsed:.2f}", f"{count / elapsed:.0f}"])
+    print_table(["path", "connections", "seconds", "msgs/sec"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SMTP newsletter throughput")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--rtt", type=float, default=0.002, help="seconds added before each server reply")
+    args = parser.parse_args()
+    main(args.messages, args.rtt)
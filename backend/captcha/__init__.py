@@ -1,4 +1,4 @@
 # backend/captcha/__init__.py
-from .verification import verify_recaptcha
+from .verification import verify_recaptcha, close_recaptcha_client
 
-__all__ = ['verify_recaptcha']
\ No newline at end of file
+__all__ = ['verify_recaptcha', 'close_recaptcha_client']
\ No newline at end of file
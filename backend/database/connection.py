@@ -6,4 +6,18 @@ MONGODB_URL = os.getenv("MONGODB_URL")
 
 # MongoDB connection
 client = motor.motor_asyncio.AsyncIOMotorClient(MONGODB_URL)
-db = client.ecommerce
\ No newline at end of file
+db = client.ecommerce
+
+_transactions_supported = None
+
+async def supports_transactions() -> bool:
+    """Check once whether the deployment (replica set / sharded) supports transactions"""
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await client.admin.command("hello")
+            _transactions_supported = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            print(f"⚠️ Could not detect transaction support: {e}")
+            _transactions_supported = False
+    return _transactions_supported
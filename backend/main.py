@@ -5,13 +5,16 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from datetime import datetime
+import asyncio
 import stripe
 import os
 
 from api import router as api_router
 from routes.admin_routes import router as admin_router
 from routes.notifications import router as notifications_router
+from routes.newsletter import router as newsletter_router
 from middleware.validation import rate_limiter, get_client_ip
+from utils.responses import FastJSONResponse
 
 # Configuration
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
@@ -26,6 +29,7 @@ app = FastAPI(
     description="E-commerce Platform API",
     docs_url=None,
     redoc_url=None,
+    default_response_class=FastJSONResponse,
 )
 
 # Add this BEFORE your router includes
@@ -46,6 +50,7 @@ async def handle_options(path: str):
 app.include_router(api_router, prefix="/api")
 app.include_router(admin_router)
 app.include_router(notifications_router, prefix="/api/notifications")
+app.include_router(newsletter_router, prefix="/api/newsletter")
 
 # Security middleware
 if ALLOWED_HOSTS:
@@ -83,7 +88,7 @@ app.add_middleware(
         "X-Requested-With",
         "Cache-Control"
     ],
-    expose_headers=["Set-Cookie"],  # Critical for cookie-based auth
+    expose_headers=["Set-Cookie", "X-Next-Cursor"],  # Cookie-based auth, cursor pagination
     max_age=600,
 )
 
@@ -205,6 +210,9 @@ async def not_found_handler(request: Request, exc: HTTPException):
     print(f"❌ 404 Not Found: {request.url}")
     return {"error": "Not found", "path": str(request.url), "message": "Endpoint not found"}
 
+# Long-running jobs started on startup and cancelled on shutdown
+background_tasks = []
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -218,10 +226,20 @@ async def startup_event():
         
         # Products indexes
         await db.products.create_index("category")
+        await db.products.create_index([("category", 1), ("_id", 1)])
+        # Bulk import upsert keys
+        await db.products.create_index("sku", sparse=True)
+        await db.products.create_index([("name", 1), ("category", 1)])
         await db.products.create_index("name")
         await db.products.create_index("price")
         await db.products.create_index([("name", "text"), ("description", "text")])
         
+        # Category tree: subtree lookups by ancestor path
+        await db.categories.create_index("ancestors")
+        
+        # Bulk update status documents, newest first
+        await db.bulk_updates.create_index("started_at")
+        
         # Users indexes
         await db.users.create_index("email", unique=True)
         await db.users.create_index("username", unique=True)
@@ -231,7 +249,22 @@ async def startup_event():
         await db.orders.create_index("user_id")
         await db.orders.create_index("status")
         await db.orders.create_index("created_at")
+        # Keyset pagination: (sort key, _id) per listing
+        await db.orders.create_index([("created_at", -1), ("_id", -1)])
+        await db.orders.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+        await db.orders.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
         await db.orders.create_index("order_number")
+        await db.orders.create_index("reservation_id", sparse=True)
+        
+        # Stock reservation holds
+        await db.products.create_index("holds.expires_at", sparse=True)
+        
+        # Email outbox
+        from utils.email_outbox import email_outbox
+        await email_outbox.create_indexes()
+        
+        # Shared rate limit store (no-op for the in-process backend)
+        await rate_limiter.store.create_indexes()
         
         # Cart indexes
         await db.cart.create_index("user_id")
@@ -275,9 +308,43 @@ async def startup_event():
     else:
         print(f"💳 Stripe: ❌ NOT CONFIGURED")
     
+    # Background jobs
+    from utils.inventory import reservation_sweeper
+    from utils.email_outbox import email_outbox
+    from utils.order_stats import order_stats_reconciler
+    from utils.catalog_cache import catalog_cache
+    from utils.category_tree import category_tree_reconciler
+    background_tasks.append(asyncio.create_task(reservation_sweeper()))
+    background_tasks.append(asyncio.create_task(email_outbox.run()))
+    background_tasks.append(asyncio.create_task(order_stats_reconciler()))
+    background_tasks.append(asyncio.create_task(catalog_cache.run()))
+    # Also builds the category tree on first start
+    background_tasks.append(asyncio.create_task(category_tree_reconciler()))
+    
+    background_tasks.append(asyncio.create_task(rate_limiter.run()))
+    
     print("=" * 50)
     print("🎯 Ready to handle requests!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs"""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    
+    await rate_limiter.close()
+    
+    from utils.email import smtp_pool
+    smtp_pool.close_all()
+    
+    from captcha import close_recaptcha_client
+    await close_recaptcha_client()
+    
+    from auth.passwords import shutdown_executor
+    shutdown_executor()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
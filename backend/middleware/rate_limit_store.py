@@ -0,0 +1,492 @@
+# backend/middleware/rate_limit_store.py - Rate limit state backends
+#
+# Counters are kept per key and per fixed window bucket (bucket =
+# int(now // window), aligned to the epoch so every worker agrees on the
+# boundaries). The limiter combines the current and previous bucket into a
+# sliding-window estimate. Block state (blocked_until, level) is stored per
+# key next to the counters.
+#
+# RATE_LIMIT_BACKEND picks the store:
+#   memory - this process only; snapshotted to disk for restarts (default)
+#   sqlite - shared by all workers on one host through a local database file
+#   mongo  - shared by all nodes through TTL collections in MongoDB
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Tuple
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+STATE_FILE = os.getenv("RATE_LIMIT_STATE_FILE", "/tmp/rate_limits.json")  # Render has /tmp for temp files
+SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/rate_limits.sqlite3")
+MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "200000"))
+MAINTENANCE_INTERVAL = 30
+STATE_TTL = 86400  # Forget keys (and their block level) after a day of inactivity
+SNAPSHOT_VERSION = 3
+INITIAL_CAPACITY = 1024  # Memory store table slots; a power of two
+EVICTION_SAMPLES = 5
+EVICTION_PROBES_PER_SAMPLE = 16  # Random probes allowed per sample before giving up
+SWEEP_CHUNK = 10000
+SNAPSHOT_CHUNK = 10000  # Entries per json.dumps call when writing a snapshot
+MAX_COUNT = 2 ** 32 - 1
+_EMPTY, _TOMBSTONE = 0, 1  # Reserved hash values in the memory store table
+
+
+class RateLimitStore:
+    """Backend interface; counts are returned as (previous bucket, current bucket)"""
+
+    # Whether several workers see the same state (enables local batching)
+    shared = False
+
+    async def hit(self, key: str, window: int, bucket: int, amount: int = 1) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    async def counts(self, key: str, window: int, bucket: int) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    async def get_block(self, key: str) -> Tuple[float, int]:
+        raise NotImplementedError
+
+    async def set_block(self, key: str, blocked_until: float, level: int):
+        raise NotImplementedError
+
+    async def reset(self, key: str, window: int, bucket: int):
+        raise NotImplementedError
+
+    async def create_indexes(self):
+        pass
+
+    async def run_maintenance(self):
+        """Periodic cleanup; runs as a background task"""
+        while True:
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+            try:
+                await self.cleanup()
+            except Exception as e:
+                print(f"⚠️ Rate limit store cleanup failed: {e}")
+
+    async def cleanup(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class MemoryStore(RateLimitStore):
+    """Per-process store with a fixed per-key footprint.
+
+    Keys are reduced to a 64-bit BLAKE2 digest and placed in an
+    open-addressing hash table whose columns are typed arrays, so a
+    tracked key costs ~37 bytes per table slot and no Python objects.
+    Once RATE_LIMIT_MAX_KEYS is reached, a new key evicts the least
+    recently seen of a few randomly sampled keys. The maintenance task
+    sweeps keys idle for STATE_TTL and writes an atomic snapshot (temp
+    file + rename) for restarts, never on the request path.
+    """
+
+    def __init__(self, storage_file: str = STATE_FILE, max_keys: int = MAX_KEYS):
+        if max_keys < 1:
+            raise ValueError(f"RATE_LIMIT_MAX_KEYS must be at least 1, got {max_keys}")
+        self.storage_file = storage_file
+        self.max_keys = max_keys
+        self._dirty = False
+        self._allocate_table(INITIAL_CAPACITY)
+        self.load_from_file()
+
+    def _allocate_table(self, capacity: int):
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._used = 0    # live keys
+        self._filled = 0  # live keys + tombstones
+        self._hashes = array("Q", bytes(8 * capacity))
+        self._bucket = array("q", bytes(8 * capacity))
+        self._count = array("I", bytes(4 * capacity))
+        self._prev_count = array("I", bytes(4 * capacity))
+        self._blocked_until = array("d", bytes(8 * capacity))
+        self._block_level = array("B", bytes(capacity))
+        self._last_seen = array("I", bytes(4 * capacity))  # Whole seconds are plenty for idle tracking
+
+    def _columns(self):
+        return (self._bucket, self._count, self._prev_count, self._blocked_until, self._block_level, self._last_seen)
+
+    def __len__(self):
+        return self._used
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        h = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        return h if h > _TOMBSTONE else h + 2
+
+    def _find(self, h: int) -> int:
+        hashes, mask = self._hashes, self._mask
+        slot = h & mask
+        while True:
+            current = hashes[slot]
+            if current == h:
+                return slot
+            if current == _EMPTY:
+                return -1
+            slot = (slot + 1) & mask
+
+    def _insert(self, h: int) -> int:
+        """Claim a slot for a hash known not to be in the table"""
+        if self._used >= self.max_keys:
+            self._evict_one()
+        if (self._filled + 1) * 10 > self._capacity * 7:
+            # Grow while the table fills up; otherwise just clear tombstones
+            self._resize(self._capacity * 2 if self._used * 10 > self._capacity * 35 // 10 else self._capacity)
+
+        hashes, mask = self._hashes, self._mask
+        slot = h & mask
+        while hashes[slot] > _TOMBSTONE:
+            slot = (slot + 1) & mask
+        if hashes[slot] == _EMPTY:
+            self._filled += 1
+        hashes[slot] = h
+        self._used += 1
+        for column in self._columns():
+            column[slot] = 0
+        return slot
+
+    def _release(self, slot: int):
+        self._hashes[slot] = _TOMBSTONE
+        self._used -= 1
+
+    def _resize(self, capacity: int):
+        old_hashes, old_columns = self._hashes, self._columns()
+        self._allocate_table(capacity)
+        hashes, columns, mask = self._hashes, self._columns(), self._mask
+        for old_slot, h in enumerate(old_hashes):
+            if h <= _TOMBSTONE:
+                continue
+            slot = h & mask
+            while hashes[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            hashes[slot] = h
+            for column, old_column in zip(columns, old_columns):
+                column[slot] = old_column[old_slot]
+            self._used += 1
+        self._filled = self._used
+
+    def _evict_one(self):
+        # Approximate LRU: the stalest of a few randomly sampled live keys.
+        # Probes are bounded so a sparse table can't keep us looping.
+        hashes, last_seen = self._hashes, self._last_seen
+        victim, sampled = -1, 0
+        for _ in range(EVICTION_SAMPLES * EVICTION_PROBES_PER_SAMPLE):
+            slot = random.randrange(self._capacity)
+            if hashes[slot] <= _TOMBSTONE:
+                continue
+            if victim < 0 or last_seen[slot] < last_seen[victim]:
+                victim = slot
+            sampled += 1
+            if sampled == EVICTION_SAMPLES:
+                break
+        if victim < 0:
+            # Unlucky probes: take the first live key, if there is one
+            victim = next((slot for slot, h in enumerate(hashes) if h > _TOMBSTONE), -1)
+            if victim < 0:
+                return
+        self._release(victim)
+
+    def _slot(self, key: str, bucket: int, create: bool = True) -> int:
+        h = self._hash(key)
+        slot = self._find(h)
+        if slot < 0:
+            if not create:
+                return -1
+            slot = self._insert(h)
+            self._bucket[slot] = bucket
+        elif bucket != self._bucket[slot]:
+            last_bucket = self._bucket[slot]
+            self._prev_count[slot] = self._count[slot] if bucket == last_bucket + 1 else 0
+            self._count[slot] = 0
+            self._bucket[slot] = bucket
+        self._last_seen[slot] = int(time.time())
+        return slot
+
+    def load_from_file(self):
+        """Restore the last snapshot, skipping entries that have since expired"""
+        try:
+            if not os.path.exists(self.storage_file):
+                return
+            with open(self.storage_file, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                return
+            cutoff = time.time() - STATE_TTL
+            entries = sorted((row for row in data["entries"] if row[6] > cutoff), key=lambda row: row[6])
+            for h, *values in entries[-self.max_keys:]:
+                slot = self._insert(h)
+                for column, value in zip(self._columns(), values):
+                    column[slot] = value
+        except Exception as e:
+            print(f"Failed to load rate limits: {e}")
+            self._allocate_table(INITIAL_CAPACITY)
+
+    async def hit(self, key, window, bucket, amount=1):
+        slot = self._slot(key, bucket)
+        self._count[slot] = min(self._count[slot] + amount, MAX_COUNT)
+        self._dirty = True
+        return self._prev_count[slot], self._count[slot]
+
+    async def counts(self, key, window, bucket):
+        slot = self._slot(key, bucket)
+        return self._prev_count[slot], self._count[slot]
+
+    async def get_block(self, key):
+        slot = self._find(self._hash(key))
+        if slot < 0:
+            return 0.0, 0
+        return self._blocked_until[slot], self._block_level[slot]
+
+    async def set_block(self, key, blocked_until, level):
+        slot = self._find(self._hash(key))
+        if slot < 0:
+            slot = self._slot(key, 0)
+        self._blocked_until[slot] = blocked_until
+        self._block_level[slot] = min(level, 255)
+        self._dirty = True
+
+    async def reset(self, key, window, bucket):
+        slot = self._slot(key, bucket, create=False)
+        if slot >= 0:
+            self._release(slot)
+            self._dirty = True
+
+    async def sweep(self):
+        """Release keys idle for longer than STATE_TTL, yielding to the loop between chunks"""
+        now = time.time()
+        cutoff = now - STATE_TTL
+        start = 0
+        while start < self._capacity:
+            # A resize between chunks just means the rest is swept next time
+            hashes, last_seen, blocked_until = self._hashes, self._last_seen, self._blocked_until
+            for slot in range(start, min(start + SWEEP_CHUNK, len(hashes))):
+                if hashes[slot] > _TOMBSTONE and last_seen[slot] < cutoff and blocked_until[slot] <= now:
+                    self._release(slot)
+                    self._dirty = True
+            start += SWEEP_CHUNK
+            await asyncio.sleep(0)
+            if hashes is not self._hashes:
+                break
+
+    def _write_snapshot(self, hashes: array, columns: tuple):
+        # Runs in a worker thread on copies taken on the loop
+        entries = [
+            [h, *(column[slot] for column in columns)]
+            for slot, h in enumerate(hashes) if h > _TOMBSTONE
+        ]
+        tmp_file = f"{self.storage_file}.tmp"
+        os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
+        with open(tmp_file, 'w') as f:
+            # json.dumps holds the GIL for the whole call; encoding in chunks
+            # lets the event loop run in between on large tables
+            f.write(f'{{"version":{SNAPSHOT_VERSION},"entries":[')
+            for start in range(0, len(entries), SNAPSHOT_CHUNK):
+                if start:
+                    f.write(",")
+                f.write(json.dumps(entries[start:start + SNAPSHOT_CHUNK], separators=(",", ":"))[1:-1])
+            f.write("]}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.storage_file)
+
+    async def save_to_file(self):
+        """Write a snapshot off the event loop if anything changed"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Copying the arrays is a memcpy; serialization happens in a thread
+        hashes = array("Q", self._hashes)
+        columns = tuple(array(column.typecode, column) for column in self._columns())
+        try:
+            await asyncio.to_thread(self._write_snapshot, hashes, columns)
+        except Exception as e:
+            self._dirty = True
+            print(f"Failed to save rate limits: {e}")
+
+    async def cleanup(self):
+        await self.sweep()
+        await self.save_to_file()
+
+    async def close(self):
+        await self.save_to_file()
+
+
+class SQLiteStore(RateLimitStore):
+    """Store shared by the workers of one host through a WAL-mode SQLite file.
+
+    Every increment is an upsert inside a BEGIN IMMEDIATE transaction, so
+    concurrent workers never lose counts. Calls run in a worker thread.
+    """
+
+    shared = True
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            "key TEXT NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (key, bucket))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_blocks ("
+            "key TEXT PRIMARY KEY, blocked_until REAL NOT NULL, level INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _transaction(self, func, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _read_counts(self, key, bucket):
+        rows = dict(self._conn.execute(
+            "SELECT bucket, count FROM rate_limit_counters WHERE key = ? AND bucket IN (?, ?)",
+            (key, bucket - 1, bucket)
+        ).fetchall())
+        return rows.get(bucket - 1, 0), rows.get(bucket, 0)
+
+    def _hit(self, key, window, bucket, amount):
+        self._conn.execute(
+            "INSERT INTO rate_limit_counters (key, bucket, count, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key, bucket) DO UPDATE SET count = count + excluded.count",
+            (key, bucket, amount, (bucket + 2) * window)
+        )
+        return self._read_counts(key, bucket)
+
+    def _set_block(self, key, blocked_until, level):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO rate_limit_blocks (key, blocked_until, level, expires_at) VALUES (?, ?, ?, ?)",
+            (key, blocked_until, level, blocked_until + STATE_TTL)
+        )
+
+    def _reset(self, key, bucket):
+        self._conn.execute("DELETE FROM rate_limit_counters WHERE key = ? AND bucket IN (?, ?)", (key, bucket - 1, bucket))
+        self._conn.execute("DELETE FROM rate_limit_blocks WHERE key = ?", (key,))
+
+    def _get_block(self, key):
+        row = self._conn.execute("SELECT blocked_until, level FROM rate_limit_blocks WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else (0.0, 0)
+
+    def _cleanup(self):
+        now = time.time()
+        self._conn.execute("DELETE FROM rate_limit_counters WHERE expires_at < ?", (now,))
+        self._conn.execute("DELETE FROM rate_limit_blocks WHERE expires_at < ?", (now,))
+
+    async def hit(self, key, window, bucket, amount=1):
+        return await asyncio.to_thread(self._transaction, self._hit, key, window, bucket, amount)
+
+    async def counts(self, key, window, bucket):
+        return await asyncio.to_thread(self._transaction, self._read_counts, key, bucket)
+
+    async def get_block(self, key):
+        return await asyncio.to_thread(self._transaction, self._get_block, key)
+
+    async def set_block(self, key, blocked_until, level):
+        await asyncio.to_thread(self._transaction, self._set_block, key, blocked_until, level)
+
+    async def reset(self, key, window, bucket):
+        await asyncio.to_thread(self._transaction, self._reset, key, bucket)
+
+    async def cleanup(self):
+        await asyncio.to_thread(self._transaction, self._cleanup)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MongoStore(RateLimitStore):
+    """Store shared by every node through two TTL collections.
+
+    ``rate_limit_counters`` holds one document per key and bucket, bumped
+    atomically with ``$inc`` + upsert; ``rate_limit_blocks`` one per
+    blocked key. MongoDB's TTL monitor removes expired documents.
+    """
+
+    shared = True
+
+    def __init__(self):
+        from database.connection import db
+        self.counters = db.rate_limit_counters
+        self.blocks = db.rate_limit_blocks
+
+    async def hit(self, key, window, bucket, amount=1):
+        from pymongo import ReturnDocument
+
+        current, previous = await asyncio.gather(
+            self.counters.find_one_and_update(
+                {"_id": f"{key}|{bucket}"},
+                {
+                    "$inc": {"count": amount},
+                    "$setOnInsert": {"expires_at": datetime.utcfromtimestamp((bucket + 2) * window)}
+                },
+                projection={"count": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            ),
+            self.counters.find_one({"_id": f"{key}|{bucket - 1}"}, {"count": 1})
+        )
+        return (previous or {}).get("count", 0), current["count"]
+
+    async def counts(self, key, window, bucket):
+        previous, current = await asyncio.gather(
+            self.counters.find_one({"_id": f"{key}|{bucket - 1}"}, {"count": 1}),
+            self.counters.find_one({"_id": f"{key}|{bucket}"}, {"count": 1})
+        )
+        return (previous or {}).get("count", 0), (current or {}).get("count", 0)
+
+    async def get_block(self, key):
+        block = await self.blocks.find_one({"_id": key})
+        if not block:
+            return 0.0, 0
+        return block["blocked_until"], block["level"]
+
+    async def set_block(self, key, blocked_until, level):
+        await self.blocks.update_one(
+            {"_id": key},
+            {"$set": {
+                "blocked_until": blocked_until,
+                "level": level,
+                "expires_at": datetime.utcfromtimestamp(blocked_until + STATE_TTL)
+            }},
+            upsert=True
+        )
+
+    async def reset(self, key, window, bucket):
+        await asyncio.gather(
+            self.counters.delete_many({"_id": {"$in": [f"{key}|{bucket - 1}", f"{key}|{bucket}"]}}),
+            self.blocks.delete_one({"_id": key})
+        )
+
+    async def create_indexes(self):
+        await self.counters.create_index("expires_at", expireAfterSeconds=0)
+        await self.blocks.create_index("expires_at", expireAfterSeconds=0)
+
+    async def run_maintenance(self):
+        # Expiry is handled by the TTL indexes
+        return
+
+
+def create_store(backend: str = RATE_LIMIT_BACKEND) -> RateLimitStore:
+    if backend == "sqlite":
+        return SQLiteStore()
+    if backend == "mongo":
+        return MongoStore()
+    return MemoryStore()
@@ -1,59 +1,55 @@
 # backend/middleware/rate_limiter.py
-import time
-import json
+#
+# Rate limiting service shared by every limited endpoint.
+#
+# Counters and blocks live in a pluggable store (see rate_limit_store):
+# in-process memory, a SQLite file shared by the workers of one host, or
+# MongoDB TTL collections shared by all nodes. Checks combine the current
+# and previous window into a sliding-window estimate.
+#
+# With a shared store, hot keys with a large budget are batched: while a
+# key is well below its limit, increments are counted locally and sent as
+# one aggregated $inc at most every RATE_LIMIT_BATCH_INTERVAL seconds.
+# Keys near their limit (and small limits like login) always go to the
+# store, so the budget holds across workers.
+import asyncio
+import functools
 import os
-from typing import Dict, Optional
+import time
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
-from collections import defaultdict
-from datetime import datetime, timedelta
+
+from middleware.rate_limit_store import create_store
+
+BATCH_INTERVAL = float(os.getenv("RATE_LIMIT_BATCH_INTERVAL", "1.0"))
+BATCH_MIN_LIMIT = 20  # Smaller budgets are always checked against the store
+BATCH_FRACTION = 0.5  # Stop batching once a key has used half its budget
+DEFAULT_WINDOW_MINUTES = 15
+BLOCK_TIMES = (300, 900, 3600, 86400)  # 5min, 15min, 1hr, 24hr
+
+
+def _estimate(prev_count: int, count: int, bucket: int, window: int, now: float) -> float:
+    """Attempts in the last `window` seconds, weighting the previous bucket by overlap"""
+    overlap = 1 - (now - bucket * window) / window
+    return prev_count * overlap + count
+
+
+class _LocalCount:
+    __slots__ = ("bucket", "prev_count", "count", "pending", "synced_at")
+
+    def __init__(self, bucket: int):
+        self.bucket = bucket
+        self.prev_count = 0
+        self.count = 0
+        self.pending = 0
+        self.synced_at = 0.0
+
 
 class RateLimiter:
-    def __init__(self):
-        # Use file-based storage for Render deployment
-        self.storage_file = "/tmp/rate_limits.json"  # Render has /tmp for temp files
-        self.attempts = {}
-        self.last_cleanup = time.time()
-        self.load_from_file()
-        
-    def load_from_file(self):
-        """Load rate limit data from file"""
-        try:
-            if os.path.exists(self.storage_file):
-                with open(self.storage_file, 'r') as f:
-                    self.attempts = json.load(f)
-        except Exception as e:
-            print(f"Failed to load rate limits: {e}")
-            self.attempts = {}
-    
-    def save_to_file(self):
-        """Save rate limit data to file"""
-        try:
-            # Clean old entries before saving
-            current_time = time.time()
-            if current_time - self.last_cleanup > 300:  # Clean every 5 minutes
-                self.cleanup_expired_entries()
-                self.last_cleanup = current_time
-            
-            os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.attempts, f)
-        except Exception as e:
-            print(f"Failed to save rate limits: {e}")
-    
-    def cleanup_expired_entries(self):
-        """Remove expired entries to prevent file growth"""
-        current_time = time.time()
-        expired_keys = []
-        
-        for key, data in self.attempts.items():
-            # Remove entries older than 24 hours
-            if data.get('reset_time', 0) < current_time - 86400:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.attempts[key]
-    
+    def __init__(self, store=None):
+        self.store = store if store is not None else create_store()
+        self._local = {}   # (key, window) -> _LocalCount; shared stores only
+        self._blocks = {}  # key -> blocked_until already seen by this worker
+
     def get_client_ip(self, request: Request) -> str:
         """Extract real client IP from headers for deployed environment"""
         # Check multiple headers that proxies might use
@@ -66,88 +62,187 @@ class RateLimiter:
             "forwarded-for",         # Some proxies
             "forwarded"              # RFC 7239
         ]
-        
+
         for header in headers_to_check:
             ip = request.headers.get(header)
             if ip:
                 # X-Forwarded-For can contain multiple IPs
                 return ip.split(",")[0].strip()
-        
+
         # Fallback to request client
         return request.client.host if request.client else "unknown"
-    
-    def is_rate_limited(self, key: str, max_attempts: int, window_minutes: int) -> tuple[bool, dict]:
+
+    def _known_block(self, key: str, now: float) -> float:
+        blocked_until = self._blocks.get(key)
+        if blocked_until is not None and blocked_until <= now:
+            del self._blocks[key]
+            return 0.0
+        return blocked_until or 0.0
+
+    async def _block(self, key: str, blocked_until: float, level: int):
+        self._blocks[key] = blocked_until
+        await self.store.set_block(key, blocked_until, level)
+
+    async def _both(self, first, second):
+        """Await two store calls; concurrently only when the store does I/O"""
+        if self.store.shared:
+            return await asyncio.gather(first, second)
+        # In-process calls never wait, and gather's tasks cost more than the lookups
+        return await first, await second
+
+    def _pending(self, key: str, window: int, bucket: int) -> int:
+        local = self._local.get((key, window))
+        return local.pending if local is not None and local.bucket == bucket else 0
+
+    async def _hit(self, key: str, window: int, limit: int, now: float) -> float:
+        """Count one attempt and return the sliding-window estimate including it"""
+        bucket = int(now // window)
+        if not self.store.shared:
+            prev_count, count = await self.store.hit(key, window, bucket)
+            return _estimate(prev_count, count, bucket, window, now)
+
+        local = self._local.get((key, window))
+        if local is None or local.bucket != bucket:
+            if local is not None and local.pending:
+                await self._flush_one(key, window, local)
+            local = self._local[(key, window)] = _LocalCount(bucket)
+        elif (limit >= BATCH_MIN_LIMIT and now - local.synced_at < BATCH_INTERVAL
+              and _estimate(local.prev_count, local.count + local.pending + 1, bucket, window, now) < limit * BATCH_FRACTION):
+            local.pending += 1
+            return _estimate(local.prev_count, local.count + local.pending, bucket, window, now)
+
+        # Take the batched increments along with this one
+        amount, local.pending = local.pending + 1, 0
+        try:
+            local.prev_count, local.count = await self.store.hit(key, window, bucket, amount)
+        except Exception:
+            local.pending += amount
+            raise
+        local.synced_at = now
+        return _estimate(local.prev_count, local.count + local.pending, bucket, window, now)
+
+    async def _flush_one(self, key: str, window: int, local: _LocalCount):
+        amount, local.pending = local.pending, 0
+        try:
+            await self.store.hit(key, window, local.bucket, amount)
+        except Exception:
+            local.pending += amount
+            raise
+
+    async def flush(self):
+        """Send batched increments to the shared store and drop stale local state"""
+        now = time.time()
+        for (key, window), local in list(self._local.items()):
+            if local.pending:
+                await self._flush_one(key, window, local)
+            elif local.bucket < int(now // window) - 1:
+                del self._local[(key, window)]
+        for key in [key for key, blocked_until in self._blocks.items() if blocked_until <= now]:
+            del self._blocks[key]
+
+    async def is_rate_limited(self, key: str, max_attempts: int, window_minutes: int) -> tuple[bool, dict]:
         """Check if key is rate limited"""
         current_time = time.time()
-        
-        if key not in self.attempts:
-            self.attempts[key] = {
-                'count': 0,
-                'reset_time': current_time + (window_minutes * 60),
-                'blocked_until': None,
-                'block_level': 0
-            }
-        
-        client_data = self.attempts[key]
-        
+        window = window_minutes * 60
+        bucket = int(current_time // window)
+
+        try:
+            blocked_until = self._known_block(key, current_time)
+            if not blocked_until:
+                (blocked_until, block_level), (prev_count, count) = await self._both(
+                    self.store.get_block(key),
+                    self.store.counts(key, window, bucket)
+                )
+        except Exception as e:
+            print(f"⚠️ Rate limit store unavailable: {e}")
+            return False, {}
+
         # Check if client is temporarily blocked
-        if client_data.get('blocked_until') and current_time < client_data['blocked_until']:
-            remaining_time = int(client_data['blocked_until'] - current_time)
+        if current_time < blocked_until:
+            self._blocks[key] = blocked_until
+            remaining_time = int(blocked_until - current_time)
             return True, {
                 'error': 'rate_limit_exceeded',
                 'message': f'Too many attempts. Try again in {remaining_time} seconds.',
                 'retry_after': remaining_time
             }
-        
-        # Reset window if expired
-        if current_time > client_data['reset_time']:
-            client_data['count'] = 0
-            client_data['reset_time'] = current_time + (window_minutes * 60)
-            client_data['blocked_until'] = None
-        
+
         # Check if limit exceeded
-        if client_data['count'] >= max_attempts:
+        count += self._pending(key, window, bucket)
+        if _estimate(prev_count, count, bucket, window, current_time) >= max_attempts:
             # Progressive blocking
-            block_times = [300, 900, 3600, 86400]  # 5min, 15min, 1hr, 24hr
-            block_level = min(client_data.get('block_level', 0), len(block_times) - 1)
-            block_duration = block_times[block_level]
-            
-            client_data['blocked_until'] = current_time + block_duration
-            client_data['block_level'] = client_data.get('block_level', 0) + 1
-            
-            self.save_to_file()
-            
+            block_duration = BLOCK_TIMES[min(block_level, len(BLOCK_TIMES) - 1)]
+            try:
+                await self._block(key, current_time + block_duration, block_level + 1)
+            except Exception as e:
+                print(f"⚠️ Rate limit store unavailable: {e}")
+
             return True, {
                 'error': 'rate_limit_exceeded',
                 'message': f'Too many attempts. Blocked for {block_duration // 60} minutes.',
                 'retry_after': block_duration
             }
-        
+
         return False, {}
-    
-    def record_attempt(self, key: str, success: bool = False):
+
+    async def record_attempt(self, key: str, success: bool = False, window_minutes: int = DEFAULT_WINDOW_MINUTES):
         """Record an attempt"""
-        current_time = time.time()
-        
-        if key not in self.attempts:
-            self.attempts[key] = {
-                'count': 0,
-                'reset_time': current_time + 900,  # 15 minutes default
-                'blocked_until': None,
-                'block_level': 0
-            }
-        
-        client_data = self.attempts[key]
-        
-        if success:
-            # Reset on successful auth
-            client_data['count'] = 0
-            client_data['blocked_until'] = None
-            client_data['block_level'] = 0
-        else:
-            client_data['count'] += 1
-        
-        self.save_to_file()
+        now = time.time()
+        window = window_minutes * 60
+        try:
+            if success:
+                # Reset on successful auth
+                self._blocks.pop(key, None)
+                self._local.pop((key, window), None)
+                await self.store.reset(key, window, int(now // window))
+            else:
+                await self._hit(key, window, 0, now)
+        except Exception as e:
+            print(f"⚠️ Rate limit store unavailable: {e}")
+
+    async def is_allowed(self, identifier: str, max_requests: int = 10, window: int = 60) -> bool:
+        """Count a request and tell whether it is within the limit, with progressive blocking"""
+        now = time.time()
+        if self._known_block(identifier, now):
+            return False
+
+        try:
+            (blocked_until, block_level), estimate = await self._both(
+                self.store.get_block(identifier),
+                self._hit(identifier, window, max_requests, now)
+            )
+            if now < blocked_until:
+                self._blocks[identifier] = blocked_until
+                return False
+            if estimate <= max_requests:
+                return True
+
+            # Progressive blocking: longer blocks for repeat offenders
+            await self._block(identifier, now + min(300 * (block_level + 1), 3600), block_level + 1)
+            return False
+        except Exception as e:
+            print(f"⚠️ Rate limit store unavailable: {e}")
+            return True
+
+    async def run(self):
+        """Flush batched counts and run store maintenance; meant to run as a background task"""
+        maintenance = asyncio.create_task(self.store.run_maintenance())
+        try:
+            while True:
+                await asyncio.sleep(BATCH_INTERVAL)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"⚠️ Rate limit flush failed: {e}")
+        finally:
+            maintenance.cancel()
+
+    async def close(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"⚠️ Rate limit flush failed: {e}")
+        await self.store.close()
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
@@ -156,6 +251,8 @@ rate_limiter = RateLimiter()
 def rate_limit(max_attempts: int, window_minutes: int, endpoint_name: str):
     """Decorator for rate limiting specific endpoints"""
     def decorator(func):
+        # Keep the endpoint signature visible to FastAPI
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Extract request from kwargs
             request = None
@@ -168,41 +265,41 @@ def rate_limit(max_attempts: int, window_minutes: int, endpoint_name: str):
                     if isinstance(value, Request):
                         request = value
                         break
-            
+
             if not request:
                 # If no request found, proceed without rate limiting
                 return await func(*args, **kwargs)
-            
+
             client_ip = rate_limiter.get_client_ip(request)
             key = f"{endpoint_name}:{client_ip}"
-            
+
             # Check rate limit
-            is_limited, error_data = rate_limiter.is_rate_limited(key, max_attempts, window_minutes)
+            is_limited, error_data = await rate_limiter.is_rate_limited(key, max_attempts, window_minutes)
             if is_limited:
                 raise HTTPException(status_code=429, detail=error_data)
-            
+
             # Record attempt
-            rate_limiter.record_attempt(key, success=False)
-            
+            await rate_limiter.record_attempt(key, success=False, window_minutes=window_minutes)
+
             try:
                 # Call the original function
                 result = await func(*args, **kwargs)
-                
+
                 # Record success for auth endpoints
                 if endpoint_name in ['login', '2fa'] and isinstance(result, dict):
                     if 'token' in result or 'requires_2fa' in result:
-                        rate_limiter.record_attempt(key, success=True)
+                        await rate_limiter.record_attempt(key, success=True, window_minutes=window_minutes)
                 elif endpoint_name == 'password_reset':
-                    rate_limiter.record_attempt(key, success=True)
-                
+                    await rate_limiter.record_attempt(key, success=True, window_minutes=window_minutes)
+
                 return result
-                
+
             except HTTPException as e:
                 # Don't record success for HTTP errors
                 raise e
             except Exception as e:
                 # Re-raise other exceptions
                 raise e
-        
+
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
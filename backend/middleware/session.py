@@ -131,31 +131,6 @@ class RequestSigner:
 session_manager = SecureSessionManager()
 request_signer = RequestSigner()
 
-# Updated dependencies
-async def get_current_user_from_session(request: Request):
-    """Get current user from session cookie"""
-    from database.connection import db
-    from bson import ObjectId
-    
-    try:
-        token = session_manager.get_session_token(request)
-        payload = session_manager.verify_session_token(token)
-        
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid session")
-        
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        return user
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Session verification error: {e}")
-        raise HTTPException(status_code=401, detail="Session verification failed")
-
 async def verify_request_signature(request: Request, body: str = ""):
     """Middleware to verify request signatures"""
     if request.method in ["POST", "PUT", "DELETE", "PATCH"]:
@@ -386,45 +386,8 @@ class SecureUserProfileUpdate(BaseModel):
             return SecurityValidator.validate_url(v)
         return v
 
-# Enhanced Rate Limiter with improved tracking
-class RateLimiter:
-    def __init__(self):
-        self.requests = {}
-        self.blocked_ips = {}
-    
-    def is_allowed(self, identifier: str, max_requests: int = 10, window: int = 60) -> bool:
-        """Enhanced rate limiting with progressive blocking"""
-        import time
-        current_time = time.time()
-        
-        # Check if IP is temporarily blocked
-        if identifier in self.blocked_ips:
-            if current_time < self.blocked_ips[identifier]:
-                return False
-            else:
-                del self.blocked_ips[identifier]
-        
-        if identifier not in self.requests:
-            self.requests[identifier] = []
-        
-        # Remove old requests outside the window
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier] 
-            if current_time - req_time < window
-        ]
-        
-        # Check if under the limit
-        if len(self.requests[identifier]) >= max_requests:
-            # Progressive blocking: longer blocks for repeat offenders
-            block_duration = min(300 * (len(self.requests[identifier]) // max_requests), 3600)
-            self.blocked_ips[identifier] = current_time + block_duration
-            return False
-        
-        # Add current request
-        self.requests[identifier].append(current_time)
-        return True
-
-rate_limiter = RateLimiter()
+# One limiter service for every endpoint; state lives in the configured store
+from middleware.rate_limiter import rate_limiter
 
 def get_client_ip(request) -> str:
     """Enhanced client IP extraction"""
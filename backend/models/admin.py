@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from enum import Enum
-from typing import Optional
+from typing import List, Literal, Optional, Union
 
 class OrderStatus(str, Enum):
     PENDING = "pending"
@@ -36,4 +36,19 @@ class LowStockProduct(BaseModel):
 class AdminDashboardResponse(BaseModel):
     statistics: AdminDashboardStats
     recent_orders: list[RecentOrder]
-    low_stock_products: list[LowStockProduct]
\ No newline at end of file
+    low_stock_products: list[LowStockProduct]
+
+class ProductFilter(BaseModel):
+    category_prefix: Optional[str] = None  # The category and all its subcategories
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    max_stock: Optional[int] = None  # Stock at or below this value
+    min_stock: Optional[int] = None
+
+class BulkProductUpdate(BaseModel):
+    product_ids: Optional[List[str]] = None
+    filter: Optional[ProductFilter] = None
+    update_type: Literal["price", "stock", "category"]
+    update_method: Literal["set", "increase", "decrease", "percentage"] = "set"
+    update_value: Union[float, str]
+    dry_run: bool = False
@@ -0,0 +1,162 @@
+# backend/models/views.py - Response schemas for read endpoints
+#
+# Each schema documents what a read endpoint returns and doubles as the
+# MongoDB projection for its query (``Schema.projection()``), so list views
+# only pull the fields the UI renders and detail views leave out internal
+# fields such as stock holds or 2FA secrets. Handlers return documents
+# through FastJSONResponse; the schemas are used as response_model for the
+# API docs and are not validated per request.
+import typing
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class View(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    @classmethod
+    def projection(cls, prefix: str = "") -> Dict[str, int]:
+        """Inclusion projection for this schema, nested models as dotted paths"""
+        fields = {}
+        for name, field in cls.model_fields.items():
+            path = prefix + (field.alias or name)
+            nested = _nested_view(field.annotation)
+            if nested is not None:
+                fields.update(nested.projection(path + "."))
+            else:
+                fields[path] = 1
+        return fields
+
+
+def _nested_view(annotation):
+    if isinstance(annotation, type) and issubclass(annotation, View):
+        return annotation
+    for arg in typing.get_args(annotation):
+        nested = _nested_view(arg)
+        if nested is not None:
+            return nested
+    return None
+
+
+# Products
+
+class ProductSummary(View):
+    """Product card in listings and search results"""
+    id: str = Field(alias="_id")
+    name: str
+    description: Optional[str] = None
+    price: float
+    category: Optional[str] = None
+    image_url: Optional[str] = None
+    stock: Optional[int] = None
+    stock_quantity: Optional[int] = None
+    rating: Optional[float] = None
+    review_count: Optional[int] = None
+    material: Optional[str] = None
+    origin: Optional[str] = None
+    gender: Optional[str] = None
+    tags: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+
+
+class ProductDetail(ProductSummary):
+    """Everything about a product except internal bookkeeping"""
+    model_config = ConfigDict(extra="allow")
+
+
+PRODUCT_DETAIL_PROJECTION = {"holds": 0, "created_by": 0}
+
+
+class ProductSearchResults(BaseModel):
+    products: List[ProductSummary]
+    count: int
+    next_cursor: Optional[str] = None
+
+
+# Orders
+
+class OrderItemProduct(View):
+    id: Optional[str] = None
+    name: str
+    price: float
+    image_url: Optional[str] = None
+
+
+class OrderItem(View):
+    product_id: str
+    quantity: int
+    product: OrderItemProduct
+
+
+class OrderSummary(View):
+    """Order row in the customer's order history; its detail modal reads the row too"""
+    id: str = Field(alias="_id")
+    order_number: Optional[str] = None
+    items: List[OrderItem]
+    total_amount: float
+    status: str
+    shipping_address: Optional[Dict[str, Any]] = None
+    payment_method: Optional[str] = None
+    created_at: datetime
+
+
+class AdminOrderSummary(OrderSummary):
+    """Order row in the admin order list"""
+    user_id: str
+
+
+class OrderDetail(AdminOrderSummary):
+    """Full order as shown on its own page"""
+    model_config = ConfigDict(extra="allow")
+
+
+ORDER_DETAIL_PROJECTION = {"reservation_id": 0}
+
+
+class CustomerInfo(BaseModel):
+    full_name: str
+    email: str
+    username: str
+    phone: str
+
+
+class AdminOrderRow(AdminOrderSummary):
+    user_info: Optional[CustomerInfo] = None
+
+
+class AdminOrderList(BaseModel):
+    orders: List[AdminOrderRow]
+    next_cursor: Optional[str] = None
+
+
+# Users
+
+class UserSummary(View):
+    """User row in the admin user list; never carries secrets"""
+    id: str = Field(alias="_id")
+    username: Optional[str] = None
+    email: str
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    is_admin: bool = False
+    email_verified: bool = False
+    two_factor_enabled: bool = False
+    created_at: Optional[datetime] = None
+
+
+class AdminUserRow(UserSummary):
+    order_count: int = 0
+    lifetime_spend: float = 0
+
+
+class AdminUserList(BaseModel):
+    users: List[AdminUserRow]
+    next_cursor: Optional[str] = None
+
+
+class AdminProductList(BaseModel):
+    products: List[ProductSummary]
+    next_cursor: Optional[str] = None
@@ -2,11 +2,20 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import Optional
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument
 
 from models.admin import OrderStatus, OrderStatusUpdate, AdminDashboardResponse
+from models.views import AdminOrderSummary
 from auth.dependencies import get_current_user, get_admin_user
 from database.connection import db
-from utils.email import send_email
+from utils.email_outbox import queue_email
+from utils.category_tree import LISTED
+from utils.customers import customer_lookup, customers_by_id
+from utils.dashboard import dashboard_snapshot
+from utils.order_stats import record_status_change
+from utils.pagination import cursor_scope, paginate
+from utils.responses import FastJSONResponse
+from utils.streaming import json_array, stream
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -15,22 +24,32 @@ async def get_all_orders(
     status: Optional[str] = None,
     limit: int = 50,
     skip: int = 0,
+    cursor: Optional[str] = None,
     admin_user: dict = Depends(get_admin_user)
 ):
-    """Get all orders for admin review"""
+    """Get all orders for admin review, newest first, paged by ``cursor``"""
     query = {}
     if status:
         query["status"] = status
     
-    cursor = db.orders.find(query).sort("created_at", -1).skip(skip).limit(limit)
+    limit = max(min(limit, 100), 1)
+    page, next_cursor = await paginate(
+        db.orders, query,
+        scope=cursor_scope("/admin/orders", status=status or ""),
+        limit=limit, cursor=cursor, skip=max(skip, 0),
+        sort_field="created_at", direction=DESCENDING,
+        projection=AdminOrderSummary.projection()
+    )
+    
+    # Resolve every customer on the page with one query
+    users = await customers_by_id({order["user_id"] for order in page}, ["email", "full_name", "phone"])
     orders = []
     
-    async for order in cursor:
-        # Get user info for each order
-        user = await db.users.find_one({"_id": ObjectId(order["user_id"])})
+    for order in page:
+        user = users.get(order["user_id"])
         
         order_data = {
-            "_id": str(order["_id"]),
+            "_id": order["_id"],
             "user_id": order["user_id"],
             "user_info": {
                 "email": user["email"] if user else "Unknown",
@@ -49,21 +68,26 @@ async def get_all_orders(
     # Get order count for pagination
     total_orders = await db.orders.count_documents(query)
     
-    return {
+    return FastJSONResponse({
         "orders": orders,
         "total": total_orders,
-        "has_more": (skip + limit) < total_orders
-    }
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor
+    })
 
 @router.get("/orders/{order_id}")
 async def get_order_details(order_id: str, admin_user: dict = Depends(get_admin_user)):
     """Get detailed order information for admin"""
-    order = await db.orders.find_one({"_id": ObjectId(order_id)})
-    if not order:
+    # Order and customer in one round trip
+    result = await db.orders.aggregate([
+        {"$match": {"_id": ObjectId(order_id)}},
+        customer_lookup(["email", "full_name", "phone", "address"])
+    ]).to_list(1)
+    if not result:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Get user info
-    user = await db.users.find_one({"_id": ObjectId(order["user_id"])})
+    order = result[0]
+    user = order["customer"][0] if order["customer"] else None
     
     order_data = {
         "_id": str(order["_id"]),
@@ -91,27 +115,24 @@ async def update_order_status(
     admin_user: dict = Depends(get_admin_user)
 ):
     """Update order status"""
-    # Check if order exists
-    order = await db.orders.find_one({"_id": ObjectId(order_id)})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Update order status
-    result = await db.orders.update_one(
+    # Update order status, keeping the previous version for stats and email
+    order = await db.orders.find_one_and_update(
         {"_id": ObjectId(order_id)},
         {
             "$set": {
-                "status": status_update.status,
+                "status": status_update.status.value,
                 "updated_at": datetime.now(timezone.utc)
             }
-        }
+        },
+        return_document=ReturnDocument.BEFORE
     )
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
     
-    if result.modified_count == 0:
-        raise HTTPException(status_code=400, detail="Failed to update order status")
+    await record_status_change(order, status_update.status.value)
     
     # Get user info for email notification
-    user = await db.users.find_one({"_id": ObjectId(order["user_id"])})
+    user = await db.users.find_one({"_id": ObjectId(order["user_id"])}, {"email": 1, "full_name": 1})
     
     # Send status update email to customer
     if user:
@@ -147,7 +168,7 @@ async def update_order_status(
         </html>
         """
         
-        await send_email(
+        await queue_email(
             user["email"], 
             f"Order Status Update - #{order_id}", 
             email_body
@@ -159,28 +180,31 @@ async def update_order_status(
 async def get_admin_dashboard(admin_user: dict = Depends(get_admin_user)):
     """Get admin dashboard statistics"""
     
+    snapshot = await dashboard_snapshot(
+        low_stock_limit=0,
+        low_stock_projection={"name": 1, "stock": 1, "category": 1}
+    )
+    by_status = snapshot["orders"]["by_status"]
+    
     # Get order statistics
-    total_orders = await db.orders.count_documents({})
-    pending_orders = await db.orders.count_documents({"status": "pending"})
-    processing_orders = await db.orders.count_documents({"status": "processing"})
-    shipped_orders = await db.orders.count_documents({"status": "shipped"})
+    total_orders = sum(stats["count"] for stats in by_status.values())
+    pending_orders = by_status.get("pending", {}).get("count", 0)
+    processing_orders = by_status.get("processing", {}).get("count", 0)
+    shipped_orders = by_status.get("shipped", {}).get("count", 0)
     
     # Get total revenue
-    revenue_pipeline = [
-        {"$match": {"status": {"$in": ["accepted", "processing", "shipped", "delivered"]}}},
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$total_amount"}}}
-    ]
-    revenue_result = await db.orders.aggregate(revenue_pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
+    total_revenue = sum(
+        by_status.get(status, {}).get("revenue", 0)
+        for status in ["accepted", "processing", "shipped", "delivered"]
+    )
     
     # Get recent orders
-    recent_orders_cursor = db.orders.find().sort("created_at", -1).limit(5)
     recent_orders = []
-    async for order in recent_orders_cursor:
-        user = await db.users.find_one({"_id": ObjectId(order["user_id"])})
+    for order in snapshot["orders"]["recent"]:
+        customer = order["customer"]
         recent_orders.append({
             "_id": str(order["_id"]),
-            "customer_name": user.get("full_name", "Unknown") if user else "Unknown",
+            "customer_name": customer.get("full_name", "Unknown") if customer else "Unknown",
             "total_amount": order["total_amount"],
             "status": order["status"],
             "created_at": order["created_at"]
@@ -188,7 +212,7 @@ async def get_admin_dashboard(admin_user: dict = Depends(get_admin_user)):
     
     # Get low stock products
     low_stock_products = []
-    async for product in db.products.find({"stock": {"$lt": 10}}):
+    for product in snapshot["products"]["low_stock"]:
         low_stock_products.append({
             "_id": str(product["_id"]),
             "name": product["name"],
@@ -210,18 +234,13 @@ async def get_admin_dashboard(admin_user: dict = Depends(get_admin_user)):
 
 @router.get("/categories")
 async def get_categories(admin_user: dict = Depends(get_admin_user)):
-    pipeline = [
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    categories = await db.products.aggregate(pipeline).to_list(None)
+    categories = db.categories.find(LISTED, {"product_count": 1}).sort("product_count", -1)
     
-    return {
-        "categories": [
-            {"name": cat["_id"], "product_count": cat["count"]} 
-            for cat in categories
-        ]
-    }
+    return stream(
+        json_array(categories, lambda cat: {"name": cat["_id"], "product_count": cat.get("product_count", 0)},
+                   prefix=b'{"categories":', suffix=b"}"),
+        name="categories"
+    )
 
 @router.get("/debug/products")
 async def debug_products(admin_user: dict = Depends(get_admin_user)):
@@ -1,17 +1,40 @@
 # backend/routes/admin_routes.py - Fixed version
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
 from typing import List, Optional
 from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument
 from datetime import datetime
-import re
 from urllib.parse import unquote
 from pydantic import BaseModel
 
 from auth.dependencies import get_admin_user
+from auth.user_cache import user_cache
 from database.connection import db
+from models.admin import BulkProductUpdate
+from models.views import (
+    AdminOrderList, AdminOrderSummary, AdminProductList, AdminUserList, ProductSummary, UserSummary
+)
+from utils.bulk_update import bulk_update_status, recent_bulk_updates, run_bulk_update
+from utils.catalog_cache import catalog_cache
+from utils.category_tree import LISTED, delete_subtree, ensure_category, list_categories, record_products
+from utils.customers import customers_by_id, order_totals_by_user
+from utils.dashboard import dashboard_snapshot
+from utils.order_stats import orders_by_status, record_orders_deleted, record_status_change, reconcile
+from utils.pagination import cursor_scope, paginate
+from utils.product_import import import_products
+from utils.responses import FastJSONResponse
+from utils.streaming import (
+    MEDIA_TYPES, STREAM_BATCH_SIZE, batched, csv_lines, json_array, json_string_field, ndjson, stream, stream_csv
+)
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+# Listings page by cursor (see utils.pagination)
+PAGE_SIZE = 100
+
+def _page_size(limit: int) -> int:
+    return max(min(limit, PAGE_SIZE), 1)
+
 # Product model for admin routes
 class Product(BaseModel):
     name: str
@@ -25,56 +48,44 @@ class Product(BaseModel):
 @router.get("/dashboard")
 async def get_dashboard_stats(admin_user: dict = Depends(get_admin_user)):
     try:
+        snapshot = await dashboard_snapshot()
+        by_status = snapshot["orders"]["by_status"]
+        
+        def status_count(status):
+            return by_status.get(status, {}).get("count", 0)
+        
         # Order statistics
-        total_orders = await db.orders.count_documents({})
-        pending_orders = await db.orders.count_documents({"status": "pending"})
-        processing_orders = await db.orders.count_documents({"status": "processing"})
-        shipped_orders = await db.orders.count_documents({"status": "shipped"})
-        delivered_orders = await db.orders.count_documents({"status": "delivered"})
+        total_orders = sum(stats["count"] for stats in by_status.values())
+        pending_orders = status_count("pending")
+        processing_orders = status_count("processing")
+        shipped_orders = status_count("shipped")
+        delivered_orders = status_count("delivered")
         
         # Revenue
-        revenue_pipeline = [{"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}]
-        revenue_result = await db.orders.aggregate(revenue_pipeline).to_list(1)
-        total_revenue = revenue_result[0]["total"] if revenue_result else 0
+        total_revenue = sum(stats["revenue"] for stats in by_status.values())
         
         # Users
-        total_users = await db.users.count_documents({})
-        admin_users = await db.users.count_documents({"is_admin": True})
+        total_users = snapshot["users"]["total"]
+        admin_users = snapshot["users"]["admins"]
         
         # Products
-        total_products = await db.products.count_documents({})
+        total_products = snapshot["products"]["total"]
         
-        # Recent orders (simplified to avoid complex aggregation issues)
+        # Recent orders, with the customer joined by the aggregation
         recent_orders = []
-        try:
-            cursor = db.orders.find({}).sort("created_at", -1).limit(5)
-            async for order in cursor:
-                order["_id"] = str(order["_id"])
-                # Get user info separately to avoid aggregation issues
-                if "user_id" in order:
-                    try:
-                        user = await db.users.find_one({"_id": ObjectId(order["user_id"])})
-                        if user:
-                            order["customer_name"] = user.get("full_name", "Unknown")
-                            order["customer_email"] = user.get("email", "Unknown")
-                    except:
-                        order["customer_name"] = "Unknown"
-                        order["customer_email"] = "Unknown"
-                recent_orders.append(order)
-        except Exception as e:
-            print(f"Recent orders error: {e}")
-            recent_orders = []
+        for order in snapshot["orders"]["recent"]:
+            order["_id"] = str(order["_id"])
+            customer = order.pop("customer")
+            if customer:
+                order["customer_name"] = customer.get("full_name", "Unknown")
+                order["customer_email"] = customer.get("email", "Unknown")
+            recent_orders.append(order)
         
         # Low stock products
         low_stock_products = []
-        try:
-            cursor = db.products.find({"stock": {"$lt": 10}}).limit(10)
-            async for product in cursor:
-                product["_id"] = str(product["_id"])
-                low_stock_products.append(product)
-        except Exception as e:
-            print(f"Low stock products error: {e}")
-            low_stock_products = []
+        for product in snapshot["products"]["low_stock"]:
+            product["_id"] = str(product["_id"])
+            low_stock_products.append(product)
         
         return {
             "statistics": {
@@ -101,12 +112,16 @@ async def get_dashboard_stats(admin_user: dict = Depends(get_admin_user)):
 @router.put("/products/{product_id}")
 async def update_product(product_id: str, product: Product, admin_user: dict = Depends(get_admin_user)):
     try:
-        result = await db.products.update_one(
+        previous = await db.products.find_one_and_update(
             {"_id": ObjectId(product_id)},
-            {"$set": product.dict()}
+            {"$set": {**product.dict(), "updated_at": datetime.utcnow()}},
+            projection={"category": 1, "stock": 1},
+            return_document=ReturnDocument.BEFORE
         )
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Product not found")
+        await record_products(removed=[previous], added=[product.dict()])
+        await catalog_cache.bump()
         return {"message": "Product updated"}
     except HTTPException:
         raise
@@ -116,9 +131,14 @@ async def update_product(product_id: str, product: Product, admin_user: dict = D
 @router.delete("/products/{product_id}")
 async def delete_product(product_id: str, admin_user: dict = Depends(get_admin_user)):
     try:
-        result = await db.products.delete_one({"_id": ObjectId(product_id)})
-        if result.deleted_count == 0:
+        deleted = await db.products.find_one_and_delete(
+            {"_id": ObjectId(product_id)},
+            projection={"category": 1, "stock": 1}
+        )
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Product not found")
+        await record_products(removed=[deleted])
+        await catalog_cache.bump()
         return {"message": "Product deleted"}
     except HTTPException:
         raise
@@ -126,50 +146,82 @@ async def delete_product(product_id: str, admin_user: dict = Depends(get_admin_u
         raise HTTPException(status_code=500, detail=f"Product delete error: {str(e)}")
 
 # Order management
-@router.get("/orders")
-async def get_all_orders(status: Optional[str] = None, admin_user: dict = Depends(get_admin_user)):
+async def _attach_customers(orders: list):
+    """Add user_info to each order, resolving every customer with one query"""
+    try:
+        users = await customers_by_id(
+            {order.get("user_id") for order in orders},
+            ["full_name", "email", "username", "phone"]
+        )
+    except Exception as e:
+        print(f"User lookup error for orders: {e}")
+        users = None
+    
+    for order in orders:
+        if "user_id" in order:
+            user = users.get(order["user_id"]) if users is not None else None
+            if user:
+                order["user_info"] = {
+                    "full_name": user.get("full_name", "Unknown"),
+                    "email": user.get("email", "Unknown"),
+                    "username": user.get("username", "Unknown"),
+                    "phone": user.get("phone", "Unknown")
+                }
+            else:
+                placeholder = "Unknown" if users is not None else "Error"
+                order["user_info"] = {
+                    "full_name": placeholder,
+                    "email": placeholder,
+                    "username": placeholder,
+                    "phone": placeholder
+                }
+
+async def _orders_with_customers(cursor):
+    """Every order from ``cursor`` with user_info, one customer query per batch"""
+    batch = []
+    async for order in cursor:
+        batch.append(order)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            await _attach_customers(batch)
+            for row in batch:
+                yield row
+            batch = []
+    await _attach_customers(batch)
+    for row in batch:
+        yield row
+
+@router.get("/orders", response_model=AdminOrderList)
+async def get_all_orders(
+    status: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[str] = None,
+    format: Optional[str] = None,
+    admin_user: dict = Depends(get_admin_user)
+):
+    """One page of orders, or with ``format=ndjson`` every matching order streamed"""
     try:
         query = {}
         if status:
             query["status"] = status
         
-        # Simplified query without complex aggregation
-        cursor = db.orders.find(query).sort("created_at", -1).limit(100)
-        orders = []
+        if format == "ndjson":
+            rows = db.orders.find(query, AdminOrderSummary.projection()).sort([("created_at", -1), ("_id", -1)])
+            return stream(ndjson(_orders_with_customers(batched(rows))), MEDIA_TYPES["ndjson"], name="orders")
+        
+        # Newest first, one page per cursor
+        orders, next_cursor = await paginate(
+            db.orders, query,
+            scope=cursor_scope("/api/admin/orders", status=status or ""),
+            limit=_page_size(limit), cursor=cursor,
+            sort_field="created_at", direction=DESCENDING,
+            projection=AdminOrderSummary.projection()
+        )
         
-        async for order in cursor:
-            order["_id"] = str(order["_id"])
-            
-            # Get user info separately to avoid aggregation issues
-            if "user_id" in order:
-                try:
-                    user = await db.users.find_one({"_id": ObjectId(order["user_id"])})
-                    if user:
-                        order["user_info"] = {
-                            "full_name": user.get("full_name", "Unknown"),
-                            "email": user.get("email", "Unknown"),
-                            "username": user.get("username", "Unknown"),
-                            "phone": user.get("phone", "Unknown")
-                        }
-                    else:
-                        order["user_info"] = {
-                            "full_name": "Unknown",
-                            "email": "Unknown",
-                            "username": "Unknown",
-                            "phone": "Unknown"
-                        }
-                except Exception as e:
-                    print(f"User lookup error for order {order['_id']}: {e}")
-                    order["user_info"] = {
-                        "full_name": "Error",
-                        "email": "Error",
-                        "username": "Error",
-                        "phone": "Error"
-                    }
-            
-            orders.append(order)
-        
-        return {"orders": orders}
+        await _attach_customers(orders)
+        
+        return FastJSONResponse({"orders": orders, "next_cursor": next_cursor})
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Orders fetch error: {e}")
         raise HTTPException(status_code=500, detail=f"Orders fetch error: {str(e)}")
@@ -184,14 +236,18 @@ async def update_order_status(order_id: str, status_data: dict, admin_user: dict
         if new_status not in valid_statuses:
             raise HTTPException(status_code=400, detail="Invalid status")
         
-        result = await db.orders.update_one(
+        previous = await db.orders.find_one_and_update(
             {"_id": ObjectId(order_id)},
-            {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
+            {"$set": {"status": new_status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1, "total_amount": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if not previous:
             raise HTTPException(status_code=404, detail="Order not found")
         
+        await record_status_change(previous, new_status)
+        
         return {"message": "Order status updated"}
     except HTTPException:
         raise
@@ -199,20 +255,31 @@ async def update_order_status(order_id: str, status_data: dict, admin_user: dict
         raise HTTPException(status_code=500, detail=f"Status update error: {str(e)}")
 
 # User management
-@router.get("/users")
-async def get_all_users(admin_user: dict = Depends(get_admin_user)):
+@router.get("/users", response_model=AdminUserList)
+async def get_all_users(
+    limit: int = PAGE_SIZE,
+    cursor: Optional[str] = None,
+    admin_user: dict = Depends(get_admin_user)
+):
     try:
-        cursor = db.users.find({}, {"password": 0}).limit(100)
-        users = []
-        async for user in cursor:
-            user["_id"] = str(user["_id"])
-            try:
-                order_count = await db.orders.count_documents({"user_id": str(user["_id"])})
-                user["order_count"] = order_count
-            except:
-                user["order_count"] = 0
-            users.append(user)
-        return {"users": users}
+        users, next_cursor = await paginate(
+            db.users, {},
+            scope=cursor_scope("/api/admin/users"),
+            limit=_page_size(limit), cursor=cursor,
+            projection=UserSummary.projection()
+        )
+        
+        # Order count and spend for the whole page in one aggregation
+        try:
+            totals = await order_totals_by_user([str(user["_id"]) for user in users])
+        except Exception as e:
+            print(f"Order totals error: {e}")
+            totals = {}
+        for user in users:
+            user.update(totals.get(str(user["_id"]), {"order_count": 0, "lifetime_spend": 0}))
+        return FastJSONResponse({"users": users, "next_cursor": next_cursor})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Users fetch error: {str(e)}")
 
@@ -241,6 +308,7 @@ async def update_user(user_id: str, user_data: dict, admin_user: dict = Depends(
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        user_cache.invalidate(user_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -264,6 +332,7 @@ async def toggle_admin_status(user_id: str, admin_data: dict, admin_user: dict =
             {"_id": ObjectId(user_id)},
             {"$set": {"is_admin": is_admin}}
         )
+        user_cache.invalidate(user_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -281,10 +350,13 @@ async def delete_user(user_id: str, admin_user: dict = Depends(get_admin_user)):
             raise HTTPException(status_code=400, detail="Cannot delete your own account")
         
         # Also delete user's orders and cart items
+        deleted_orders = await orders_by_status({"user_id": user_id})
         await db.orders.delete_many({"user_id": user_id})
+        await record_orders_deleted(deleted_orders)
         await db.cart.delete_many({"user_id": user_id})
         
         result = await db.users.delete_one({"_id": ObjectId(user_id)})
+        user_cache.invalidate(user_id)
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -295,50 +367,132 @@ async def delete_user(user_id: str, admin_user: dict = Depends(get_admin_user)):
         raise HTTPException(status_code=500, detail=f"User delete error: {str(e)}")
 
 # Product listing for admin
-@router.get("/products")
-async def get_admin_products(admin_user: dict = Depends(get_admin_user)):
+@router.get("/products", response_model=AdminProductList)
+async def get_admin_products(
+    limit: int = PAGE_SIZE,
+    cursor: Optional[str] = None,
+    admin_user: dict = Depends(get_admin_user)
+):
     try:
-        cursor = db.products.find({}).limit(100)
-        products = []
-        async for product in cursor:
-            product["_id"] = str(product["_id"])
-            products.append(product)
-        return {"products": products}
+        products, next_cursor = await paginate(
+            db.products, {},
+            scope=cursor_scope("/api/admin/products"),
+            limit=_page_size(limit), cursor=cursor,
+            projection=ProductSummary.projection()
+        )
+        return FastJSONResponse({"products": products, "next_cursor": next_cursor})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Products fetch error: {str(e)}")
 
+# Exports
+PRODUCT_EXPORT_COLUMNS = ["id", "name", "category", "price", "stock", "image_url"]
+USER_EXPORT_COLUMNS = ["id", "username", "email", "full_name", "phone", "is_admin", "email_verified", "created_at"]
+
+def _export(lines, key: str, filename: str, format: Optional[str]):
+    """Raw CSV with ``format=csv``; otherwise the CSV inside {key: ...} as the dashboard expects"""
+    if format == "csv":
+        return stream_csv(lines, filename)
+    return stream(json_string_field(key, lines), name=filename)
+
+@router.get("/products/export")
+async def export_products(format: Optional[str] = None, admin_user: dict = Depends(get_admin_user)):
+    cursor = batched(db.products.find({}, {"holds": 0, "description": 0}).sort("_id", 1))
+    lines = csv_lines(cursor, PRODUCT_EXPORT_COLUMNS, lambda product: [
+        str(product["_id"]),
+        product.get("name"),
+        product.get("category"),
+        product.get("price"),
+        product.get("stock"),
+        product.get("image_url")
+    ])
+    return _export(lines, "csv_data", "inventory.csv", format)
+
+@router.get("/users/export")
+async def export_users(format: Optional[str] = None, admin_user: dict = Depends(get_admin_user)):
+    cursor = batched(db.users.find({}, UserSummary.projection()).sort("_id", 1))
+    lines = csv_lines(cursor, USER_EXPORT_COLUMNS, lambda user: [
+        str(user["_id"]),
+        user.get("username"),
+        user.get("email"),
+        user.get("full_name"),
+        user.get("phone"),
+        user.get("is_admin", False),
+        user.get("email_verified", False),
+        user["created_at"].isoformat() if isinstance(user.get("created_at"), datetime) else user.get("created_at")
+    ])
+    return _export(lines, "csv_data", "customers.csv", format)
+
+# Bulk import
+@router.post("/products/import")
+async def import_products_file(
+    file: UploadFile = File(...),
+    ordered: bool = False,
+    admin_user: dict = Depends(get_admin_user)
+):
+    """Upsert products from a CSV or NDJSON upload and report per-row errors"""
+    try:
+        report = await import_products(file, str(admin_user["_id"]), ordered=ordered)
+        if report["success_count"]:
+            await catalog_cache.bump()
+        return report
+    except Exception as e:
+        print(f"Product import error: {e}")
+        raise HTTPException(status_code=500, detail=f"Product import error: {str(e)}")
+    finally:
+        await file.close()
+
+# Bulk update
+@router.post("/products/bulk-update")
+async def bulk_update_products(update: BulkProductUpdate, admin_user: dict = Depends(get_admin_user)):
+    """Change price, stock or category of the selected or filtered products"""
+    try:
+        result = await run_bulk_update(update, started_by=str(admin_user["_id"]))
+        if result.get("modified_count"):
+            await catalog_cache.bump()
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Bulk update error: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk update error: {str(e)}")
+
+@router.get("/products/bulk-updates")
+async def get_bulk_updates(admin_user: dict = Depends(get_admin_user)):
+    """Latest bulk updates with their chunk progress, including running ones"""
+    try:
+        jobs = await recent_bulk_updates().to_list(None)
+        return FastJSONResponse({"bulk_updates": jobs})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk update status error: {str(e)}")
+
+@router.get("/products/bulk-updates/{job_id}")
+async def get_bulk_update(job_id: str, admin_user: dict = Depends(get_admin_user)):
+    try:
+        return FastJSONResponse(await bulk_update_status(job_id))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk update status error: {str(e)}")
+
 # Category management
 @router.get("/categories")
 async def get_categories(admin_user: dict = Depends(get_admin_user)):
-    try:
-        pipeline = [
-            {"$group": {
-                "_id": "$category", 
-                "count": {"$sum": 1}, 
-                "total_stock": {"$sum": "$stock"}
-            }},
-            {"$sort": {"_id": 1}}
-        ]
-        categories = await db.products.aggregate(pipeline).to_list(None)
-        
-        flat_categories = []
-        
-        for cat in categories:
-            if cat["_id"]:  # Filter out null categories
-                category_name = cat["_id"]
-                parts = category_name.split('/')
-                
-                flat_categories.append({
-                    "name": category_name,
-                    "product_count": cat["count"],
-                    "total_stock": cat["total_stock"],
-                    "level": len(parts) - 1,
-                    "parent": '/'.join(parts[:-1]) if len(parts) > 1 else None
-                })
-        
-        return {"categories": flat_categories}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Categories fetch error: {str(e)}")
+    # Errors surface while streaming, where they abort the response
+    def flat_category(node):
+        return {
+            "name": node["_id"],
+            "product_count": node.get("product_count", 0),
+            "total_stock": node.get("total_stock", 0),
+            "level": node.get("level", 0),
+            "parent": node.get("parent")
+        }
+    
+    return stream(
+        json_array(list_categories(listed_only=True), flat_category, prefix=b'{"categories":', suffix=b"}"),
+        name="categories"
+    )
 
 @router.post("/categories")
 async def create_category(category_data: dict, admin_user: dict = Depends(get_admin_user)):
@@ -356,22 +510,13 @@ async def create_category(category_data: dict, admin_user: dict = Depends(get_ad
             full_category_name = category_name
         
         # Check if category already exists
-        existing = await db.products.find_one({"category": full_category_name})
+        # (a hidden path parent can still be created explicitly)
+        existing = await db.categories.find_one({"_id": full_category_name, **LISTED}, {"_id": 1})
         if existing:
             raise HTTPException(status_code=400, detail="Category already exists")
         
-        # Create placeholder product
-        placeholder_product = {
-            "name": f"Sample {category_name} Product",
-            "description": "Placeholder product - edit or delete as needed",
-            "price": 0.01,
-            "category": full_category_name,
-            "image_url": "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=400&h=300&fit=crop",
-            "stock": 0,
-            "created_at": datetime.utcnow()
-        }
-        
-        await db.products.insert_one(placeholder_product)
+        await ensure_category(full_category_name)
+        await catalog_cache.bump()
         return {"success": True, "message": f"Category '{full_category_name}' created"}
     except HTTPException:
         raise
@@ -384,23 +529,16 @@ async def delete_category(category_name: str, admin_user: dict = Depends(get_adm
         # Properly decode URL-encoded category name
         category_name = unquote(category_name)
         
-        # Find all categories that start with this category name (including subcategories)
-        categories_to_delete = await db.products.distinct("category", {
-            "category": {"$regex": f"^{re.escape(category_name)}(/.*)?$"}
-        })
-        
-        if not categories_to_delete:
+        # The category and its subcategories, found by ancestor path
+        deleted = await delete_subtree(category_name)
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Category not found")
+        await catalog_cache.bump()
         
-        # Move all products in these categories to 'Uncategorized'
-        result = await db.products.update_many(
-            {"category": {"$in": categories_to_delete}},
-            {"$set": {"category": "Uncategorized"}}
-        )
-        
+        subcategories = len([path for path in deleted["paths"] if path != category_name])
         return {
             "success": True, 
-            "message": f"Category and {len(categories_to_delete)} subcategories deleted. {result.modified_count} products moved to 'Uncategorized'"
+            "message": f"Category and {subcategories} subcategories deleted. {deleted['moved_count']} products moved to 'Uncategorized'"
         }
     except HTTPException:
         raise
@@ -445,6 +583,29 @@ async def debug_categories(admin_user: dict = Depends(get_admin_user)):
     except Exception as e:
         return {"error": str(e), "total_products": 0, "sample_products": []}
 
+# Latency metrics
+@router.get("/metrics")
+async def get_metrics(admin_user: dict = Depends(get_admin_user)):
+    """Latency percentiles and cache statistics"""
+    from utils.metrics import metrics
+    return {
+        "timers": metrics.snapshot(),
+        "user_cache": user_cache.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+# Order statistics reconciliation
+@router.post("/order-stats/reconcile")
+async def reconcile_order_stats(admin_user: dict = Depends(get_admin_user)):
+    """Rebuild the materialized order stats and report the drift that was corrected"""
+    try:
+        result = await reconcile()
+        result["reconciled_at"] = result["reconciled_at"].isoformat()
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reconcile error: {str(e)}")
+
 # Health check
 @router.get("/health")
 async def admin_health(admin_user: dict = Depends(get_admin_user)):
@@ -0,0 +1,111 @@
+"""
+Newsletter Routes for Admin
+Sends newsletters to registered users and subscribers over pooled SMTP sessions
+"""
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from pydantic import BaseModel
+from datetime import datetime, timedelta
+import html
+
+from auth.dependencies import get_admin_user
+from database.connection import db
+from utils.email import send_bulk_email
+
+router = APIRouter()
+
+class NewsletterRequest(BaseModel):
+    subject: str
+    content: str
+    send_to_users: bool = True
+    send_to_subscribers: bool = True
+
+def render_newsletter(content: str) -> str:
+    """Wrap plain-text newsletter content in the store's email layout"""
+    paragraphs = "".join(
+        f"<p>{html.escape(block).replace(chr(10), '<br>')}</p>"
+        for block in content.strip().split("\n\n") if block.strip()
+    )
+    return f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
+        <div style="background: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+            {paragraphs}
+            <hr style="margin: 30px 0;">
+            <p style="color: #666; font-size: 12px;">You are receiving this email because you are a customer or subscriber of our store.</p>
+        </div>
+    </body>
+    </html>
+    """
+
+async def _collect_recipients(send_to_users: bool, send_to_subscribers: bool) -> list:
+    recipients = set()
+    if send_to_users:
+        recipients.update(await db.users.distinct("email", {"email": {"$nin": [None, ""]}}))
+    if send_to_subscribers:
+        recipients.update(await db.newsletter_subscribers.distinct("email", {"active": True}))
+    return sorted(recipients)
+
+async def _deliver_campaign(campaign_id, recipients: list, subject: str, body: str):
+    result = await send_bulk_email(recipients, subject, body)
+    await db.newsletter_campaigns.update_one(
+        {"_id": campaign_id},
+        {"$set": {"status": "sent", "completed_at": datetime.utcnow(), **result}}
+    )
+
+@router.post("/admin/send")
+async def send_newsletter(
+    newsletter: NewsletterRequest,
+    background_tasks: BackgroundTasks,
+    current_admin = Depends(get_admin_user)
+):
+    """
+    Send a newsletter to the selected recipient groups
+    Delivery runs in the background in batches over reused SMTP sessions
+    """
+    if not newsletter.subject.strip() or not newsletter.content.strip():
+        raise HTTPException(status_code=400, detail="Subject and content are required")
+
+    if not newsletter.send_to_users and not newsletter.send_to_subscribers:
+        raise HTTPException(status_code=400, detail="Select at least one recipient group")
+
+    try:
+        recipients = await _collect_recipients(newsletter.send_to_users, newsletter.send_to_subscribers)
+        body = render_newsletter(newsletter.content)
+
+        campaign = await db.newsletter_campaigns.insert_one({
+            "subject": newsletter.subject,
+            "recipient_count": len(recipients),
+            "status": "sending",
+            "admin_email": current_admin.get("email", "unknown"),
+            "created_at": datetime.utcnow()
+        })
+
+        background_tasks.add_task(_deliver_campaign, campaign.inserted_id, recipients, newsletter.subject, body)
+
+        return {
+            "success": True,
+            "message": f"Newsletter is being sent to {len(recipients)} recipients",
+            "data": {
+                "campaign_id": str(campaign.inserted_id),
+                "sent_count": len(recipients)
+            }
+        }
+    except Exception as e:
+        print(f"❌ Newsletter send error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to send newsletter: {str(e)}")
+
+@router.get("/admin/stats")
+async def get_newsletter_stats(current_admin = Depends(get_admin_user)):
+    """Get newsletter audience and campaign statistics"""
+    try:
+        since = datetime.utcnow() - timedelta(days=30)
+        return {
+            "success": True,
+            "data": {
+                "total_users": await db.users.count_documents({}),
+                "active_subscribers": await db.newsletter_subscribers.count_documents({"active": True}),
+                "recent_campaigns": await db.newsletter_campaigns.count_documents({"created_at": {"$gte": since}})
+            }
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch newsletter stats: {str(e)}")
@@ -0,0 +1,50 @@
+# backend/tests/conftest.py - Shared fixtures
+#
+# Tests that depend on MongoDB semantics (atomic conditional updates) run
+# against a real server: set TEST_MONGODB_URL, e.g.
+#
+#   TEST_MONGODB_URL=mongodb://localhost:27017 python -m pytest -q tests
+#
+# Each test gets a throwaway database that is dropped afterwards. Without
+# TEST_MONGODB_URL those tests are skipped.
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_MONGODB_URL = os.getenv("TEST_MONGODB_URL")
+
+
+@pytest.fixture
+def run_with_db(monkeypatch):
+    """Run ``test(db)`` on a fresh database, patched into the given modules' ``db``"""
+    if not TEST_MONGODB_URL:
+        pytest.skip("Set TEST_MONGODB_URL to run the MongoDB tests")
+    motor = pytest.importorskip("motor.motor_asyncio")
+    name = f"test_{uuid.uuid4().hex[:12]}"
+
+    def run(test, *modules):
+        async def main():
+            # A client per event loop; Motor clients can't cross loops
+            client = motor.AsyncIOMotorClient(TEST_MONGODB_URL, serverSelectionTimeoutMS=3000)
+            try:
+                await client.admin.command("ping")
+            except Exception as e:
+                client.close()
+                pytest.skip(f"MongoDB at TEST_MONGODB_URL is unreachable: {e}")
+            db = client[name]
+            for module in modules:
+                monkeypatch.setattr(module, "db", db)
+            try:
+                return await test(db)
+            finally:
+                await client.drop_database(name)
+                client.close()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,127 @@
+# backend/tests/smtp_server.py - Minimal in-process SMTP server for tests
+#
+# Speaks just enough plaintext ESMTP for smtplib (EHLO, AUTH PLAIN, MAIL,
+# RCPT, DATA, RSET, NOOP, QUIT) and records what it receives: how many
+# connections were opened and every accepted message with its recipients.
+# Recipients in ``refused`` get a 550. ``drop_connections()`` closes every
+# open session from the server side, like an idle timeout would.
+# ``reply_delay`` adds a pause before each reply to stand in for network
+# round trips.
+import socket
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        if self.server.reply_delay:
+            time.sleep(self.server.reply_delay)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.opened(self.request)
+        try:
+            self.reply("220 localhost ESMTP test")
+            recipients = []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode().strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    self.reply("250-localhost\r\n250 AUTH PLAIN")
+                elif verb == "HELO":
+                    self.reply("250 localhost")
+                elif verb == "AUTH":
+                    self.reply("235 Authentication successful")
+                elif verb == "MAIL":
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    address = command.split(":", 1)[1].strip().strip("<>")
+                    if address in server.refused:
+                        self.reply("550 Mailbox unavailable")
+                    else:
+                        recipients.append(address)
+                        self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = []
+                    for data_line in self.rfile:
+                        if data_line == b".\r\n":
+                            break
+                        data.append(data_line)
+                    else:
+                        return
+                    server.received(recipients, b"".join(data))
+                    self.reply("250 OK")
+                elif verb in ("RSET", "NOOP"):
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+        except OSError:
+            pass
+        finally:
+            server.closed(self.request)
+
+
+class SMTPTestServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, refused=(), reply_delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.refused = set(refused)
+        self.reply_delay = reply_delay
+        self.connections = 0
+        self.messages = []
+        self._open = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def opened(self, sock):
+        with self._lock:
+            self.connections += 1
+            self._open.add(sock)
+
+    def closed(self, sock):
+        with self._lock:
+            self._open.discard(sock)
+
+    def received(self, recipients, data: bytes):
+        with self._lock:
+            self.messages.append((list(recipients), data))
+
+    def recipients(self) -> list:
+        with self._lock:
+            return [address for recipients, _ in self.messages for address in recipients]
+
+    def drop_connections(self):
+        with self._lock:
+            sockets = list(self._open)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.drop_connections()
+        self.shutdown()
+        self.server_close()
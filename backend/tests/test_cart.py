@@ -0,0 +1,50 @@
+# backend/tests/test_cart.py - Cart hydration
+#
+# hydrate_cart must return the same line items the old per-row lookup did:
+# cart order kept, rows with a missing or malformed product skipped, and
+# only the fields a cart line renders read from the product.
+import pytest
+
+pytest.importorskip("motor")
+
+from bson import ObjectId  # noqa: E402
+
+from utils import cart  # noqa: E402
+
+
+def test_hydrate_cart_joins_products_in_cart_order(run_with_db):
+    async def test(db):
+        products = [
+            {"name": f"Product {i}", "price": 10.0 + i, "image_url": f"/img/{i}.png", "description": "x" * 500, "stock": 5}
+            for i in range(3)
+        ]
+        ids = (await db.products.insert_many(products)).inserted_ids
+        await db.products.update_one({"_id": ids[2]}, {"$unset": {"image_url": ""}})
+        rows = [
+            {"user_id": "u1", "product_id": str(ids[2]), "quantity": 1},
+            {"user_id": "u1", "product_id": str(ObjectId()), "quantity": 4},  # deleted product
+            {"user_id": "u1", "product_id": "not-an-id", "quantity": 2},
+            {"user_id": "u1", "product_id": str(ids[0]), "quantity": 3},
+            {"user_id": "u1", "product_id": str(ids[0]), "quantity": 1},  # same product twice
+            {"user_id": "u2", "product_id": str(ids[1]), "quantity": 9},
+        ]
+        row_ids = (await db.cart.insert_many(rows)).inserted_ids
+
+        items = await cart.hydrate_cart("u1")
+
+        assert [item["id"] for item in items] == [str(row_ids[0]), str(row_ids[3]), str(row_ids[4])]
+        assert [item["quantity"] for item in items] == [1, 3, 1]
+        assert items[0]["product"] == {"id": str(ids[2]), "name": "Product 2", "price": 12.0, "image_url": ""}
+        assert items[1]["product"] == {"id": str(ids[0]), "name": "Product 0", "price": 10.0, "image_url": "/img/0.png"}
+        assert items[1]["product_id"] == str(ids[0])
+
+    run_with_db(test, cart)
+
+
+def test_hydrate_cart_empty_and_unresolvable(run_with_db):
+    async def test(db):
+        assert await cart.hydrate_cart("nobody") == []
+        await db.cart.insert_one({"user_id": "u1", "product_id": "bogus", "quantity": 1})
+        assert await cart.hydrate_cart("u1") == []
+
+    run_with_db(test, cart)
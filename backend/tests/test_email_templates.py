@@ -0,0 +1,104 @@
+# backend/tests/test_email_templates.py - Precompiled email templates
+#
+# Every template renders without leftover placeholders, deployment
+# constants are baked in at load, and each message carries a plain-text
+# alternative derived from the same render.
+import asyncio
+import os
+import re
+
+import pytest
+
+pytest.importorskip("motor")
+
+for name, value in {
+    "EMAIL_USER": "store@example.com",
+    "EMAIL_PASSWORD": "secret",
+    "ADMIN_EMAIL": "admin@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+from utils import email  # noqa: E402
+from utils.email_templates import TEMPLATE_DIR, html_to_text, load_email_templates  # noqa: E402
+
+PLACEHOLDER = re.compile(r"\{[A-Za-z_]+\}")
+
+
+def test_every_template_renders_completely():
+    names = {os.path.splitext(filename)[0] for filename in os.listdir(TEMPLATE_DIR) if filename.endswith(".html")}
+    assert names == set(email.TEMPLATES)
+    for template in email.TEMPLATES.values():
+        body = template.render(**{field: f"<{field}>" for field in template.fields})
+        assert not PLACEHOLDER.search(body), template.name
+        for field in template.fields:
+            assert f"<{field}>" in body
+
+
+def test_constants_are_baked_in_at_load():
+    templates = load_email_templates({
+        "support_email": "help@example.com", "frontend_url": "https://shop.example.com",
+        "backend_url": "", "tracking_url": "", "admin_panel_url": "", "dashboard_url": ""
+    })
+    template = templates["order_confirmation"]
+    assert "support_email" not in template.fields
+    assert template.fields == {"user_name", "order_id", "total_amount", "sent_at", "items_html"}
+    body = template.render(user_name="Ann", order_id="42", total_amount="9.00", sent_at="now", items_html="")
+    assert "help@example.com" in body and "https://shop.example.com" in body
+
+
+def test_missing_value_is_an_error():
+    with pytest.raises(KeyError, match="user_name"):
+        email.TEMPLATES["password_reset"].render(reset_url="https://example.com/reset")
+
+
+def test_order_confirmation_renders_every_item(monkeypatch):
+    queued = []
+
+    async def queue_email(to_email, subject, body, kind=None):
+        queued.append((to_email, subject, body))
+        return True
+
+    monkeypatch.setattr(email, "queue_email", queue_email)
+    items = [
+        {"quantity": 2, "product": {"name": "Mug", "price": 4.5, "image_url": "/img/mug.png"}},
+        {"quantity": 1, "product": {"name": "Cap", "price": 12.0, "image_url": "https://cdn.example.com/cap.png"}},
+    ]
+    asyncio.run(email.send_order_confirmation_email("ann@example.com", "Ann", "A1", 21.0, items))
+
+    [(to_email, subject, body)] = queued
+    assert to_email == "ann@example.com" and "#A1" in subject
+    assert f'src="{email.FRONTEND_URL}/img/mug.png"' in body
+    assert 'src="https://cdn.example.com/cap.png"' in body
+    assert "$9.00" in body and "$12.00" in body and "$21.00" in body
+    assert not PLACEHOLDER.search(body)
+
+
+def test_message_has_plain_text_alternative():
+    body = email.TEMPLATES["verification"].render(user_name="Ann", verification_url="https://example.com/verify?t=1")
+    message = email._build_message("ann@example.com", "Verify", body)
+
+    assert message.get_content_type() == "multipart/alternative"
+    plain, html = message.get_payload()
+    assert (plain.get_content_type(), html.get_content_type()) == ("text/plain", "text/html")
+    text = plain.get_payload(decode=True).decode()
+    assert "Ann" in text and "https://example.com/verify?t=1" in text
+    assert "<" not in text
+
+
+def test_html_to_text():
+    body = """
+    <html><head><style>p { color: red; }</style></head>
+    <body>
+        <h1>Hello   &amp; welcome</h1>
+        <table><tr><td>Mug</td><td>2</td></tr><tr><td>Cap</td><td>1</td></tr></table>
+        <p>Visit <a href="https://example.com/orders">your orders</a><br>Thanks</p>
+    </body></html>
+    """
+    assert html_to_text(body) == (
+        "Hello & welcome\n"
+        "Mug 2\n"
+        "Cap 1\n"
+        "\n"
+        "Visit your orders (https://example.com/orders)\n"
+        "Thanks"
+    )
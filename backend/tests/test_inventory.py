@@ -0,0 +1,136 @@
+# backend/tests/test_inventory.py - Oversell stress tests for stock reservations
+#
+# Many reserve_stock calls race on the same SKUs. Stock must never go
+# negative, every unit must be either on a shelf or in a hold, and rolling
+# back or sweeping holds must give back exactly what was held.
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("fastapi")
+
+from bson import ObjectId  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+from utils import inventory  # noqa: E402
+
+CONCURRENCY = 300
+
+
+async def _product(db, stock: int) -> str:
+    result = await db.products.insert_one({"name": "Stress SKU", "price": 1.0, "stock": stock})
+    return str(result.inserted_id)
+
+
+async def _state(db, product_id: str):
+    product = await db.products.find_one({"_id": ObjectId(product_id)})
+    held = sum(hold["qty"] for hold in product.get("holds", []))
+    return product["stock"], held
+
+
+async def _reserve_all(carts):
+    """Fire every reservation at once; returns (rid, cart) for the ones that got stock"""
+    results = await asyncio.gather(
+        *(inventory.reserve_stock(cart) for cart in carts),
+        return_exceptions=True
+    )
+    granted = []
+    for cart, result in zip(carts, results):
+        if isinstance(result, HTTPException):
+            assert result.status_code == 400
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            granted.append((result, cart))
+    return granted
+
+
+def test_concurrent_reservations_never_oversell(run_with_db):
+    async def test(db):
+        stock = 120
+        product_id = await _product(db, stock)
+        rng = random.Random(3)
+        carts = [[{"product_id": product_id, "quantity": rng.randint(1, 3)}] for _ in range(CONCURRENCY)]
+
+        granted = await _reserve_all(carts)
+
+        remaining, held = await _state(db, product_id)
+        reserved = sum(cart[0]["quantity"] for _, cart in granted)
+        assert remaining >= 0
+        assert reserved == held == stock - remaining
+        # Stock only falls here, so what is left is too little for any rejected request
+        rejected = [cart[0]["quantity"] for cart in carts if all(cart is not c for _, c in granted)]
+        assert rejected and remaining < min(rejected)
+
+    run_with_db(test, inventory)
+
+
+def test_unit_reservations_sell_exactly_the_stock(run_with_db):
+    async def test(db):
+        stock = 75
+        product_id = await _product(db, stock)
+        carts = [[{"product_id": product_id, "quantity": 1}] for _ in range(CONCURRENCY)]
+
+        granted = await _reserve_all(carts)
+
+        assert len(granted) == stock
+        assert await _state(db, product_id) == (0, stock)
+
+    run_with_db(test, inventory)
+
+
+def test_partial_failures_roll_back_exactly(run_with_db):
+    async def test(db):
+        plenty = await _product(db, 1000)
+        scarce = await _product(db, 7)
+        carts = [
+            [{"product_id": plenty, "quantity": 2}, {"product_id": scarce, "quantity": 1}]
+            for _ in range(CONCURRENCY)
+        ]
+
+        granted = await _reserve_all(carts)
+
+        # Failed reservations gave the plentiful SKU back: only winners hold it
+        assert len(granted) == 7
+        assert await _state(db, scarce) == (0, 7)
+        assert await _state(db, plenty) == (1000 - 2 * 7, 2 * 7)
+
+        # Releasing everything restores the starting stock, even when repeated
+        await asyncio.gather(*(inventory.release_reservation(rid, cart) for rid, cart in granted))
+        await asyncio.gather(*(inventory.release_reservation(rid, cart) for rid, cart in granted))
+        assert await _state(db, scarce) == (7, 0)
+        assert await _state(db, plenty) == (1000, 0)
+
+    run_with_db(test, inventory)
+
+
+def test_sweep_restores_exactly_the_expired_holds(run_with_db):
+    async def test(db):
+        stock = 50
+        product_id = await _product(db, stock)
+        carts = [[{"product_id": product_id, "quantity": 2}] for _ in range(20)]
+        granted = await asyncio.gather(*(inventory.reserve_stock(cart, ttl_seconds=-1) for cart in carts))
+        live = await inventory.reserve_stock([{"product_id": product_id, "quantity": 3}])
+
+        # Five checkouts placed their order before crashing; their holds must stay sold
+        ordered = granted[:5]
+        await db.orders.insert_many([
+            {"reservation_id": rid, "created_at": datetime.utcnow() - timedelta(minutes=1)} for rid in ordered
+        ])
+
+        # Concurrent sweeps must not give the same hold back twice
+        released = await asyncio.gather(*(inventory.release_expired_reservations() for _ in range(4)))
+
+        remaining, held = await _state(db, product_id)
+        assert held == 3  # Only the live hold is left
+        assert remaining == stock - 3 - 2 * len(ordered)
+        assert sum(released) >= 15
+        assert await inventory.release_expired_reservations() == 0
+
+        product = await db.products.find_one({"_id": ObjectId(product_id)})
+        assert [hold["rid"] for hold in product["holds"]] == [live]
+
+    run_with_db(test, inventory)
@@ -0,0 +1,79 @@
+# backend/tests/test_passwords.py - Password hashing on the bcrypt pool
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("bcrypt")
+pytest.importorskip("motor")
+
+from fastapi import HTTPException  # noqa: E402
+
+from auth import passwords  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cheap_rounds(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+
+
+def test_hash_and_verify_roundtrip():
+    async def test():
+        hashed = await passwords.hash_password("correct horse")
+        assert hashed.startswith("$2b$04$")
+        assert await passwords.verify_password("correct horse", hashed)
+        assert not await passwords.verify_password("wrong horse", hashed)
+        assert not await passwords.verify_password("correct horse", "not-a-bcrypt-hash")
+
+    asyncio.run(test())
+
+
+def test_needs_rehash_follows_the_work_factor(monkeypatch):
+    hashed = passwords._hash("secret")
+    assert not passwords.needs_rehash(hashed)
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+    assert passwords.needs_rehash(hashed)
+    assert not passwords.needs_rehash("garbage")
+
+
+def test_backpressure_rejects_past_the_pending_limit(monkeypatch):
+    monkeypatch.setattr(passwords, "MAX_PENDING", 2)
+    release = threading.Event()
+
+    async def test():
+        busy = [asyncio.ensure_future(passwords._run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await passwords.hash_password("one too many")
+        assert rejected.value.status_code == 503
+        assert rejected.value.headers == {"Retry-After": "1"}
+
+        release.set()
+        await asyncio.gather(*busy)
+        # Slots are given back once the queued work finishes
+        assert passwords._pending == 0
+        assert await passwords.verify_password("ok", await passwords.hash_password("ok"))
+
+    asyncio.run(test())
+
+
+def test_login_rehashes_when_the_work_factor_changes(run_with_db, monkeypatch):
+    async def test(db):
+        old_hash = passwords._hash("secret")
+        user_id = (await db.users.insert_one({"email": "a@example.com", "password": old_hash})).inserted_id
+        user = await db.users.find_one({"_id": user_id})
+
+        # Same cost: the stored hash is left alone
+        assert await passwords.verify_and_upgrade(user, "secret")
+        assert (await db.users.find_one({"_id": user_id}))["password"] == old_hash
+
+        monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+        assert not await passwords.verify_and_upgrade(user, "wrong")
+        assert (await db.users.find_one({"_id": user_id}))["password"] == old_hash
+
+        assert await passwords.verify_and_upgrade(user, "secret")
+        new_hash = (await db.users.find_one({"_id": user_id}))["password"]
+        assert new_hash.startswith("$2b$05$")
+        assert await passwords.verify_password("secret", new_hash)
+
+    run_with_db(test, passwords)
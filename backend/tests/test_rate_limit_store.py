@@ -0,0 +1,154 @@
+# backend/tests/test_rate_limit_store.py - Bounded in-process rate limit table
+#
+# MemoryStore never holds more than max_keys identifiers, evicts the
+# stalest of its samples, sweeps idle keys (but not blocked ones) and
+# survives heavy churn of tombstones and resizes.
+import asyncio
+import random
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from middleware import rate_limit_store  # noqa: E402
+from middleware.rate_limit_store import INITIAL_CAPACITY, STATE_TTL, MemoryStore  # noqa: E402
+from middleware.rate_limiter import RateLimiter  # noqa: E402
+
+BUCKET = 1
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(10 ** 9)
+    monkeypatch.setattr(rate_limit_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store_file(tmp_path):
+    return str(tmp_path / "rate_limits.json")
+
+
+def _hit_all(store, keys):
+    async def run():
+        for key in keys:
+            await store.hit(key, 60, BUCKET)
+    asyncio.run(run())
+
+
+def test_max_keys_must_be_positive(store_file):
+    with pytest.raises(ValueError):
+        MemoryStore(store_file, max_keys=0)
+
+
+def test_store_stays_bounded(clock, store_file):
+    store = MemoryStore(store_file, max_keys=1000)
+    _hit_all(store, (f"ip-{i}" for i in range(20000)))
+    assert len(store) == 1000
+    capacity = store._capacity
+
+    # More churn reuses tombstoned slots instead of growing the table
+    _hit_all(store, (f"other-{i}" for i in range(20000)))
+    assert len(store) == 1000
+    assert store._capacity == capacity
+
+
+def test_eviction_takes_the_stalest_sample(clock, store_file, monkeypatch):
+    # With more samples than slots the approximation becomes exact LRU
+    monkeypatch.setattr(rate_limit_store, "EVICTION_SAMPLES", INITIAL_CAPACITY)
+    monkeypatch.setattr(rate_limit_store, "EVICTION_PROBES_PER_SAMPLE", 64)
+    store = MemoryStore(store_file, max_keys=8)
+    for i in range(8):
+        clock.now += 1
+        _hit_all(store, [f"ip-{i}"])
+    clock.now += 1
+    _hit_all(store, ["ip-0"])  # ip-1 is now the stalest
+
+    _hit_all(store, ["newcomer"])
+
+    assert len(store) == 8
+    assert store._find(store._hash("ip-1")) < 0
+    assert all(store._find(store._hash(f"ip-{i}")) >= 0 for i in (0, *range(2, 8)))
+
+
+def test_evict_one_terminates(store_file, monkeypatch):
+    store = MemoryStore(store_file, max_keys=1)
+    store._evict_one()  # Empty table: nothing to do
+    assert len(store) == 0
+
+    # A single key in a sparse table is found even when every probe misses
+    _hit_all(store, ["only"])
+    monkeypatch.setattr(rate_limit_store.random, "randrange", lambda n: (store._find(store._hash("only")) + 1) % n)
+    store._evict_one()
+    assert len(store) == 0
+
+
+def test_single_key_store(store_file):
+    store = MemoryStore(store_file, max_keys=1)
+    _hit_all(store, ["a", "b", "c"])
+    assert len(store) == 1
+    assert store._find(store._hash("c")) >= 0
+
+
+def test_sweep_releases_idle_keys_but_keeps_blocks(clock, store_file):
+    async def test():
+        store = MemoryStore(store_file)
+        for key in ("idle", "blocked", "active"):
+            await store.hit(key, 60, BUCKET)
+        await store.set_block("blocked", clock.now + STATE_TTL * 2, 3)
+        clock.now += STATE_TTL + 1
+        await store.hit("active", 60, BUCKET)
+
+        await store.sweep()
+
+        assert len(store) == 2
+        assert await store.get_block("idle") == (0.0, 0)
+        assert await store.get_block("blocked") == (clock.now + STATE_TTL - 1, 3)
+        assert await store.counts("active", 60, BUCKET) == (0, 2)
+
+    asyncio.run(test())
+
+
+def test_counts_survive_resizes_and_tombstones(clock, store_file):
+    async def test():
+        store = MemoryStore(store_file, max_keys=100000)
+        rng = random.Random(7)
+        expected = {}
+        for _ in range(20000):
+            key = f"ip-{rng.randrange(5000)}"
+            if rng.random() < 0.1:
+                await store.reset(key, 60, BUCKET)
+                expected.pop(key, None)
+            else:
+                await store.hit(key, 60, BUCKET)
+                expected[key] = expected.get(key, 0) + 1
+        assert len(store) == len(expected)
+        for key, count in expected.items():
+            assert await store.counts(key, 60, BUCKET) == (0, count)
+
+    asyncio.run(test())
+
+
+def test_bucket_rollover(clock, store_file):
+    async def test():
+        store = MemoryStore(store_file)
+        await store.hit("k", 60, 10, 4)
+        assert await store.counts("k", 60, 11) == (4, 0)
+        await store.hit("k", 60, 11)
+        assert await store.counts("k", 60, 13) == (0, 0)
+
+    asyncio.run(test())
+
+
+def test_injected_empty_store_is_kept(store_file):
+    store = MemoryStore(store_file)
+    assert len(store) == 0
+    assert RateLimiter(store).store is store
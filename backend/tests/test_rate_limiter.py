@@ -0,0 +1,141 @@
+# backend/tests/test_rate_limiter.py - Auth rate limiting on the in-process store
+#
+# The limiter keeps the progressive blocking ladder (5 min, 15 min, 1 h,
+# 24 h), estimates attempts over a sliding window from two buckets, and
+# persists state only through the periodic atomic snapshot.
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from middleware import rate_limit_store  # noqa: E402
+from middleware.rate_limit_store import MemoryStore  # noqa: E402
+from middleware.rate_limiter import BLOCK_TIMES, RateLimiter  # noqa: E402
+
+START = 900 * 10 ** 6  # Aligned to every window size used below
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(START)
+    monkeypatch.setattr(rate_limit_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / "rate_limits.json")
+
+
+def test_progressive_blocking(clock, state_file):
+    async def test():
+        limiter = RateLimiter(MemoryStore(state_file))
+        key = "login:203.0.113.7"
+        for expected in (*BLOCK_TIMES, BLOCK_TIMES[-1]):
+            # Old failures stay in the window for a while, so fewer may be needed
+            for _ in range(4):
+                limited, error = await limiter.is_rate_limited(key, 3, 15)
+                if limited:
+                    break
+                await limiter.record_attempt(key, window_minutes=15)
+            assert limited and error["retry_after"] == expected
+
+            # Still blocked just before the block ends
+            clock.now += expected - 1
+            limited, error = await limiter.is_rate_limited(key, 3, 15)
+            assert limited and error["retry_after"] == 1
+            clock.now += 2
+
+        # A successful login clears the ladder and the count
+        await limiter.record_attempt(key, success=True, window_minutes=15)
+        for _ in range(3):
+            assert await limiter.is_rate_limited(key, 3, 15) == (False, {})
+            await limiter.record_attempt(key, window_minutes=15)
+        limited, error = await limiter.is_rate_limited(key, 3, 15)
+        assert limited and error["retry_after"] == BLOCK_TIMES[0]
+
+    asyncio.run(test())
+
+
+def test_sliding_window_weights_the_previous_bucket(clock, state_file):
+    async def test():
+        limiter = RateLimiter(MemoryStore(state_file))
+        clock.now = START + 50
+        for _ in range(5):
+            await limiter.record_attempt("k", window_minutes=1)
+
+        # 6 s into the next minute, 90% of the previous bucket still counts: 4.5 < 5
+        clock.now = START + 66
+        assert await limiter.is_rate_limited("k", 5, 1) == (False, {})
+        await limiter.record_attempt("k", window_minutes=1)
+        assert (await limiter.is_rate_limited("k", 5, 1))[0]
+
+        # A fixed window would have forgotten the burst; half of it still counts at 30 s
+        other = RateLimiter(MemoryStore(state_file + ".2"))
+        clock.now = START + 50
+        for _ in range(8):
+            await other.record_attempt("k", window_minutes=1)
+        clock.now = START + 90
+        assert (await other.is_rate_limited("k", 4, 1))[0]
+
+    asyncio.run(test())
+
+
+def test_is_allowed_counts_and_blocks(clock, state_file):
+    async def test():
+        limiter = RateLimiter(MemoryStore(state_file))
+        assert [await limiter.is_allowed("ip", 3, 60) for _ in range(4)] == [True, True, True, False]
+        clock.now += 299
+        assert not await limiter.is_allowed("ip", 3, 60)
+        clock.now += 120  # Block over and the burst is out of the window
+        assert await limiter.is_allowed("ip", 3, 60)
+
+    asyncio.run(test())
+
+
+def test_snapshot_is_periodic_and_atomic(clock, state_file):
+    async def test():
+        store = MemoryStore(state_file)
+        limiter = RateLimiter(store)
+        for _ in range(2):
+            await limiter.record_attempt("login:a", window_minutes=15)
+        await limiter.record_attempt("login:b", window_minutes=15)
+        await store.set_block("login:c", clock.now + 600, 2)
+        # Attempts never touch the disk
+        assert not os.path.exists(state_file)
+
+        await store.save_to_file()
+        assert os.path.exists(state_file)
+        assert os.listdir(os.path.dirname(state_file)) == [os.path.basename(state_file)]
+        mtime = os.stat(state_file).st_mtime_ns
+        await store.save_to_file()  # Nothing changed, nothing written
+        assert os.stat(state_file).st_mtime_ns == mtime
+
+        restored = MemoryStore(state_file)
+        bucket = int(clock.now // 900)
+        assert len(restored) == 3
+        assert await restored.counts("login:a", 900, bucket) == (0, 2)
+        assert await restored.counts("login:b", 900, bucket) == (0, 1)
+        assert await restored.get_block("login:c") == (clock.now + 600, 2)
+
+        # Entries idle past STATE_TTL are not restored
+        clock.now += rate_limit_store.STATE_TTL + 1
+        assert len(MemoryStore(state_file)) == 0
+
+    asyncio.run(test())
+
+
+def test_corrupt_snapshot_starts_empty(clock, state_file):
+    with open(state_file, "w") as f:
+        f.write("{not json")
+    assert len(MemoryStore(state_file)) == 0
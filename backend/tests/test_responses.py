@@ -0,0 +1,97 @@
+# backend/tests/test_responses.py - orjson response encoding
+#
+# Motor documents go straight to dumps; the bytes must decode to what the
+# old path (str(_id) rewrite, jsonable_encoder, stdlib json) produced.
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("orjson")
+pytest.importorskip("fastapi")
+
+from bson import Decimal128, ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from utils.responses import FastJSONResponse, dumps  # noqa: E402
+
+
+def _order():
+    return {
+        "_id": ObjectId("65a1b2c3d4e5f60718293a4b"),
+        "user_id": "65a1b2c3d4e5f60718293a4c",
+        "items": [
+            {"product_id": "65a1b2c3d4e5f60718293a4d", "quantity": 2, "price": 19.99, "name": "Mug ☕"},
+            {"product_id": "65a1b2c3d4e5f60718293a4e", "quantity": 1, "price": Decimal("5"), "name": "Cap"},
+        ],
+        "total_amount": Decimal("44.98"),
+        "status": "pending",
+        "created_at": datetime(2024, 1, 15, 10, 30, 5, 123456),
+        "updated_at": datetime(2024, 1, 15, 10, 30),
+        "paid_at": datetime(2024, 1, 15, 10, 31, tzinfo=timezone.utc),
+        "shipping_address": None,
+        "tags": ["gift"],
+    }
+
+
+def _old_path(document: dict) -> bytes:
+    document = dict(document, _id=str(document["_id"]))
+    return JSONResponse(jsonable_encoder(document)).body
+
+
+def test_dumps_matches_the_old_encoding():
+    order = _order()
+    assert json.loads(dumps(order)) == json.loads(_old_path(order))
+    page = {"orders": [_order() for _ in range(3)], "total": 3, "has_more": False}
+    assert json.loads(dumps(page)) == {
+        "orders": [json.loads(_old_path(order))] * 3, "total": 3, "has_more": False
+    }
+
+
+def test_native_types():
+    decoded = json.loads(dumps({
+        "id": ObjectId("65a1b2c3d4e5f60718293a4b"),
+        "when": datetime(2024, 1, 15, 10, 30),
+        "whole": Decimal("3"),
+        "fraction": Decimal("2.50"),
+        "stored": Decimal128("12.34"),
+        "nested": [{"ids": [ObjectId("65a1b2c3d4e5f60718293a4c")]}],
+        7: "non-string key",
+    }))
+    assert decoded == {
+        "id": "65a1b2c3d4e5f60718293a4b",
+        "when": "2024-01-15T10:30:00",
+        "whole": 3,
+        "fraction": 2.5,
+        "stored": 12.34,
+        "nested": [{"ids": ["65a1b2c3d4e5f60718293a4c"]}],
+        "7": "non-string key",
+    }
+
+
+def test_models_sets_and_bytes():
+    class Item(BaseModel):
+        name: str
+        created_at: datetime
+
+    decoded = json.loads(dumps({
+        "item": Item(name="Mug", created_at=datetime(2024, 1, 1)),
+        "roles": {"admin"},
+        "raw": b"abc",
+    }))
+    assert decoded == {"item": {"name": "Mug", "created_at": "2024-01-01T00:00:00"}, "roles": ["admin"], "raw": "abc"}
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_fast_json_response():
+    response = FastJSONResponse([_order()], headers={"X-Next-Cursor": "abc"})
+    assert response.media_type == "application/json"
+    assert response.headers["x-next-cursor"] == "abc"
+    assert json.loads(response.body)[0]["_id"] == "65a1b2c3d4e5f60718293a4b"
@@ -0,0 +1,76 @@
+# backend/tests/test_smtp_pool.py - Pooled SMTP sessions against a local server
+#
+# Sessions are reused across messages, a refused recipient doesn't cost a
+# reconnect or abort the batch, and a session the server dropped is
+# replaced without sending anything twice.
+import time
+from email.mime.text import MIMEText
+
+from smtp_server import SMTPTestServer
+from utils.smtp_pool import SMTPConnectionPool
+
+
+def _pool(server, **kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool("127.0.0.1", server.port, "sender@example.com", "secret",
+                              timeout=5, starttls=False, **kwargs)
+
+
+def _messages(count: int, domain: str = "example.com"):
+    return [(f"user{i}@{domain}", MIMEText(f"Hello {i}")) for i in range(count)]
+
+
+def test_send_message_reuses_the_session():
+    with SMTPTestServer() as server:
+        pool = _pool(server)
+        for to_email, message in _messages(5):
+            pool.send_message(to_email, message)
+        pool.close_all()
+
+    assert server.connections == 1
+    assert server.recipients() == [f"user{i}@example.com" for i in range(5)]
+
+
+def test_batch_uses_one_session():
+    with SMTPTestServer() as server:
+        pool = _pool(server)
+        assert pool.send_batch(_messages(50)) == []
+        pool.close_all()
+
+    assert server.connections == 1
+    assert len(server.messages) == 50
+
+
+def test_refused_recipient_does_not_reconnect_or_abort():
+    with SMTPTestServer(refused={"user3@example.com"}) as server:
+        pool = _pool(server)
+        failures = pool.send_batch(_messages(6))
+        pool.close_all()
+
+    assert [to_email for to_email, _ in failures] == ["user3@example.com"]
+    assert server.connections == 1
+    assert server.recipients() == [f"user{i}@example.com" for i in range(6) if i != 3]
+
+
+def test_dropped_session_is_replaced_without_duplicates():
+    with SMTPTestServer() as server:
+        pool = _pool(server)
+        first, rest = _messages(1)[0], _messages(4, "later.example.com")
+        pool.send_message(*first)
+        server.drop_connections()
+        time.sleep(0.05)
+
+        assert pool.send_batch(rest) == []
+        pool.close_all()
+
+    assert server.connections == 2
+    assert server.recipients() == ["user0@example.com"] + [f"user{i}@later.example.com" for i in range(4)]
+
+
+def test_unreachable_server_reports_the_whole_batch():
+    with SMTPTestServer() as server:
+        port = server.port
+    pool = SMTPConnectionPool("127.0.0.1", port, "sender@example.com", "secret", timeout=1, starttls=False)
+
+    failures = pool.send_batch(_messages(3))
+
+    assert [to_email for to_email, _ in failures] == [f"user{i}@example.com" for i in range(3)]
@@ -0,0 +1,245 @@
+# backend/utils/bulk_update.py - Server-side bulk product updates
+#
+# A bulk update targets products by id or by filter (category subtree,
+# price range, stock range) and applies one change to all of them: set,
+# increase, decrease or percentage change of price or stock, or a category
+# move. The change is an aggregation-pipeline update, so MongoDB computes
+# each new value itself and the whole operation is a single update_many,
+# or one UpdateMany per chunk of ids when a long id list is given. A dry
+# run counts the matches and previews the first few results without
+# writing anything.
+#
+# ``stock`` is the available quantity: reservations (utils.inventory) take
+# units out of it into ``holds`` and give them back on release. A "set" of
+# stock is the on-hand quantity, so it is stored net of outstanding holds,
+# and a value below what is already held is rejected.
+#
+# Every run is recorded in ``bulk_updates``: the status document is updated
+# after each chunk, so a long run can be watched from another request, and
+# the per-chunk results are also returned to the caller.
+import re
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateMany
+
+from database.connection import db
+from middleware.validation import SecurityValidator
+from models.admin import BulkProductUpdate
+from utils.category_tree import refresh
+
+ID_CHUNK_SIZE = 1000
+PREVIEW_SIZE = 5
+MIN_PRICE = 0.01
+HELD = {"$sum": "$holds.qty"}  # Units reserved by checkouts in progress
+
+
+def build_filter(spec: BulkProductUpdate) -> dict:
+    query = {}
+    if spec.product_ids is not None:
+        invalid = [product_id for product_id in spec.product_ids if not ObjectId.is_valid(product_id)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid product id: {invalid[0]}")
+        query["_id"] = {"$in": [ObjectId(product_id) for product_id in spec.product_ids]}
+
+    criteria = spec.filter
+    if criteria:
+        if criteria.category_prefix:
+            query["category"] = {"$regex": f"^{re.escape(criteria.category_prefix)}(/|$)"}
+        price = {}
+        if criteria.min_price is not None:
+            price["$gte"] = criteria.min_price
+        if criteria.max_price is not None:
+            price["$lte"] = criteria.max_price
+        if price:
+            query["price"] = price
+        stock = {}
+        if criteria.min_stock is not None:
+            stock["$gte"] = criteria.min_stock
+        if criteria.max_stock is not None:
+            stock["$lte"] = criteria.max_stock
+        if stock:
+            query["stock"] = stock
+
+    if not query:
+        # Never rewrite the whole catalog by accident
+        raise HTTPException(status_code=400, detail="Select products or give a filter")
+    return query
+
+
+def new_value(spec: BulkProductUpdate):
+    """Aggregation expression for the updated field's new value"""
+    if spec.update_type == "category":
+        if spec.update_method != "set":
+            raise HTTPException(status_code=400, detail="Categories can only be set")
+        category = SecurityValidator.sanitize_string(str(spec.update_value), 100).strip()
+        if not category:
+            raise HTTPException(status_code=400, detail="Category is required")
+        return {"$literal": category}
+
+    try:
+        value = float(spec.update_value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Update value must be a number")
+    if value < 0 and spec.update_method != "percentage":
+        raise HTTPException(status_code=400, detail="Update value cannot be negative")
+
+    if spec.update_type == "price" and spec.update_method == "set" and value < MIN_PRICE:
+        raise HTTPException(status_code=400, detail=f"Price must be at least {MIN_PRICE}")
+
+    field = f"${spec.update_type}"
+    if spec.update_method == "set" and spec.update_type == "stock":
+        expression = {"$subtract": [value, HELD]}
+    elif spec.update_method == "set":
+        expression = {"$literal": value}
+    elif spec.update_method == "increase":
+        expression = {"$add": [field, value]}
+    elif spec.update_method == "decrease":
+        expression = {"$subtract": [field, value]}
+    else:
+        if value <= -100:
+            raise HTTPException(status_code=400, detail="Percentage change must be above -100")
+        expression = {"$multiply": [field, 1 + value / 100]}
+
+    if spec.update_type == "price":
+        return {"$max": [MIN_PRICE, {"$round": [expression, 2]}]}
+    return {"$max": [0, {"$toInt": {"$round": [expression, 0]}}]}
+
+
+async def _check_holds(spec: BulkProductUpdate, query: dict):
+    """Reject a stock "set" below the units already held for a product"""
+    if spec.update_type != "stock" or spec.update_method != "set":
+        return
+    value = round(float(spec.update_value))
+    held = await db.products.find_one(
+        {**query, "$expr": {"$gt": [HELD, value]}},
+        {"name": 1, "held": HELD}
+    )
+    if held is not None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Stock can't be set below the {held['held']} units reserved for {held.get('name', held['_id'])}"
+        )
+
+
+async def _preview(query: dict, field: str, expression: dict) -> list:
+    pipeline = [
+        {"$match": query},
+        {"$limit": PREVIEW_SIZE},
+        {"$project": {"name": 1, "before": f"${field}", "after": expression}}
+    ]
+    preview = []
+    async for row in db.products.aggregate(pipeline):
+        row["_id"] = str(row["_id"])
+        preview.append(row)
+    return preview
+
+
+async def _start_job(spec: BulkProductUpdate, total_chunks: int, started_by: Optional[str]) -> ObjectId:
+    now = datetime.utcnow()
+    result = await db.bulk_updates.insert_one({
+        "update_type": spec.update_type,
+        "update_method": spec.update_method,
+        "update_value": spec.update_value,
+        "status": "running",
+        "total_chunks": total_chunks,
+        "completed_chunks": 0,
+        "matched_count": 0,
+        "modified_count": 0,
+        "started_by": started_by,
+        "started_at": now,
+        "updated_at": now
+    })
+    return result.inserted_id
+
+
+async def _apply_chunk(job_id: ObjectId, query: dict, update: list, index: int, total: int) -> dict:
+    if total == 1:
+        result = await db.products.update_many(query, update)
+    else:
+        result = await db.products.bulk_write([UpdateMany(query, update)])
+    progress = {"chunk": index + 1, "matched_count": result.matched_count, "modified_count": result.modified_count}
+    await db.bulk_updates.update_one(
+        {"_id": job_id},
+        {
+            "$inc": {"completed_chunks": 1, "matched_count": result.matched_count, "modified_count": result.modified_count},
+            "$set": {"updated_at": datetime.utcnow()}
+        }
+    )
+    if total > 1:
+        print(f"📦 Bulk update {job_id}: chunk {index + 1}/{total} done")
+    return progress
+
+
+async def run_bulk_update(spec: BulkProductUpdate, started_by: Optional[str] = None) -> dict:
+    query = build_filter(spec)
+    expression = new_value(spec)
+    field = spec.update_type
+    await _check_holds(spec, query)
+
+    if spec.dry_run:
+        matched = await db.products.count_documents(query)
+        return {
+            "dry_run": True,
+            "matched_count": matched,
+            "preview": await _preview(query, field, expression)
+        }
+
+    # Stock and category changes move counts between category nodes
+    touched = await db.products.distinct("category", query) if field != "price" else []
+
+    update = [{"$set": {field: expression, "updated_at": datetime.utcnow()}}]
+    ids = query["_id"]["$in"] if "_id" in query else None
+    if ids is None or len(ids) <= ID_CHUNK_SIZE:
+        chunks = [query]
+    else:
+        chunks = [
+            {**query, "_id": {"$in": ids[start:start + ID_CHUNK_SIZE]}}
+            for start in range(0, len(ids), ID_CHUNK_SIZE)
+        ]
+
+    job_id = await _start_job(spec, len(chunks), started_by)
+    progress = []
+    try:
+        for index, chunk in enumerate(chunks):
+            progress.append(await _apply_chunk(job_id, chunk, update, index, len(chunks)))
+    except Exception as e:
+        await db.bulk_updates.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}}
+        )
+        raise
+    await db.bulk_updates.update_one(
+        {"_id": job_id},
+        {"$set": {"status": "completed", "finished_at": datetime.utcnow()}}
+    )
+
+    matched = sum(chunk["matched_count"] for chunk in progress)
+    modified = sum(chunk["modified_count"] for chunk in progress)
+    if modified and touched:
+        if field == "category":
+            touched.append(expression["$literal"])
+        await refresh(touched)
+    return {
+        "dry_run": False,
+        "job_id": str(job_id),
+        "matched_count": matched,
+        "modified_count": modified,
+        "chunks": progress
+    }
+
+
+async def bulk_update_status(job_id: str) -> dict:
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job id")
+    job = await db.bulk_updates.find_one({"_id": ObjectId(job_id)})
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk update not found")
+    return job
+
+
+def recent_bulk_updates(limit: int = 20):
+    """Cursor over the latest runs, newest first"""
+    return db.bulk_updates.find().sort("started_at", -1).limit(limit)
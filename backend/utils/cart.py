@@ -0,0 +1,55 @@
+# backend/utils/cart.py - Cart hydration helpers
+from typing import List
+from bson import ObjectId
+
+from database.connection import db
+
+# Only the product fields a cart line actually renders
+CART_PRODUCT_PROJECTION = {"name": 1, "price": 1, "image_url": 1}
+
+
+async def hydrate_cart(user_id: str, session=None) -> List[dict]:
+    """Load a user's cart with product details in two round trips.
+
+    The cart rows are read in one query and every referenced product is
+    fetched with a single ``$in`` lookup, so the cost does not grow with
+    the number of line items. Rows whose product no longer exists (or
+    whose id is malformed) are skipped, as before.
+    """
+    cart_rows = await db.cart.find({"user_id": user_id}, session=session).to_list(None)
+    if not cart_rows:
+        return []
+
+    product_ids = {
+        ObjectId(row["product_id"])
+        for row in cart_rows
+        if ObjectId.is_valid(row.get("product_id", ""))
+    }
+    products = {}
+    if product_ids:
+        cursor = db.products.find(
+            {"_id": {"$in": list(product_ids)}},
+            CART_PRODUCT_PROJECTION,
+            session=session
+        )
+        async for product in cursor:
+            products[str(product["_id"])] = product
+
+    cart_items = []
+    for row in cart_rows:
+        product = products.get(row.get("product_id"))
+        if not product:
+            continue
+        cart_items.append({
+            "id": str(row["_id"]),
+            "product_id": row["product_id"],
+            "quantity": row["quantity"],
+            "product": {
+                "id": str(product["_id"]),
+                "name": product["name"],
+                "price": product["price"],
+                "image_url": product.get("image_url", "")
+            }
+        })
+
+    return cart_items
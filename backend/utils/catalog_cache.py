@@ -0,0 +1,176 @@
+# backend/utils/catalog_cache.py - Read-through cache for catalog reads
+#
+# Product listings and product details are cached as ready-to-send JSON
+# bodies, so anonymous browsing is served without touching MongoDB or
+# re-serializing documents. Entries expire after CATALOG_CACHE_TTL seconds
+# and the least recently used ones are evicted beyond CATALOG_CACHE_SIZE
+# entries or CATALOG_CACHE_MAX_BYTES of bodies.
+#
+# Every cached body carries a strong ETag (a hash of the body), the time it
+# was built as Last-Modified and a public Cache-Control, so browsers and
+# CDNs revalidate with If-None-Match / If-Modified-Since and get a bodiless
+# 304 straight from the cache entry.
+#
+# Admin catalog writes call catalog_cache.bump(), which clears this worker
+# and increments a version counter in db.counters; every worker polls that
+# counter and clears itself when it moves. Checkout drops the detail
+# entries of the products it sold so their stock is not served stale.
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from database.connection import db
+from utils.responses import dumps
+
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "2000"))
+CATALOG_CACHE_MAX_BYTES = int(os.getenv("CATALOG_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+POLL_INTERVAL_SECONDS = float(os.getenv("CATALOG_CACHE_POLL_INTERVAL", "2"))
+VERSION_ID = "catalog_version"
+CACHE_CONTROL = os.getenv(
+    "CATALOG_CACHE_CONTROL",
+    f"public, max-age={int(CATALOG_CACHE_TTL)}, stale-while-revalidate=300"
+)
+
+
+def _not_modified(request: Optional[Request], headers: dict) -> bool:
+    if request is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+        return "*" in tags or headers["ETag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= headers["_built_at"]
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _response(request: Optional[Request], body: bytes, headers: dict) -> Response:
+    public = {name: value for name, value in headers.items() if not name.startswith("_")}
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=public)
+    return Response(content=body, media_type="application/json", headers=public)
+
+
+class CatalogCache:
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL, max_entries: int = CATALOG_CACHE_SIZE,
+                 max_bytes: int = CATALOG_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = None
+        self.generation = 0  # Bumped on clear; guards against caching reads that raced a write
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple, request: Request = None) -> Optional[Response]:
+        """Cached response for ``key``, or a 304 if ``request`` already has it"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        _, body, headers = entry
+        return _response(request, body, headers)
+
+    def set(self, key: tuple, content, headers: dict = None, generation: int = None,
+            request: Request = None) -> Response:
+        """Serialize ``content`` once, cache it and return it as a response.
+
+        Pass the ``generation`` read before querying the database; if the
+        catalog was invalidated meanwhile the result is returned uncached.
+        """
+        body = dumps(content)
+        built_at = int(time.time())
+        headers = {
+            **(headers or {}),
+            "ETag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            "Last-Modified": formatdate(built_at, usegmt=True),
+            "Cache-Control": CACHE_CONTROL,
+            "_built_at": built_at
+        }
+        fresh = generation is None or generation == self.generation
+        if fresh and self.ttl > 0 and len(body) <= self.max_bytes:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body, headers)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+        return _response(request, body, headers)
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def invalidate_products(self, product_ids):
+        self.generation += 1
+        for product_id in product_ids:
+            self._discard(("product", str(product_id)))
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._bytes = 0
+        self.invalidations += 1
+
+    async def bump(self):
+        """Invalidate the catalog on every worker after an admin write"""
+        self.clear()
+        counter = await db.counters.find_one_and_update(
+            {"_id": VERSION_ID},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=True
+        )
+        self.version = counter["value"]
+
+    async def poll(self):
+        counter = await db.counters.find_one({"_id": VERSION_ID})
+        version = counter["value"] if counter else 0
+        if self.version is not None and version != self.version:
+            self.clear()
+        self.version = version
+
+    async def run(self, interval: float = POLL_INTERVAL_SECONDS):
+        """Background task that follows catalog changes made by other workers"""
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"⚠️ Catalog version poll failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "version": self.version
+        }
+
+
+catalog_cache = CatalogCache()
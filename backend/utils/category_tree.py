@@ -0,0 +1,233 @@
+# backend/utils/category_tree.py - Materialized category tree
+#
+# Categories live in their own ``categories`` collection, one document per
+# node keyed by its full path ("Men/Shoes/Running") with its name, parent,
+# level and ancestors. Each node keeps the number of products filed
+# directly under it and their total stock; product writes adjust those
+# with $inc, and subtree totals are summed in memory from the node list.
+# Listing categories reads O(categories) documents and never scans the
+# products. Subtrees are found through the multikey index on ``ancestors``.
+#
+# Stock sold through checkout isn't applied per order. The periodic
+# reconciliation rebuilds the counts from the products and corrects it,
+# together with any drift from a write interrupted between the product and
+# its category update.
+import asyncio
+import os
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database.connection import db
+
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("CATEGORY_RECONCILE_INTERVAL", "900"))
+UNCATEGORIZED = "Uncategorized"
+DUPLICATE_KEY = 11000
+
+
+def _node(path: str) -> dict:
+    parts = path.split("/")
+    return {
+        "name": parts[-1],
+        "parent": "/".join(parts[:-1]) or None,
+        "level": len(parts) - 1,
+        "ancestors": ["/".join(parts[:i]) for i in range(1, len(parts))]
+    }
+
+
+def _upserts(changes: dict) -> List[UpdateOne]:
+    """Upserts applying {path: (count_delta, stock_delta)} and creating missing ancestors"""
+    now = datetime.utcnow()
+    ops = []
+    ancestors = set()
+    for path, (count, stock) in changes.items():
+        ancestors.update(_node(path)["ancestors"])
+        ops.append(UpdateOne(
+            {"_id": path},
+            {"$inc": {"product_count": count, "total_stock": stock}, "$setOnInsert": {**_node(path), "created_at": now}},
+            upsert=True
+        ))
+    for path in ancestors - set(changes):
+        ops.append(UpdateOne(
+            {"_id": path},
+            {"$setOnInsert": {**_node(path), "product_count": 0, "total_stock": 0, "created_at": now}},
+            upsert=True
+        ))
+    return ops
+
+
+async def _write(ops: List[UpdateOne]):
+    try:
+        await db.categories.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # Two writers creating the same node race on the upsert; retry the losers
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        await db.categories.bulk_write([ops[error["index"]] for error in errors], ordered=False)
+
+
+def _changes(removed: Iterable[dict] = (), added: Iterable[dict] = ()) -> dict:
+    changes = {}
+    for sign, products in ((-1, removed), (1, added)):
+        for product in products:
+            path = product.get("category")
+            if not path:
+                continue
+            count, stock = changes.get(path, (0, 0))
+            changes[path] = (count + sign, stock + sign * (product.get("stock") or 0))
+    return {path: delta for path, delta in changes.items() if delta != (0, 0)}
+
+
+async def record_products(removed: Iterable[dict] = (), added: Iterable[dict] = ()):
+    """Move counts from the ``removed`` product states to the ``added`` ones"""
+    changes = _changes(removed, added)
+    if changes:
+        await _write(_upserts(changes))
+
+
+async def ensure_category(path: str):
+    """Create the node and any missing ancestors, without products.
+
+    The node is marked ``explicit`` so admin listings show it while it is
+    empty; ancestors created only as path parents are not.
+    """
+    await _write(_upserts({path: (0, 0)}))
+    await db.categories.update_one({"_id": path}, {"$set": {"explicit": True}})
+
+
+async def subtree(path: str) -> List[dict]:
+    """The node and all its descendants"""
+    cursor = db.categories.find({"$or": [{"_id": path}, {"ancestors": path}]})
+    return await cursor.to_list(None)
+
+
+async def delete_subtree(path: str) -> Optional[dict]:
+    """Remove a category and its subcategories, filing their products under Uncategorized.
+
+    Returns the deleted paths and the number of products moved, or None
+    when the category doesn't exist.
+    """
+    paths = [node["_id"] for node in await subtree(path)]
+    if not paths:
+        # Products may carry a category the reconciler hasn't materialized yet;
+        # the anchored prefix is served by the products.category index
+        paths = await db.products.distinct(
+            "category", {"category": {"$regex": f"^{re.escape(path)}(/|$)"}}
+        )
+        if not paths:
+            return None
+
+    result = await db.products.update_many({"category": {"$in": paths}}, {"$set": {"category": UNCATEGORIZED}})
+    await db.categories.delete_many({"_id": {"$in": paths}})
+    if result.modified_count:
+        # Recounted from the products, so concurrent product writes are included
+        await refresh([UNCATEGORIZED])
+    return {"paths": paths, "moved_count": result.modified_count}
+
+
+async def _counts(match: dict = None) -> dict:
+    pipeline = [{"$group": {"_id": "$category", "count": {"$sum": 1}, "stock": {"$sum": "$stock"}}}]
+    if match:
+        pipeline.insert(0, {"$match": match})
+    rows = await db.products.aggregate(pipeline).to_list(None)
+    return {row["_id"]: (row["count"], row["stock"]) for row in rows if row["_id"]}
+
+
+async def _set_counts(counts: dict, paths: Iterable[str]):
+    """Overwrite the counts of ``paths`` (0 when absent from ``counts``)"""
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"_id": path},
+            {
+                "$set": {"product_count": counts.get(path, (0, 0))[0], "total_stock": counts.get(path, (0, 0))[1]},
+                "$setOnInsert": {**_node(path), "created_at": now}
+            },
+            upsert=True
+        )
+        for path in paths
+    ]
+    ancestors = {ancestor for path in paths for ancestor in _node(path)["ancestors"]} - set(paths)
+    ops.extend(_upserts({path: (0, 0) for path in ancestors}))
+    if ops:
+        await _write(ops)
+
+
+async def refresh(paths: Iterable[str]):
+    """Recount the given categories from their products"""
+    paths = {path for path in paths if path}
+    if paths:
+        await _set_counts(await _counts({"category": {"$in": list(paths)}}), paths)
+
+
+async def reconcile() -> dict:
+    """Rebuild every node's counts from the products and report drift.
+
+    Nodes without products are kept: admins create categories before
+    filing products under them.
+    """
+    counts = await _counts()
+    stored = {
+        node["_id"]: (node.get("product_count", 0), node.get("total_stock", 0))
+        async for node in db.categories.find({}, {"product_count": 1, "total_stock": 1})
+    }
+    drift = {
+        path: counts.get(path, (0, 0))
+        for path in set(counts) | set(stored)
+        if counts.get(path, (0, 0)) != stored.get(path, (0, 0))
+    }
+    await _set_counts(counts, drift)
+    if drift and stored:
+        print(f"🗂️ Category counts corrected for {len(drift)} categories")
+    return {"categories": len(set(counts) | set(stored)), "corrected": len(drift), "reconciled_at": datetime.utcnow()}
+
+
+async def category_tree_reconciler(interval: int = RECONCILE_INTERVAL_SECONDS):
+    """Background task that periodically reconciles the category counts"""
+    while True:
+        try:
+            await reconcile()
+        except Exception as e:
+            print(f"⚠️ Category reconciliation failed: {e}")
+        await asyncio.sleep(interval)
+
+
+# Categories an admin sees: those with products, plus empty ones created on purpose
+LISTED = {"$or": [{"product_count": {"$gt": 0}}, {"explicit": True}]}
+
+
+def list_categories(listed_only: bool = False):
+    """Cursor over the flat node list in path order"""
+    query = LISTED if listed_only else {}
+    return db.categories.find(query, {"ancestors": 0, "created_at": 0}).sort("_id", 1)
+
+
+async def category_tree() -> List[dict]:
+    """Nested tree with subtree product counts, built from the node list"""
+    nodes = {}
+    async for node in list_categories():
+        nodes[node["_id"]] = {
+            "name": node["_id"],
+            "label": node.get("name"),
+            "product_count": node.get("product_count", 0),
+            "children": []
+        }
+
+    roots = []
+    # Deepest first, so each node's count is final before it is added to its parent
+    for path in sorted(nodes, key=lambda path: path.count("/"), reverse=True):
+        node = nodes[path]
+        parent = nodes.get(path.rpartition("/")[0]) if "/" in path else None
+        if parent is not None:
+            parent["product_count"] += node["product_count"]
+            parent["children"].append(node)
+        else:
+            roots.append(node)
+
+    for node in nodes.values():
+        node["children"].sort(key=lambda child: child["name"])
+    return sorted(roots, key=lambda root: root["name"])
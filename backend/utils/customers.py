@@ -0,0 +1,58 @@
+# backend/utils/customers.py - Customer lookups for admin listings
+#
+# Orders store user_id as a string. Listings resolve every customer on a
+# page with one $in query (or a $lookup stage when the orders come from an
+# aggregation) instead of a users.find_one per order, and user listings get
+# their per-user order totals from one grouped aggregation.
+from bson import ObjectId
+
+from database.connection import db
+
+
+def customer_lookup(fields, as_field: str = "customer") -> dict:
+    """$lookup stage joining the order's user with only ``fields``.
+
+    Malformed user ids simply find no customer.
+    """
+    return {
+        "$lookup": {
+            "from": "users",
+            "let": {"uid": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None, "onNull": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$uid"]}}},
+                {"$project": {field: 1 for field in fields}}
+            ],
+            "as": as_field
+        }
+    }
+
+
+async def customers_by_id(user_ids, fields) -> dict:
+    """Map user_id string -> user document with ``fields``, in one query"""
+    ids = {ObjectId(user_id) for user_id in user_ids if user_id and ObjectId.is_valid(user_id)}
+    if not ids:
+        return {}
+    cursor = db.users.find({"_id": {"$in": list(ids)}}, {field: 1 for field in fields})
+    return {str(user["_id"]): user async for user in cursor}
+
+
+async def order_totals_by_user(user_ids) -> dict:
+    """Map user_id -> {"order_count", "lifetime_spend"} with one grouped aggregation.
+
+    Cancelled orders count towards order_count but not towards spend.
+    """
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if not user_ids:
+        return {}
+    pipeline = [
+        {"$match": {"user_id": {"$in": user_ids}}},
+        {"$group": {
+            "_id": "$user_id",
+            "order_count": {"$sum": 1},
+            "lifetime_spend": {"$sum": {"$cond": [{"$eq": ["$status", "cancelled"]}, 0, "$total_amount"]}}
+        }}
+    ]
+    return {
+        row["_id"]: {"order_count": row["order_count"], "lifetime_spend": row["lifetime_spend"]}
+        async for row in db.orders.aggregate(pipeline)
+    }
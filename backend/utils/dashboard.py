@@ -0,0 +1,73 @@
+# backend/utils/dashboard.py - Admin dashboard aggregations
+#
+# Each collection is summarised by one query (a $facet where several views
+# are needed) and they run concurrently, so a dashboard load costs one round
+# trip of latency instead of one per statistic. Order counts and revenue
+# come from the materialized stats in utils.order_stats rather than a scan
+# of the orders collection.
+import asyncio
+
+from database.connection import db
+from utils.customers import customer_lookup
+from utils.order_stats import get_order_stats
+
+_CUSTOMER_LOOKUP = customer_lookup(["full_name", "email"])
+
+
+async def _recent_orders(limit: int) -> list:
+    recent = []
+    pipeline = [{"$sort": {"created_at": -1}}, {"$limit": limit}, _CUSTOMER_LOOKUP]
+    async for order in db.orders.aggregate(pipeline):
+        customer = order.pop("customer", [])
+        order["customer"] = customer[0] if customer else None
+        recent.append(order)
+    return recent
+
+
+async def _user_counts() -> dict:
+    result = await db.users.aggregate([
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "admins": {"$sum": {"$cond": [{"$eq": ["$is_admin", True]}, 1, 0]}}
+        }}
+    ]).to_list(1)
+    return result[0] if result else {"total": 0, "admins": 0}
+
+
+async def _product_facets(low_stock_threshold: int, low_stock_limit: int, low_stock_projection: dict) -> dict:
+    low_stock = [{"$match": {"stock": {"$lt": low_stock_threshold}}}]
+    if low_stock_limit:
+        low_stock.append({"$limit": low_stock_limit})
+    low_stock.append({"$project": low_stock_projection})
+
+    result = await db.products.aggregate([
+        {"$facet": {"total": [{"$count": "count"}], "low_stock": low_stock}}
+    ]).to_list(1)
+    facets = result[0] if result else {"total": [], "low_stock": []}
+    return {
+        "total": facets["total"][0]["count"] if facets["total"] else 0,
+        "low_stock": facets["low_stock"]
+    }
+
+
+async def dashboard_snapshot(
+    recent_limit: int = 5,
+    low_stock_threshold: int = 10,
+    low_stock_limit: int = 10,
+    low_stock_projection: dict = None
+) -> dict:
+    """Order, user and product statistics for the admin dashboard.
+
+    Returns ``orders`` (``by_status`` counts/revenue and ``recent`` orders
+    with their ``customer`` joined), ``users`` (``total``/``admins``) and
+    ``products`` (``total`` and ``low_stock``). A ``low_stock_limit`` of 0
+    returns every low-stock product.
+    """
+    by_status, recent, users, products = await asyncio.gather(
+        get_order_stats(),
+        _recent_orders(recent_limit),
+        _user_counts(),
+        _product_facets(low_stock_threshold, low_stock_limit, low_stock_projection or {"holds": 0})
+    )
+    return {"orders": {"by_status": by_status, "recent": recent}, "users": users, "products": products}
@@ -0,0 +1,144 @@
+# backend/utils/email_outbox.py - Persistent email outbox
+#
+# Request handlers only insert a message into the ``email_outbox``
+# collection; a background worker claims pending messages and delivers
+# them with bounded concurrency. Failed sends are retried with
+# exponential backoff and end up with status "dead" after MAX_ATTEMPTS.
+# Claims carry a lease, so several app workers can drain the same outbox
+# and a message held by a crashed worker is picked up again.
+#
+# Sent and dead messages expire through TTL indexes. Messages of a
+# SECRET_KINDS template (login codes, reset and verification links) have
+# their body blanked as soon as they are sent or dead-lettered.
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo import ReturnDocument
+
+from database.connection import db
+
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+CONCURRENCY = int(os.getenv("EMAIL_WORKER_CONCURRENCY", "4"))
+POLL_INTERVAL_SECONDS = 5
+LEASE_SECONDS = 120
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+SENT_RETENTION_SECONDS = 7 * 24 * 3600
+DEAD_RETENTION_SECONDS = int(os.getenv("EMAIL_DEAD_RETENTION_SECONDS", str(30 * 24 * 3600)))
+SECRET_KINDS = {"password_reset", "verification", "two_factor_code"}
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+class EmailOutbox:
+    def __init__(self, concurrency: int = CONCURRENCY):
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, to_email: str, subject: str, body: str, kind: Optional[str] = None) -> bool:
+        """Persist a message for background delivery; ``kind`` names its template"""
+        now = datetime.utcnow()
+        await db.email_outbox.insert_one({
+            "to": to_email,
+            "subject": subject,
+            "body": body,
+            "kind": kind,
+            "secret": kind in SECRET_KINDS,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now
+        })
+        self._wakeup.set()
+        return True
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        return await db.email_outbox.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_until": {"$lt": now}}
+            ]},
+            {
+                "$set": {"status": "sending", "locked_until": now + timedelta(seconds=LEASE_SECONDS)},
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _deliver(self, message: dict, slots: asyncio.Semaphore):
+        from utils.email import send_email
+
+        try:
+            try:
+                sent = await send_email(message["to"], message["subject"], message["body"])
+                error = None if sent else "send_email returned False"
+            except Exception as e:
+                sent, error = False, str(e)
+
+            now = datetime.utcnow()
+            if sent:
+                update = {"$set": {"status": "sent", "sent_at": now}, "$unset": {"locked_until": ""}}
+            elif message["attempts"] >= MAX_ATTEMPTS:
+                print(f"❌ Email to {message['to']} dead-lettered after {message['attempts']} attempts")
+                update = {"$set": {"status": "dead", "last_error": error, "failed_at": now}, "$unset": {"locked_until": ""}}
+            else:
+                update = {
+                    "$set": {
+                        "status": "pending",
+                        "last_error": error,
+                        "next_attempt_at": now + _backoff(message["attempts"])
+                    },
+                    "$unset": {"locked_until": ""}
+                }
+            if message.get("secret") and update["$set"]["status"] in ("sent", "dead"):
+                # Nothing will read the body again; don't keep codes or links at rest
+                update["$set"]["body"] = ""
+            await db.email_outbox.update_one({"_id": message["_id"]}, update)
+        finally:
+            slots.release()
+
+    async def run(self):
+        """Drain the outbox forever; meant to run as a background task"""
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        while True:
+            try:
+                await slots.acquire()
+                message = await self._claim()
+                if message is None:
+                    slots.release()
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                task = asyncio.create_task(self._deliver(message, slots))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            except asyncio.CancelledError:
+                for task in in_flight:
+                    task.cancel()
+                raise
+            except Exception as e:
+                slots.release()
+                print(f"⚠️ Email outbox error: {e}")
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def create_indexes(self):
+        await db.email_outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+        await db.email_outbox.create_index("sent_at", expireAfterSeconds=SENT_RETENTION_SECONDS)
+        await db.email_outbox.create_index("failed_at", expireAfterSeconds=DEAD_RETENTION_SECONDS)
+
+
+email_outbox = EmailOutbox()
+
+async def queue_email(to_email: str, subject: str, body: str, kind: Optional[str] = None) -> bool:
+    """Queue an email instead of sending it on the request path"""
+    return await email_outbox.enqueue(to_email, subject, body, kind)
@@ -0,0 +1,80 @@
+# backend/utils/email_templates.py - Precompiled email templates
+#
+# Templates live in backend/templates/email as str.format sources. They are
+# read once at import, deployment constants (support address, site URLs)
+# are substituted up front, and the result is split into literal chunks and
+# placeholders, so a send only joins values into the chunks without
+# parsing the template again.
+import html
+import os
+import re
+import string
+from typing import Dict
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "email")
+
+
+class _KeepMissing(dict):
+    """Leaves per-message placeholders intact while constants are baked in"""
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+class EmailTemplate:
+    def __init__(self, name: str, source: str, constants: Dict[str, str] = None):
+        if constants:
+            source = source.format_map(_KeepMissing(constants))
+        self.name = name
+        self._parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if conversion:
+                raise ValueError(f"Template '{name}' uses an unsupported !{conversion} conversion")
+            self._parts.append((literal, field or None, spec or ""))
+        self.fields = frozenset(field for _, field, _ in self._parts if field)
+
+    def render(self, **values) -> str:
+        chunks = []
+        try:
+            for literal, field, spec in self._parts:
+                chunks.append(literal)
+                if field is not None:
+                    chunks.append(format(values[field], spec))
+        except KeyError:
+            missing = self.fields.difference(values)
+            raise KeyError(f"Template '{self.name}' is missing values: {', '.join(sorted(missing))}") from None
+        return "".join(chunks)
+
+
+def load_email_templates(constants: Dict[str, str]) -> Dict[str, EmailTemplate]:
+    """Read and compile every template in TEMPLATE_DIR"""
+    templates = {}
+    for filename in sorted(os.listdir(TEMPLATE_DIR)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".html":
+            continue
+        with open(os.path.join(TEMPLATE_DIR, filename), encoding="utf-8") as f:
+            templates[name] = EmailTemplate(name, f.read(), constants)
+    return templates
+
+
+_DROP_BLOCKS = re.compile(r"<(head|style|script)\b[^>]*>.*?</\1>", re.S | re.I)
+_LINKS = re.compile(r"<a\s[^>]*href=\"([^\"]+)\"[^>]*>(.*?)</a>", re.S | re.I)
+_CELL_ENDS = re.compile(r"</t[dh]>", re.I)
+_LINE_BREAKS = re.compile(r"<br\s*/?>|</(?:p|div|tr|li|h[1-6]|table|ul|ol)>|<hr\b[^>]*>", re.I)
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def html_to_text(body: str) -> str:
+    """Plain-text alternative for a rendered HTML email"""
+    # Source newlines are layout, not content - collapse them like a browser
+    # (str.split is several times faster than a regex over an 18 KB body)
+    text = " ".join(_DROP_BLOCKS.sub("", body).split())
+    text = _LINKS.sub(r"\2 (\1)", text)
+    text = _CELL_ENDS.sub(" ", text)
+    text = _LINE_BREAKS.sub("\n", text)
+    text = _TAGS.sub("", text)
+    text = _SPACES.sub(" ", html.unescape(text))
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
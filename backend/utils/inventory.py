@@ -0,0 +1,124 @@
+# backend/utils/inventory.py - Oversell-proof stock reservations
+#
+# A reservation is a set of "holds" pushed onto the product documents
+# themselves. Each hold is taken with a guarded update
+# ({"stock": {"$gte": qty}}), so stock can never go below zero and
+# only buyers of the same SKU contend on the same document - there is no
+# global lock. Holds carry an expiry; a background sweeper gives back the
+# stock of holds that were never committed.
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from database.connection import db
+
+RESERVATION_TTL_SECONDS = int(os.getenv("STOCK_RESERVATION_TTL", "900"))  # 15 minutes
+SWEEP_INTERVAL_SECONDS = 60
+
+
+def _hold_filter(item: dict, reservation_id: str) -> dict:
+    return {"_id": ObjectId(item["product_id"]), "holds.rid": reservation_id}
+
+
+def _release_ops(items: List[dict], reservation_id: str) -> List[UpdateOne]:
+    # Filtering on holds.rid makes release idempotent: only products that
+    # actually carry this hold get their stock back.
+    return [
+        UpdateOne(
+            _hold_filter(item, reservation_id),
+            {"$inc": {"stock": item["quantity"]}, "$pull": {"holds": {"rid": reservation_id}}}
+        )
+        for item in items
+    ]
+
+
+def _commit_ops(items: List[dict], reservation_id: str) -> List[UpdateOne]:
+    return [
+        UpdateOne(_hold_filter(item, reservation_id), {"$pull": {"holds": {"rid": reservation_id}}})
+        for item in items
+    ]
+
+
+async def reserve_stock(items: List[dict], ttl_seconds: int = RESERVATION_TTL_SECONDS) -> str:
+    """Atomically hold stock for every item or for none of them.
+
+    ``items`` are cart lines (``product_id`` and ``quantity``). Returns the
+    reservation id to pass to commit_reservation / release_reservation.
+    Raises 400 when any SKU lacks the requested quantity.
+    """
+    reservation_id = str(ObjectId())
+    expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+
+    ops = [
+        UpdateOne(
+            {"_id": ObjectId(item["product_id"]), "stock": {"$gte": item["quantity"]}},
+            {
+                "$inc": {"stock": -item["quantity"]},
+                "$push": {"holds": {"rid": reservation_id, "qty": item["quantity"], "expires_at": expires_at}}
+            }
+        )
+        for item in items
+    ]
+    result = await db.products.bulk_write(ops, ordered=False)
+
+    if result.matched_count != len(ops):
+        await db.products.bulk_write(_release_ops(items, reservation_id), ordered=False)
+        raise HTTPException(status_code=400, detail="Insufficient stock")
+
+    return reservation_id
+
+
+async def commit_reservation(reservation_id: str, items: List[dict]):
+    """Make a reservation permanent - the stock stays taken"""
+    await db.products.bulk_write(_commit_ops(items, reservation_id), ordered=False)
+
+
+async def release_reservation(reservation_id: str, items: List[dict]):
+    """Give the reserved stock back"""
+    await db.products.bulk_write(_release_ops(items, reservation_id), ordered=False)
+
+
+async def release_expired_reservations() -> int:
+    """Settle every expired hold: commit it if its order exists, otherwise release it"""
+    now = datetime.utcnow()
+    expired = []
+    cursor = db.products.find({"holds.expires_at": {"$lt": now}}, {"holds": 1})
+    async for product in cursor:
+        for hold in product.get("holds", []):
+            if hold["expires_at"] < now:
+                expired.append({"product_id": str(product["_id"]), "quantity": hold["qty"], "rid": hold["rid"]})
+
+    if not expired:
+        return 0
+
+    # A crash between order insert and commit leaves the hold behind; the
+    # order is the source of truth, so those holds are committed instead.
+    reservation_ids = list({hold["rid"] for hold in expired})
+    ordered = set(await db.orders.distinct("reservation_id", {"reservation_id": {"$in": reservation_ids}}))
+
+    ops = []
+    for hold in expired:
+        if hold["rid"] in ordered:
+            ops.extend(_commit_ops([hold], hold["rid"]))
+        else:
+            ops.extend(_release_ops([hold], hold["rid"]))
+    await db.products.bulk_write(ops, ordered=False)
+
+    released = sum(1 for hold in expired if hold["rid"] not in ordered)
+    if released:
+        print(f"📦 Released {released} expired stock reservation(s)")
+    return released
+
+
+async def reservation_sweeper(interval: int = SWEEP_INTERVAL_SECONDS):
+    """Background task that periodically releases expired reservations"""
+    while True:
+        try:
+            await release_expired_reservations()
+        except Exception as e:
+            print(f"⚠️ Reservation sweep failed: {e}")
+        await asyncio.sleep(interval)
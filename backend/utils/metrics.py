@@ -0,0 +1,69 @@
+# backend/utils/metrics.py - In-process latency metrics
+#
+# Each named timer keeps a bounded window of recent samples, so memory
+# stays flat no matter how long the process runs. Percentiles are computed
+# on read, which only happens when an admin asks for them.
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+WINDOW_SIZE = 2048
+
+
+class LatencyTimer:
+    def __init__(self, window: int = WINDOW_SIZE):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        self._samples.append(seconds)
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count, "errors": self.errors}
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": pct(50),
+            "p90_ms": pct(90),
+            "p99_ms": pct(99),
+            "max_ms": round(samples[-1] * 1000, 2)
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._timers: Dict[str, LatencyTimer] = {}
+
+    def timer(self, name: str) -> LatencyTimer:
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = LatencyTimer()
+        return timer
+
+    @asynccontextmanager
+    async def measure(self, name: str):
+        """Time the wrapped block; exceptions are counted as errors"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.timer(name).observe(time.perf_counter() - start, error=True)
+            raise
+        self.timer(name).observe(time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        return {name: timer.summary() for name, timer in sorted(self._timers.items())}
+
+
+metrics = Metrics()
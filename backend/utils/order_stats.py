@@ -0,0 +1,152 @@
+# backend/utils/order_stats.py - Materialized order statistics
+#
+# Order count and revenue per status are kept in one ``order_stats``
+# document, updated with $inc whenever an order is placed, changes status
+# or is deleted, so dashboards read them in O(1) whatever the order volume.
+# A periodic reconciliation rebuilds the document from the orders
+# collection and reports any drift (e.g. from a crash between an order
+# write and its counter update).
+import asyncio
+import os
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from database.connection import db
+
+STATS_ID = "orders"
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("ORDER_STATS_RECONCILE_INTERVAL", "3600"))
+RECONCILE_RETRIES = 3
+
+
+def _inc(changes: dict) -> dict:
+    """$inc document for {status: (count_delta, revenue_delta)}"""
+    inc = {"version": 1}
+    for status, (count, revenue) in changes.items():
+        inc[f"statuses.{status}.count"] = inc.get(f"statuses.{status}.count", 0) + count
+        inc[f"statuses.{status}.revenue"] = inc.get(f"statuses.{status}.revenue", 0) + revenue
+    return inc
+
+
+async def _apply(changes: dict):
+    await db.order_stats.update_one(
+        {"_id": STATS_ID},
+        {"$inc": _inc(changes), "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def record_order_created(order: dict):
+    """Count a new order once it is committed.
+
+    Never call this inside a checkout transaction: every checkout would
+    write the same stats document and conflict with the others.
+    """
+    await _apply({order["status"]: (1, order.get("total_amount", 0))})
+
+
+async def record_status_change(previous: dict, new_status: str):
+    """Move an order between statuses; ``previous`` is the order before the update"""
+    old_status = previous.get("status")
+    if old_status == new_status:
+        return
+    amount = previous.get("total_amount", 0)
+    changes = {new_status: (1, amount)}
+    if old_status:
+        changes[old_status] = (-1, -amount)
+    await _apply(changes)
+
+
+async def record_orders_deleted(by_status: dict):
+    """Remove deleted orders, given as {status: {"count", "revenue"}}"""
+    if by_status:
+        await _apply({status: (-stats["count"], -stats["revenue"]) for status, stats in by_status.items()})
+
+
+async def orders_by_status(match: dict = None) -> dict:
+    """Count and revenue per status computed from the orders themselves"""
+    pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}, "revenue": {"$sum": "$total_amount"}}}]
+    if match:
+        pipeline.insert(0, {"$match": match})
+    rows = await db.orders.aggregate(pipeline).to_list(None)
+    return {row["_id"]: {"count": row["count"], "revenue": row["revenue"]} for row in rows if row["_id"]}
+
+
+def _drift(stored: dict, actual: dict) -> dict:
+    drift = {}
+    for status in set(stored) | set(actual):
+        have = stored.get(status, {})
+        want = actual.get(status, {})
+        count = want.get("count", 0) - have.get("count", 0)
+        revenue = round(want.get("revenue", 0) - have.get("revenue", 0), 2)
+        if count or revenue:
+            drift[status] = {"count": count, "revenue": revenue}
+    return drift
+
+
+async def reconcile() -> dict:
+    """Rebuild the stats document from the orders collection and report drift.
+
+    The rebuild is only written if no counter update landed while the orders
+    were being aggregated; otherwise it is retried a few times. When orders
+    keep arriving it is written anyway, and increments that raced with it are
+    corrected by the next run.
+    """
+    stored = {}
+    for _ in range(RECONCILE_RETRIES):
+        stored = await db.order_stats.find_one({"_id": STATS_ID}) or {}
+        version = stored.get("version", 0)
+        actual = await orders_by_status()
+
+        now = datetime.utcnow()
+        try:
+            result = await db.order_stats.update_one(
+                {"_id": STATS_ID, "version": version} if stored else {"_id": STATS_ID},
+                {"$set": {"statuses": actual, "version": version + 1, "updated_at": now, "reconciled_at": now}},
+                upsert=not stored
+            )
+        except DuplicateKeyError:
+            # Another first caller created the document; retry against it
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            return _reconciled(stored, actual, now)
+
+    actual = await orders_by_status()
+    now = datetime.utcnow()
+    update = {
+        "$set": {"statuses": actual, "updated_at": now, "reconciled_at": now},
+        "$inc": {"version": 1}
+    }
+    try:
+        await db.order_stats.update_one({"_id": STATS_ID}, update, upsert=True)
+    except DuplicateKeyError:
+        await db.order_stats.update_one({"_id": STATS_ID}, update)
+    return _reconciled(stored, actual, now)
+
+
+def _reconciled(stored: dict, actual: dict, now: datetime) -> dict:
+    drift = _drift(stored.get("statuses", {}), actual)
+    if drift and stored:
+        print(f"📊 Order stats drift corrected: {drift}")
+    return {"statuses": actual, "drift": drift, "reconciled_at": now}
+
+
+async def get_order_stats() -> dict:
+    """Materialized {status: {"count", "revenue"}}; built on first use"""
+    stats = await db.order_stats.find_one({"_id": STATS_ID}, {"statuses": 1})
+    if stats is None:
+        return (await reconcile())["statuses"]
+    return {
+        status: values for status, values in stats.get("statuses", {}).items()
+        if values.get("count")
+    }
+
+
+async def order_stats_reconciler(interval: int = RECONCILE_INTERVAL_SECONDS):
+    """Background task that periodically reconciles the order stats"""
+    while True:
+        try:
+            await reconcile()
+        except Exception as e:
+            print(f"⚠️ Order stats reconciliation failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,92 @@
+# backend/utils/pagination.py - Keyset (cursor) pagination
+#
+# List endpoints page by an indexed sort key plus _id instead of skip, so
+# page 500 costs the same index seek as page 1 and rows inserted meanwhile
+# never shift a page boundary. The continuation cursor is opaque: the last
+# row's key, HMAC-signed together with the endpoint scope (path + filters),
+# so it cannot be forged or replayed against a different listing.
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+from bson import json_util
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+CURSOR_SECRET = (os.getenv("CURSOR_SECRET") or os.getenv("JWT_SECRET") or secrets.token_hex(32)).encode()
+CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _sign(scope: str, payload: bytes) -> str:
+    digest = hmac.new(CURSOR_SECRET, scope.encode() + b"\0" + payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def encode_cursor(doc: dict, sort_field: str, scope: str) -> str:
+    key = [doc["_id"]] if sort_field == "_id" else [doc.get(sort_field), doc["_id"]]
+    payload = json_util.dumps(key).encode()
+    return f"{base64.urlsafe_b64encode(payload).rstrip(b'=').decode()}.{_sign(scope, payload)}"
+
+
+def decode_cursor(cursor: str, scope: str) -> list:
+    try:
+        body, signature = cursor.split(".")
+        payload = _b64decode(body)
+        if hmac.compare_digest(signature, _sign(scope, payload)):
+            return json_util.loads(payload)
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(key: list, sort_field: str, direction: int) -> dict:
+    op = "$lt" if direction == DESCENDING else "$gt"
+    if sort_field == "_id":
+        return {"_id": {op: key[0]}}
+    value, last_id = key
+    return {"$or": [
+        {sort_field: {op: value}},
+        {sort_field: value, "_id": {op: last_id}}
+    ]}
+
+
+async def paginate(
+    collection,
+    query: dict,
+    *,
+    scope: str,
+    limit: int,
+    cursor: str = None,
+    skip: int = 0,
+    sort_field: str = "_id",
+    direction: int = ASCENDING,
+    projection: dict = None
+) -> tuple:
+    """Return ``(documents, next_cursor)`` for one page ordered by (sort_field, _id).
+
+    ``next_cursor`` is None on the last page. ``skip`` is honoured only when
+    no cursor is given, for clients that still page by offset.
+    """
+    if cursor:
+        query = {"$and": [query, _after(decode_cursor(cursor, scope), sort_field, direction)]}
+
+    sort = [("_id", direction)] if sort_field == "_id" else [(sort_field, direction), ("_id", direction)]
+    find = collection.find(query, projection).sort(sort)
+    if skip and not cursor:
+        find = find.skip(skip)
+    docs = await find.limit(limit + 1).to_list(limit + 1)
+
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], sort_field, scope)
+
+
+def cursor_scope(path: str, **filters) -> str:
+    """Bind a cursor to the endpoint and the filters it was issued for"""
+    return path + "?" + "&".join(f"{name}={filters[name]}" for name in sorted(filters))
@@ -0,0 +1,180 @@
+# backend/utils/product_import.py - Bulk product import
+#
+# An uploaded CSV or NDJSON file is read IMPORT_BATCH_SIZE rows at a time.
+# Parsing and SecureProduct validation of a batch run in a worker thread,
+# and the valid rows go to MongoDB as one bulk_write of upserts, so memory
+# stays bounded by the batch size whatever the file size. Rows are matched
+# on sku when given, otherwise on name + category.
+import asyncio
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database.connection import db
+from middleware.validation import SecureProduct, SecurityValidator
+from utils.category_tree import reconcile as reconcile_categories
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+EXTRA_FIELDS = ("brand", "sku")  # Optional template columns kept as plain text
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted_count = 0
+        self.updated_count = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, row: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "message": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "success_count": self.inserted_count + self.updated_count,
+            "inserted_count": self.inserted_count,
+            "updated_count": self.updated_count,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors)
+        }
+
+
+def _is_ndjson(filename: str, content_type: str) -> bool:
+    return (filename or "").lower().endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or "")
+
+
+def _csv_rows(text):
+    # Spreadsheet numbering: the header is row 1
+    for number, row in enumerate(csv.DictReader(text), start=2):
+        yield number, row
+
+
+def _ndjson_rows(text):
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, e
+            continue
+        yield number, row if isinstance(row, dict) else ValueError("Each line must be a JSON object")
+
+
+def _clean(row: dict) -> dict:
+    """Strip CSV cells; empty cells count as missing"""
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        cleaned[key.strip()] = value
+    return cleaned
+
+
+def _validate(number: int, row, report: ImportReport):
+    if isinstance(row, Exception):
+        report.error(number, f"Invalid JSON: {row}")
+        return None
+    row = _clean(row)
+    try:
+        product = SecureProduct(**row).dict()
+    except ValidationError as e:
+        report.error(number, "; ".join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+        ))
+        return None
+    for field in EXTRA_FIELDS:
+        if row.get(field) is not None:
+            product[field] = SecurityValidator.sanitize_string(str(row[field]), 100)
+    return number, product
+
+
+def _next_batch(rows, report: ImportReport) -> tuple:
+    """Read and validate up to IMPORT_BATCH_SIZE rows; runs in a worker thread.
+
+    Returns the valid rows and whether the file is exhausted.
+    """
+    batch = []
+    read = 0
+    for number, row in islice(rows, IMPORT_BATCH_SIZE):
+        read += 1
+        valid = _validate(number, row, report)
+        if valid:
+            batch.append(valid)
+    return batch, read < IMPORT_BATCH_SIZE
+
+
+def _upsert(product: dict, now: datetime, created_by: str) -> UpdateOne:
+    if product.get("sku"):
+        key = {"sku": product["sku"]}
+    else:
+        key = {"name": product["name"], "category": product["category"]}
+    return UpdateOne(
+        key,
+        {
+            "$set": {**product, "updated_at": now},
+            "$setOnInsert": {"created_at": now, "created_by": created_by}
+        },
+        upsert=True
+    )
+
+
+async def _write(batch: list, report: ImportReport, ordered: bool, created_by: str) -> bool:
+    """Write one batch; returns False when an ordered import has to stop"""
+    now = datetime.utcnow()
+    try:
+        result = await db.products.bulk_write(
+            [_upsert(product, now, created_by) for _, product in batch],
+            ordered=ordered
+        )
+        report.inserted_count += result.upserted_count
+        report.updated_count += result.matched_count
+        return True
+    except BulkWriteError as e:
+        details = e.details
+        report.inserted_count += details.get("nUpserted", 0)
+        report.updated_count += details.get("nMatched", 0)
+        for error in details.get("writeErrors", []):
+            report.error(batch[error["index"]][0], error.get("errmsg", "Write failed"))
+        return not ordered
+
+
+async def import_products(upload, created_by: str, ordered: bool = False) -> dict:
+    """Import every row of an uploaded CSV or NDJSON file; returns the report.
+
+    With ``ordered`` the import stops at the first row MongoDB rejects;
+    validation errors are always reported and skipped.
+    """
+    report = ImportReport()
+    text = codecs.getreader("utf-8-sig")(upload.file)
+    rows = _ndjson_rows(text) if _is_ndjson(upload.filename, upload.content_type) else _csv_rows(text)
+
+    done = False
+    while not done:
+        try:
+            batch, done = await asyncio.to_thread(_next_batch, rows, report)
+        except (UnicodeDecodeError, csv.Error) as e:
+            report.error(0, f"File could not be read past this point: {e}")
+            break
+        if batch and not await _write(batch, report, ordered, created_by):
+            break
+
+    # Upserts don't say which category a matched product came from, so the
+    # counts are rebuilt once for the whole import
+    if report.inserted_count or report.updated_count:
+        await reconcile_categories()
+    return report.as_dict()
@@ -0,0 +1,45 @@
+# backend/utils/responses.py - orjson-backed JSON responses
+#
+# Handlers that return large lists (orders, users, products) hand Motor
+# documents straight to FastJSONResponse: orjson encodes ObjectId, Decimal
+# and BSON Decimal128 through one default hook and datetimes natively, so
+# no per-field rewriting or jsonable_encoder pass is needed. The output
+# matches FastAPI's default encoding (ObjectId as its hex string, naive
+# datetimes in isoformat, Decimal as int or float).
+from decimal import Decimal
+
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _decimal(value: Decimal):
+    return int(value) if value.as_tuple().exponent >= 0 else float(value)
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal):
+        return _decimal(value)
+    if isinstance(value, Decimal128):
+        return _decimal(value.to_decimal())
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,138 @@
+# backend/utils/smtp_pool.py - Pooled, persistent SMTP sessions
+#
+# smtplib is blocking, so the pool is thread-safe and meant to be used
+# from worker threads (asyncio.to_thread). Authenticated sessions are kept
+# alive between messages and reused; a session the server has dropped is
+# replaced transparently.
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import List, Tuple
+
+# Rejections of a single message; smtplib resets the session, which stays usable
+_MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError, smtplib.SMTPNotSupportedError
+)
+
+
+def _is_dropped(error: Exception) -> bool:
+    """Whether the session is gone and must be reopened.
+
+    SMTPException subclasses OSError, so an SMTP reply error is only a
+    dropped session when it is SMTPServerDisconnected.
+    """
+    if isinstance(error, smtplib.SMTPException):
+        return isinstance(error, smtplib.SMTPServerDisconnected)
+    return isinstance(error, OSError)
+
+
+class SMTPConnectionPool:
+    def __init__(self, host: str, port: int, user: str, password: str,
+                 max_size: int = 4, max_idle_seconds: float = 60.0, timeout: float = 30.0,
+                 starttls: bool = True):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        self.starttls = starttls
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            server.login(self.user, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _checkout(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                server, last_used = self._idle.pop()
+                if now - last_used < self.max_idle_seconds:
+                    return server
+                self._close(server)
+        return self._connect()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a live, authenticated session"""
+        self._slots.acquire()
+        holder = []
+        try:
+            holder.append(self._checkout())
+            # Callers may swap in a fresh session after a disconnect
+            yield holder
+            with self._lock:
+                self._idle.append((holder.pop(), time.monotonic()))
+        finally:
+            if holder:
+                self._close(holder[0])
+            self._slots.release()
+
+    def _send_on(self, holder: list, to_email: str, message: Message):
+        payload = message.as_string()
+        try:
+            holder[0].sendmail(self.user, [to_email], payload)
+        except OSError as e:
+            if not _is_dropped(e):
+                raise
+            # Idle sessions get dropped by the server; reconnect once and retry
+            self._close(holder[0])
+            holder[0] = self._connect()
+            holder[0].sendmail(self.user, [to_email], payload)
+
+    def send_message(self, to_email: str, message: Message):
+        """Send one message over a pooled session; raises on failure"""
+        with self.connection() as holder:
+            self._send_on(holder, to_email, message)
+
+    def send_batch(self, messages: List[Tuple[str, Message]]) -> List[Tuple[str, str]]:
+        """Send many messages over a single session.
+
+        Returns ``(recipient, error)`` pairs for the messages that were not
+        sent. A rejected message does not abort the rest of the batch; if
+        the session is lost and can't be reopened, the batch stops and only
+        the recipients not yet sent to are reported.
+        """
+        failures = []
+        done = 0
+        try:
+            with self.connection() as holder:
+                for to_email, message in messages:
+                    try:
+                        self._send_on(holder, to_email, message)
+                    except _MESSAGE_ERRORS as e:
+                        failures.append((to_email, str(e)))
+                    done += 1
+        except Exception as e:
+            # connection() closes the broken session instead of pooling it
+            failures.extend((to_email, str(e)) for to_email, _ in messages[done:])
+        return failures
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
@@ -0,0 +1,132 @@
+# backend/utils/streaming.py - Streamed list and export responses
+#
+# Large results are written to the client while the Motor cursor is still
+# being read: rows are encoded one at a time, buffered into chunks of about
+# STREAM_CHUNK_BYTES and handed to the server, which only asks for the next
+# chunk once the previous one was sent. Together with the cursor batch size
+# this keeps a worker's memory flat whether a listing has 100 rows or 1M.
+#
+# Formats: a JSON array (optionally wrapped in an object), NDJSON, CSV, and
+# CSV carried inside a JSON string for clients that expect {"csv_data": ...}.
+import csv
+import io
+import os
+from typing import AsyncIterable, Callable, Iterable, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from utils.responses import dumps
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def batched(cursor, batch_size: int = STREAM_BATCH_SIZE):
+    """Ask the server for ``batch_size`` documents per getMore"""
+    return cursor.batch_size(batch_size)
+
+
+async def _rows(source: AsyncIterable, transform: Optional[Callable]):
+    async for doc in source:
+        row = transform(doc) if transform else doc
+        if row is not None:
+            yield row
+
+
+async def _chunked(pieces):
+    buffer = bytearray()
+    async for piece in pieces:
+        buffer += piece
+        if len(buffer) >= STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _guarded(chunks, name: str):
+    # Once the body has started the status can't change. Re-raising makes
+    # the server abort the connection, so the client sees a broken transfer
+    # instead of a body that looks complete but is truncated.
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        print(f"❌ Streaming {name} failed: {e}")
+        raise
+
+
+async def json_array(source, transform=None, prefix: bytes = b"", suffix: bytes = b""):
+    yield prefix + b"["
+    first = True
+    async for row in _rows(source, transform):
+        yield dumps(row) if first else b"," + dumps(row)
+        first = False
+    yield b"]" + suffix
+
+
+async def ndjson(source, transform=None):
+    async for row in _rows(source, transform):
+        yield dumps(row) + b"\n"
+
+
+def _cell(value):
+    # Keep spreadsheet apps from evaluating user-supplied text as a formula
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return "" if value is None else value
+
+
+async def csv_lines(source, columns: Iterable[str], transform=None):
+    """CSV header and one line per row; ``transform`` returns a list of values"""
+    text = io.StringIO()
+    writer = csv.writer(text)
+
+    def line(values) -> str:
+        writer.writerow(values)
+        value = text.getvalue()
+        text.seek(0)
+        text.truncate()
+        return value
+
+    yield line(columns)
+    async for values in _rows(source, transform):
+        yield line([_cell(value) for value in values])
+
+
+async def json_string_field(key: str, lines):
+    """Stream ``{"key": "<lines joined>"}`` without holding the whole string"""
+    yield b"{" + orjson.dumps(key) + b':"'
+    async for text in lines:
+        yield orjson.dumps(text)[1:-1]
+    yield b'"}'
+
+
+def stream(pieces, media_type: str = MEDIA_TYPES["json"], name: str = "response",
+           headers: dict = None) -> StreamingResponse:
+    return StreamingResponse(
+        _guarded(_chunked(_encoded(pieces)), name),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+async def _encoded(pieces):
+    async for piece in pieces:
+        yield piece.encode("utf-8") if isinstance(piece, str) else piece
+
+
+def stream_csv(lines, filename: str) -> StreamingResponse:
+    return stream(
+        lines,
+        media_type=MEDIA_TYPES["csv"],
+        name=filename,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )